@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Task Queue Database Benchmark
+
+Measures enqueue and claim throughput of the task queue database with the
+SQLite defaults (rollback journal, synchronous=FULL) and with the tuned
+pragma profile (TaskQueueORMDatabase.DEFAULT_PRAGMAS).
+
+Three scenarios are measured per profile, each on a fresh database:
+  - enqueue: sequential add_task calls (one transaction per task, like task-add)
+  - claim:   claim_next_task + update_task_status(completed) until the queue is empty
+  - mixed:   several writer processes enqueue while the main process claims,
+             failed operations ("database is locked") are counted
+
+Usage:
+    python scripts/benchmark_task_queue.py [--tasks N] [--writers N] [--directory DIR]
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from sokrates.task_queue.database import TaskQueueORMDatabase
+
+PROFILES = {
+    "sqlite defaults": {},
+    "tuned": TaskQueueORMDatabase.DEFAULT_PRAGMAS
+}
+
+
+def _enqueue(database: TaskQueueORMDatabase, count: int, prefix: str = "task") -> int:
+    """Adds count tasks and returns the number of failed inserts."""
+    failures = 0
+    for i in range(count):
+        try:
+            database.add_task(f"{prefix} {i}", f"/tmp/{prefix}_{i}.json")
+        except Exception:
+            failures += 1
+    return failures
+
+
+def _writer(db_path: str, pragmas: dict, count: int, prefix: str, ready, start, results) -> None:
+    """Writer process of the mixed scenario: enqueues once all processes are started."""
+    database = TaskQueueORMDatabase(db_path, pragmas=pragmas)
+    ready.wait()
+    start.wait()
+    results.put(_enqueue(database, count, prefix))
+    database.close()
+
+
+def _claim_all(database: TaskQueueORMDatabase, until=None) -> tuple:
+    """
+    Claims and completes tasks, returns (claimed, failures).
+    Stops when the queue is empty, or with `until` once until() is True and the queue is empty.
+    An empty queue is polled every 5ms like an idle daemon worker.
+    """
+    claimed = failures = 0
+    while True:
+        try:
+            task = database.claim_next_task(lease_owner="benchmark", lease_seconds=60)
+        except Exception:
+            failures += 1
+            continue
+        if task is None:
+            if until is None or until():
+                return claimed, failures
+            time.sleep(0.005)
+            continue
+        try:
+            database.update_task_status(task['task_id'], "completed")
+            claimed += 1
+        except Exception:
+            failures += 1
+
+
+def benchmark(directory: Path, name: str, pragmas: dict, tasks: int, writers: int) -> dict:
+    db_path = str(directory / f"{name.replace(' ', '_')}.sqlite")
+    database = TaskQueueORMDatabase(db_path, pragmas=pragmas)
+    results = {}
+
+    started = time.perf_counter()
+    _enqueue(database, tasks)
+    results["enqueue/s"] = tasks / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    claimed, _ = _claim_all(database)
+    results["claim/s"] = claimed / (time.perf_counter() - started)
+
+    # mixed: writer processes enqueue (like concurrent task-add calls) while this process claims
+    context = multiprocessing.get_context("spawn")
+    per_writer = tasks // writers
+    ready, start, writer_results = context.Barrier(writers + 1), context.Event(), context.Queue()
+    processes = [context.Process(target=_writer, args=(db_path, pragmas, per_writer, f"writer{w}", ready, start, writer_results))
+                 for w in range(writers)]
+    for process in processes:
+        process.start()
+    ready.wait()  # exclude the interpreter start up of the writers
+
+    started = time.perf_counter()
+    start.set()
+    claimed, claim_failures = _claim_all(database, until=lambda: not any(p.is_alive() for p in processes))
+    more, more_failures = _claim_all(database)
+    elapsed = time.perf_counter() - started
+    enqueue_failures = sum(writer_results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    database.close()
+
+    results["mixed ops/s"] = (per_writer * writers - enqueue_failures + claimed + more) / elapsed
+    results["locked errors"] = enqueue_failures + claim_failures + more_failures
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks enqueue and claim throughput of the task queue database.")
+    parser.add_argument("--tasks", type=int, default=1000, help="Number of tasks per scenario (default: 1000)")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent writer processes in the mixed scenario (default: 4)")
+    parser.add_argument("--directory", default=None, help="Directory for the benchmark databases (default: a temporary directory)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = Path(args.directory or temporary_directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        print(f"{'profile':<16} {'enqueue/s':>10} {'claim/s':>10} {'mixed ops/s':>12} {'locked errors':>14}")
+        for name, pragmas in PROFILES.items():
+            results = benchmark(directory, name, pragmas, args.tasks, args.writers)
+            print(f"{name:<16} {results['enqueue/s']:>10.0f} {results['claim/s']:>10.0f} "
+                  f"{results['mixed ops/s']:>12.0f} {results['locked errors']:>14}")
+
+
+if __name__ == "__main__":
+    main()
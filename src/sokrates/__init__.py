@@ -6,7 +6,10 @@ from .cli.output_printer import OutputPrinter
 from .config import Config
 from .constants import Constants
 from .file_helper import FileHelper
+from .generation_metrics import GenerationMetrics
 from .llm_api import LLMApi
+from .async_llm_api import AsyncLLMApi
+from .provider_pool import ProviderPool
 from .prompt_refiner import PromptRefiner
 from .prompt_constructor import PromptConstructor
 from .utils import Utils
@@ -27,7 +30,10 @@ __all__ = [
   "Config",
   "Constants",
   "FileHelper",
+  "GenerationMetrics",
   "LLMApi",
+  "AsyncLLMApi",
+  "ProviderPool",
   "OutputPrinter",
   "PromptRefiner",
   "PromptConstructor",
@@ -0,0 +1,313 @@
+# This script defines the `AsyncLLMApi` class, an asyncio based variant of
+# `LLMApi`. It uses the `AsyncOpenAI` client and limits the number of requests
+# that are in flight at the same time with a per-instance semaphore. This allows
+# workflows to fan out many generations against a single OpenAI-compatible
+# backend (e.g. vLLM or LM Studio) without blocking on each request.
+
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+from .client_registry import ClientRegistry
+from .constants import Constants
+from .generation_metrics import GenerationMetrics
+from .llm_api import LLMApi
+from .response_cache import ResponseCache
+
+class AsyncLLMApi(LLMApi):
+    """
+    Handles asynchronous interactions with OpenAI-compatible LLM APIs.
+    Provides the same methods as LLMApi as coroutines and caps the number of
+    concurrent requests per instance.
+
+    Generations of one instance run concurrently, so last_metrics is not set:
+    pass a GenerationMetrics object or use the metrics returned by send_batch().
+    """
+    def __init__(self, api_endpoint: str, api_key: str, max_concurrent_requests: int = Constants.DEFAULT_MAX_CONCURRENT_REQUESTS, client: AsyncOpenAI = None, cache: ResponseCache = None, use_cache: bool = True, stream_usage: Optional[bool] = None, timeout: Optional[float] = None):
+        """
+        Initializes the AsyncLLMApi client.
+
+        Args:
+            api_endpoint (str): The URL of the LLM API endpoint.
+            api_key (str): The API key for authentication.
+            max_concurrent_requests (int): Maximum number of requests in flight at the same time.
+                                           Defaults to Constants.DEFAULT_MAX_CONCURRENT_REQUESTS.
+            client (AsyncOpenAI, optional): A preconfigured AsyncOpenAI client. Defaults to None.
+            cache (ResponseCache, optional): The response cache to use. If None, the process-wide
+                                             default cache (ResponseCache.get_default()) is used.
+            use_cache (bool): Set to False to bypass any response cache. Defaults to True.
+            stream_usage (bool, optional): Request token usage reporting for streamed responses.
+                                           Defaults to the process-wide default of LLMApi.
+            timeout (float, optional): Request timeout in seconds. Defaults to the openai client default.
+
+        Raises:
+            ValueError: If max_concurrent_requests is smaller than 1.
+        """
+        super().__init__(api_endpoint=api_endpoint, api_key=api_key, client=client, cache=cache, use_cache=use_cache, stream_usage=stream_usage, timeout=timeout)
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1!")
+        self.max_concurrent_requests = max_concurrent_requests
+        # created lazily so the semaphore is bound to the running event loop
+        self._semaphore = None
+
+    def get_openai_client(self) -> AsyncOpenAI:
+        """
+        Returns an AsyncOpenAI client instance configured with the specified API endpoint
+        and key. Unless a client was passed in, the client is taken from the process-wide
+        ClientRegistry and shares the connection pool of the running event loop.
+
+        Returns:
+            AsyncOpenAI: An initialized AsyncOpenAI client object.
+        """
+        if self.client:
+            return self.client
+
+        # clients are shared process-wide to reuse the pooled http connections
+        return ClientRegistry.get_async_client(self.api_endpoint, self.api_key, timeout=self.timeout)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Returns the semaphore limiting the in-flight requests of this instance.
+
+        Returns:
+            asyncio.Semaphore: The semaphore for this instance.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._semaphore
+
+    async def list_models(self) -> List[str]:
+        """
+        Lists available models from the configured OpenAI-compatible endpoint.
+
+        Returns:
+            List[str]: A sorted list of model IDs available at the endpoint.
+
+        Raises:
+            Exception: If there is an error while listing models.
+        """
+        try:
+            client = self.get_openai_client()
+            async with self._get_semaphore():
+                models = await client.models.list()
+            ret_array = [model.id for model in models.data]
+            ret_array.sort()
+            return ret_array
+
+        except Exception as e:
+            self.logger.error(f"Error listing models: {str(e)}", exc_info=True)
+            raise
+
+    async def send(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None, metrics: GenerationMetrics = None) -> str:
+        """
+        Sends a text prompt to the LLM server for generation and returns the response.
+        Waits for a free slot if the maximum number of concurrent requests is reached.
+
+        Args:
+            prompt (str): The main text prompt to send to the LLM.
+            model (str): The name of the model to use for generation. Defaults to Constants.DEFAULT_MODEL.
+            context (List[str], optional): List of context strings to prepend to the prompt. Defaults to None.
+            max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            system_prompt (str, optional): A system prompt to use for processing the sent prompt (Default: None)
+            metrics (GenerationMetrics, optional): A metrics object to fill in. Defaults to None.
+
+        Returns:
+            str: The generated content from the LLM.
+
+        Raises:
+            Exception: If the API call to the LLM server fails.
+        """
+        response_parts = []
+        async for content in self.stream(prompt, model=model, context=context, max_tokens=max_tokens,
+                                         temperature=temperature, system_prompt=system_prompt, metrics=metrics):
+            response_parts.append(content)
+        return "".join(response_parts)
+
+    async def chat_completion(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, print_to_console = False, metrics: GenerationMetrics = None) -> str:
+        """
+        Sends a list of messages (conversation history) to the LLM server for chat completion.
+        Waits for a free slot if the maximum number of concurrent requests is reached.
+
+        Args:
+            messages (List[dict]): A list of message dictionaries with "role" and "content" keys.
+            model (str): The name of the model to use for chat completion. Defaults to Constants.DEFAULT_MODEL.
+            max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            print_to_console (bool): Print the streamed tokens while they arrive. Defaults to False.
+            metrics (GenerationMetrics, optional): A metrics object to fill in. Defaults to None.
+
+        Returns:
+            str: The generated content from the LLM for the chat completion.
+
+        Raises:
+            Exception: If the API call to the LLM server fails.
+        """
+        response_parts = []
+        async for content in self.stream_chat(messages, model=model, max_tokens=max_tokens,
+                                              temperature=temperature, metrics=metrics):
+            if print_to_console:
+                print(content, end="", flush=True)
+            response_parts.append(content)
+        return "".join(response_parts)
+
+    async def stream(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None, metrics: GenerationMetrics = None) -> AsyncIterator[str]:
+        """
+        Sends a text prompt to the LLM server and yields the generated content chunk by chunk.
+
+        Args:
+            prompt (str): The main text prompt to send to the LLM.
+            model (str): The name of the model to use for generation. Defaults to Constants.DEFAULT_MODEL.
+            context (List[str], optional): List of context strings to prepend to the prompt. Defaults to None.
+            max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            system_prompt (str, optional): A system prompt to use for processing the sent prompt (Default: None)
+            metrics (GenerationMetrics, optional): A metrics object that is filled in once the stream
+                                                   is exhausted. Defaults to None.
+
+        Yields:
+            str: The generated content chunks.
+
+        Raises:
+            Exception: If the API call to the LLM server fails.
+        """
+        self.logger.info(f"Generating with model {model}")
+
+        try:
+            client = self.get_openai_client()
+            messages = self._build_messages(prompt, system_prompt, context)
+            async for content in self._stream_chunks(client, messages, model, max_tokens, temperature, metrics):
+                yield content
+
+        except Exception as e:
+            self.logger.error(f"Error calling LLM API at {self.api_endpoint}: {str(e)}", exc_info=True)
+            raise
+
+    async def stream_chat(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, metrics: GenerationMetrics = None) -> AsyncIterator[str]:
+        """
+        Sends a list of messages (conversation history) to the LLM server and yields
+        the generated content chunk by chunk.
+
+        Args:
+            messages (List[dict]): A list of message dictionaries with "role" and "content" keys.
+            model (str): The name of the model to use for chat completion. Defaults to Constants.DEFAULT_MODEL.
+            max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            metrics (GenerationMetrics, optional): A metrics object that is filled in once the stream
+                                                   is exhausted. Defaults to None.
+
+        Yields:
+            str: The generated content chunks.
+
+        Raises:
+            Exception: If the API call to the LLM server fails.
+        """
+        self.logger.info(f"Generating chat completion with model {model}")
+
+        try:
+            client = self.get_openai_client()
+            async for content in self._stream_chunks(client, messages, model, max_tokens, temperature, metrics):
+                yield content
+
+        except Exception as e:
+            self.logger.error(f"Error calling LLM API at {self.api_endpoint}: {str(e)}", exc_info=True)
+            raise
+
+    async def send_batch(self, prompts: List[str], model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None) -> List[Tuple[str, GenerationMetrics]]:
+        """
+        Sends multiple prompts concurrently, bounded by max_concurrent_requests.
+        Every result comes with the metrics of its generation.
+
+        Args:
+            prompts (List[str]): The prompts to send.
+            model (str): The name of the model to use for generation. Defaults to Constants.DEFAULT_MODEL.
+            context (List[str], optional): List of context strings to prepend to every prompt. Defaults to None.
+            max_tokens (int): The maximum number of tokens to generate per response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            system_prompt (str, optional): A system prompt used for every prompt (Default: None)
+
+        Returns:
+            List[Tuple[str, GenerationMetrics]]: The generated contents and their metrics
+                                                 in the same order as the prompts.
+
+        Raises:
+            Exception: If any of the API calls fails.
+        """
+        async def send(prompt: str) -> Tuple[str, GenerationMetrics]:
+            metrics = GenerationMetrics()
+            content = await self.send(prompt, model=model, context=context, max_tokens=max_tokens,
+                                      temperature=temperature, system_prompt=system_prompt, metrics=metrics)
+            return content, metrics
+
+        return await asyncio.gather(*[send(prompt) for prompt in prompts])
+
+    async def _stream_chunks(self, client: AsyncOpenAI, messages: List[dict], model: str, max_tokens: int = 2000, temperature: float = 0.7, metrics: GenerationMetrics = None) -> AsyncIterator[str]:
+        """
+        Streams the response from the LLM chunk by chunk and fills in the generation metrics.
+        The semaphore is held until the stream is exhausted.
+
+        Args:
+            client (AsyncOpenAI): The AsyncOpenAI client instance.
+            messages (List[dict]): A list of message dictionaries for chat completion.
+            model (str): The name of the model to use for generation.
+            max_tokens (int): The maximum number of tokens to generate. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            metrics (GenerationMetrics, optional): The metrics object to fill in. Defaults to None.
+
+        Yields:
+            str: The generated content chunks.
+        """
+        metrics = self._start_metrics(metrics, model)
+
+        # the sqlite cache blocks, it is queried on a worker thread instead of the event loop
+        cache_key, cached_content = None, None
+        if self.get_response_cache() is not None:
+            cache_key, cached_content = await asyncio.to_thread(
+                self._lookup_cached_response, messages, model, max_tokens, temperature)
+        if cached_content is not None:
+            self._finish_cached_metrics(metrics, cached_content)
+            yield cached_content
+            return
+
+        response_parts = [] if cache_key else None
+        async with self._get_semaphore():
+            # restart the clock: waiting for a free slot is not part of the generation
+            metrics.start_time = time.time()
+            self.logger.info("Streaming generation ...")
+
+            stream = await client.chat.completions.create(**self._build_stream_request(messages, model, max_tokens, temperature))
+
+            async for chunk in stream:
+                content = self._process_chunk(chunk, metrics)
+                if content:
+                    if response_parts is not None:
+                        response_parts.append(content)
+                    yield content
+
+            metrics.end_time = time.time()
+
+        metrics.estimate_usage(messages)
+
+        self._log_generation_metrics(metrics)
+        if response_parts is not None:
+            await asyncio.to_thread(self._store_cached_response, cache_key, "".join(response_parts))
+
+    def _start_metrics(self, metrics: Optional[GenerationMetrics], model: str) -> GenerationMetrics:
+        """
+        Prepares the metrics object for a new generation. Unlike LLMApi it is not exposed
+        as last_metrics, concurrent generations would overwrite each other.
+
+        Args:
+            metrics (GenerationMetrics, optional): A caller provided metrics object.
+            model (str): The name of the model used for the generation.
+
+        Returns:
+            GenerationMetrics: The metrics object to fill in.
+        """
+        if metrics is None:
+            metrics = GenerationMetrics()
+        metrics.model = model
+        metrics.api_endpoint = self.api_endpoint
+        metrics.start_time = time.time()
+        return metrics
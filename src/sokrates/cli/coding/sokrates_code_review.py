@@ -54,6 +54,8 @@ def main():
                         help='Sampling temperature for responses (default: 0.7)')
     parser.add_argument('--max-tokens', '-mt', type=int, default=30000,
                         help='The maximum number of output tokens for a review (default: 30000)')
+    parser.add_argument('--no-cache', action='store_true', default=False,
+                        help='Bypass the response cache (only relevant if cache.enabled is set in the configuration)')
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -68,6 +70,7 @@ def main():
     model = Helper.get_provider_value('model', config, args, 'default_model')
 
     Helper.print_configuration_section(config=config, args=args)
+    Helper.configure_response_cache(config=config, no_cache=args.no_cache)
     
     # Validate arguments
     if not args.source_directory and not args.files:
@@ -1,8 +1,12 @@
-from typing import Any
+from typing import Any, Optional
 from sokrates import FileHelper
 from sokrates import OutputPrinter
 from sokrates import Colors
 from sokrates.config import Config
+from sokrates.response_cache import ResponseCache
+from sokrates.refinement_cache import RefinementCache
+from sokrates.client_registry import ClientRegistry
+from sokrates.llm_api import LLMApi
 
 class Helper:
 
@@ -12,8 +16,55 @@ class Helper:
         config.load_from_file(
             config_filepath=config.get('config_path')
         )
+        Helper.configure_http_client_pool(config)
+        LLMApi.set_default_stream_usage(config.get('llm.stream_usage'))
         return config
+
+    @staticmethod
+    def configure_http_client_pool(config: Config) -> None:
+        """
+        Applies the limits of the `http` configuration section to the shared connection pool.
+
+        Args:
+            config: The loaded configuration
+        """
+        ClientRegistry.configure(
+            max_connections=config.get('http.max_connections'),
+            max_keepalive_connections=config.get('http.max_keepalive_connections'),
+            keepalive_expiry=config.get('http.keepalive_expiry')
+        )
     
+    @staticmethod
+    def configure_response_cache(config: Config, no_cache: bool = False) -> Optional[ResponseCache]:
+        """
+        Registers the process-wide response cache if it is enabled in the configuration,
+        and the refinement cache if `cache.refinements` is enabled.
+
+        Args:
+            config: The loaded configuration
+            no_cache: Set to True to bypass the cache (e.g. from a --no-cache cli flag)
+
+        Returns:
+            The registered ResponseCache or None if caching is disabled
+        """
+        refinement_cache = None if no_cache else RefinementCache.from_config(config)
+        RefinementCache.set_default(refinement_cache)
+        if refinement_cache is not None:
+            OutputPrinter.print_info("refinement cache", refinement_cache.db_path)
+
+        if no_cache or not config.get('cache.enabled'):
+            ResponseCache.set_default(None)
+            return None
+
+        cache = ResponseCache(
+            db_path=config.get('cache_path') / 'responses.sqlite',
+            ttl_seconds=config.get('cache.ttl_seconds'),
+            max_size_bytes=int(config.get('cache.max_size_mb') * 1024 * 1024)
+        )
+        ResponseCache.set_default(cache)
+        OutputPrinter.print_info("response cache", cache.db_path)
+        return cache
+
     @staticmethod
     def get_provider_value(key, config: Config, args, key_in_provider_config=None):
         if key_in_provider_config == None:
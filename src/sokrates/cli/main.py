@@ -56,7 +56,7 @@ COMMAND_CATEGORIES: 'OrderedDict[str, list[str]]' = OrderedDict([
     ('Prompts', ['send-prompt', 'refine-prompt', 'refine-and-send-prompt']),
     ('Workflows', ['idea-generator', 'merge-ideas', 'generate-mantra', 'breakdown-task', 'execute-tasks']),
     ('Code Analysis', ['code-review', 'code-analyze', 'code-summarize', 'code-generate-tests']),
-    ('Task Queue', ['task-add', 'task-list', 'task-status', 'task-remove', 'daemon']),
+    ('Task Queue', ['task-add', 'task-list', 'task-status', 'task-remove', 'task-compact', 'daemon']),
     ('Interactive', ['chat', 'guide']),
     ('Utilities', ['list-models', 'fetch-to-md']),
 ])
@@ -434,6 +434,13 @@ _COMMAND_REGISTRY: list[tuple[str, str, str, str, str]] = [
         'Remove a task from the background processing queue.',
         '  sokrates task-remove --task-id 42',
     ),
+    (
+        'task-compact',
+        'sokrates.cli.task_queue.sokrates_task_compact',
+        'main',
+        'Archive old finished tasks and vacuum the task queue database.',
+        '  sokrates task-compact --max-age-days 30\n  sokrates task-compact --dry-run',
+    ),
     (
         'daemon',
         'sokrates.cli.task_queue.sokrates_daemon',
@@ -14,6 +14,9 @@ Options:
     --model MODEL             The model to use for task execution
     --output-directory DIR    Output directory for saving results
     --no-refinement           Per default the task prompts are refined before execution. This disables this feature and executes them directly without refinement.
+    --no-cache                Bypass the response cache
+    --provider-pool POOL      Spread the requests across the providers of a configured provider pool
+    --subtask-concurrency N   Maximum number of independent subtasks executed in parallel (default: 1)
     --verbose                 Enable verbose output with debug information
 
 Example:
@@ -28,6 +31,8 @@ from sokrates.cli.output_printer import OutputPrinter
 from sokrates.file_helper import FileHelper
 from sokrates.config import Config
 from sokrates.cli.helper import Helper
+from sokrates.provider_pool import ProviderPool
+from sokrates.constants import Constants
 from pathlib import Path
 
 def main():
@@ -45,7 +50,7 @@ def main():
     """
     # Set up argument parser
     parser = argparse.ArgumentParser(
-        description='Executes tasks defined in a JSON file sequentially.',
+        description='Executes tasks defined in a JSON file, independent subtasks optionally in parallel.',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
 
@@ -56,6 +61,13 @@ def main():
         help="The provider to list models for."
     )
 
+    parser.add_argument(
+        '--provider-pool',
+        required=False,
+        default=None,
+        help="Name of a provider pool (provider_pools in config.yml) to spread the requests across."
+    )
+
     parser.add_argument(
         '--task-file', '-tf',
         required=True,
@@ -95,6 +107,13 @@ def main():
         help='Output directory to save the results to (defaults to: $HOME/.sokrates/tasks/results/YY-MM-DD_H-M)'
     )
 
+    parser.add_argument(
+        '--subtask-concurrency', '-c',
+        type=int,
+        default=Constants.DEFAULT_SUBTASK_CONCURRENCY,
+        help='Maximum number of independent subtasks executed in parallel. Subtasks wait for the subtasks listed in their depends_on field (default: 1)'
+    )
+
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -108,6 +127,13 @@ def main():
         help='Disable refinement before task execution'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        default=False,
+        help='Bypass the response cache (only relevant if cache.enabled is set in the configuration)'
+    )
+
     # Parse arguments
     args = parser.parse_args()
     config = Helper.load_config()
@@ -123,6 +149,7 @@ def main():
         sys.exit(1)
 
     Helper.print_configuration_section(config=config, args=args)
+    Helper.configure_response_cache(config=config, no_cache=args.no_cache)
     
     # prepare and configure target directory    
     target_directory = FileHelper.create_and_return_task_execution_directory(args.output_directory)
@@ -133,6 +160,11 @@ def main():
     task_file_copy_full_path  = Path(target_directory) / task_file_name
     FileHelper.copy_file(args.task_file,task_file_copy_full_path)
     refinement_prompt_path = (config.get('prompts_directory') / "refine-prompt.md").resolve()
+
+    llm_api = None
+    if args.provider_pool:
+        llm_api = ProviderPool.from_config(config, args.provider_pool)
+        OutputPrinter.print_info("Provider pool", f"{args.provider_pool} ({llm_api.api_endpoint})")
     
     # Initialize executor
     executor = SequentialTaskExecutor(
@@ -142,7 +174,9 @@ def main():
         refinement_prompt_path=refinement_prompt_path,
         temperature=temperature,
         output_dir=target_directory,
-        refinement_enabled=refinement_enabled
+        refinement_enabled=refinement_enabled,
+        llm_api=llm_api,
+        subtask_concurrency=args.subtask_concurrency
     )
 
     try:
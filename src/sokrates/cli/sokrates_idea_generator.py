@@ -115,6 +115,13 @@ def parse_arguments() -> argparse.Namespace:
         default=1
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        default=False,
+        help='Bypass the response cache (only relevant if cache.enabled is set in the configuration)'
+    )
+
     return parser.parse_args()
 
 def main():
@@ -133,6 +140,7 @@ def main():
     refinement_llm_model = Helper.get_provider_value('refinement_llm_model', config, args, 'default_model')
 
     Helper.print_configuration_section(config=config, args=args)
+    Helper.configure_response_cache(config=config, no_cache=args.no_cache)
 
     OutputPrinter.print_info("idea-count", args.idea_count)
     OutputPrinter.print_info("topic", args.topic)
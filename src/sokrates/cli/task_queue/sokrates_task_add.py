@@ -3,23 +3,37 @@
 CLI Interface for Adding Tasks to Queue
 
 This script provides a command-line interface for adding tasks to the task queue system.
-It uses the TaskQueueManager class to add tasks from JSON files.
+It uses the TaskQueueManager class to add tasks from JSON files. Whole directories
+and JSONL manifests are added in a single transaction.
 
 Usage:
     python queue_add.py --task-file <file_path> [options]
+    python queue_add.py --dir <directory> [options]
+    python queue_add.py --manifest <manifest.jsonl> [options]
 
 Options:
     --task-file, -tf: Path to the JSON file containing the task definition
+    --dir, -d: Add all JSON task files of a directory
+    --manifest, -m: Add the task files listed in a JSONL manifest, one
+                    {"task_file": ..., "priority": ..., "description": ...} object per line
     --priority, -p: Set task priority (values: high, normal, low)
+    --on-duplicate: Handling of task files whose content is already queued
+                    (values: reject, coalesce, link, default: task_queue.duplicate_policy)
     --verbose, -v: Enable verbose output with debug information
 
+Invalid entries of a directory or manifest are reported and skipped, the exit
+code is 1 if any entry was rejected.
+
 Example:
     python queue_add.py --task-file tasks/new_task.json --priority high --verbose
+    python queue_add.py --manifest tasks.jsonl
 """
 
 import argparse
 import sys
 from sokrates.task_queue.manager import TaskQueueManager
+from sokrates.task_queue.orm import Task
+from sokrates.task_queue.wakeup import DaemonWakeup
 from sokrates.cli.colors import Colors
 from sokrates.cli.output_printer import OutputPrinter
 from sokrates.cli.helper import Helper
@@ -32,21 +46,37 @@ def main():
     """
     # Set up argument parser
     parser = argparse.ArgumentParser(
-        description='Adds a task from a JSON file to the processing queue.',
+        description='Adds tasks from JSON files to the processing queue.',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
 
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         '--task-file', '-tf',
-        required=True,
         help='Path to the JSON file containing tasks'
     )
+    source.add_argument(
+        '--dir', '-d',
+        help='Add all JSON task files of this directory in one transaction'
+    )
+    source.add_argument(
+        '--manifest', '-m',
+        help='Add the task files listed in this JSONL manifest in one transaction'
+    )
 
     parser.add_argument(
         '--priority', '-p',
         choices=['high', 'normal', 'low'],
         default='normal',
-        help='Priority level for the task (default: normal)'
+        help='Priority level for the task (default: normal, manifest lines may set their own)'
+    )
+
+    parser.add_argument(
+        '--on-duplicate',
+        choices=Task.DUPLICATE_POLICIES,
+        default=None,
+        help='Handling of task files whose content is already queued: reject, coalesce into the queued task '
+             'or link to its result (default: task_queue.duplicate_policy)'
     )
 
     parser.add_argument(
@@ -62,28 +92,82 @@ def main():
     if args.verbose:
         print(f"{Colors.BRIGHT_BLUE}Starting task addition process...{Colors.RESET}")
 
+    manager = None
     try:
         # Initialize TaskQueueManager
         manager = TaskQueueManager(config=config)
 
-        # Add task to queue
-        task_id = manager.add_task_from_file(
-            task_file_path=args.task_file,
-            priority=args.priority
-        )
+        if args.dir or args.manifest:
+            add_tasks_in_bulk(manager, config, args)
+            return
 
-        OutputPrinter.print_success(f"Task added successfully with ID: {task_id}")
+        # Add task to queue
+        result = manager.add_tasks_from_files([{"task_file": args.task_file}], priority=args.priority,
+                                              duplicate_policy=args.on_duplicate)
+        if result['errors']:
+            raise ValueError(result['errors'][0]['error'])
+        added = result['added'][0]
+
+        if added['duplicate_of'] == added['task_id']:
+            OutputPrinter.print_success(f"Task file is already queued with ID: {added['task_id']}")
+            return
+        if added['duplicate_of']:
+            OutputPrinter.print_success(f"Task added with ID: {added['task_id']}, "
+                                        f"linked to the result of task {added['duplicate_of']}")
+            return
+        OutputPrinter.print_success(f"Task added successfully with ID: {added['task_id']}")
+
+        # start processing right away instead of waiting for the next polling cycle
+        notified = DaemonWakeup.notify(config.get('daemon.wakeup_socket_directory'))
         if args.verbose:
             print(f"{Colors.GREEN}Task details:{Colors.RESET}")
             print(f"- File: {args.task_file}")
             print(f"- Priority: {args.priority}")
+            print(f"- Notified daemons: {notified}")
 
     except Exception as e:
         OutputPrinter.print_error(f"Error adding task: {str(e)}")
         sys.exit(1)
 
     finally:
-        manager.close()
+        if manager is not None:
+            manager.close()
+
+def add_tasks_in_bulk(manager: TaskQueueManager, config, args):
+    """
+    Adds all tasks of a directory or manifest and reports the rejected entries.
+
+    Raises:
+        SystemExit: With exit code 1 if any entry was rejected
+    """
+    if args.dir:
+        result = manager.add_tasks_from_directory(args.dir, priority=args.priority,
+                                                  duplicate_policy=args.on_duplicate)
+    else:
+        result = manager.add_tasks_from_manifest(args.manifest, priority=args.priority,
+                                                 duplicate_policy=args.on_duplicate)
+
+    if result['added']:
+        # with coalesce and link the task IDs are not a contiguous range
+        coalesced = sum(1 for added in result['added'] if added['duplicate_of'] == added['task_id'])
+        linked = sum(1 for added in result['added'] if added['duplicate_of'] and added['duplicate_of'] != added['task_id'])
+        new = len(result['added']) - coalesced - linked
+        OutputPrinter.print_success(f"Added {new} new tasks, {linked} linked to queued tasks, "
+                                    f"{coalesced} already queued")
+        notified = DaemonWakeup.notify(config.get('daemon.wakeup_socket_directory')) if new else 0
+        if args.verbose:
+            for added in result['added']:
+                duplicate = f" (duplicate of task {added['duplicate_of']})" if added['duplicate_of'] else ""
+                print(f"- {added['task_id']}: {added['source']}{duplicate}")
+            print(f"- Notified daemons: {notified}")
+
+    for error in result['errors']:
+        OutputPrinter.print_error(f"{error['source']}: {error['error']}")
+    if result['errors']:
+        OutputPrinter.print_error(f"Rejected {len(result['errors'])} entries")
+        sys.exit(1)
+    if not result['added']:
+        print(f"{Colors.YELLOW}No task files found.{Colors.RESET}")
 
 if __name__ == "__main__":
     try:
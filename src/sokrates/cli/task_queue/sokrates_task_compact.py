@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+CLI Interface for Compacting the Task Queue Database
+
+This script applies the retention policy of the task queue: completed, failed and linked
+tasks older than the maximum age are archived with their history to a gzip
+compressed JSONL file and removed from the database, the history of the
+remaining tasks is trimmed and the database file is vacuumed.
+
+Usage:
+    python queue_compact.py [options]
+
+Options:
+    --max-age-days, -a: Archive finished tasks not updated for this many days (default: task_retention.max_age_days)
+    --max-history, -mh: History entries kept per task (default: task_retention.max_history_per_task)
+    --archive-directory, -o: Directory for the archive files (default: $HOME/.sokrates/archive)
+    --no-vacuum: Skip the VACUUM of the database file
+    --dry-run: Only show what would be archived
+    --verbose, -v: Enable verbose output with debug information
+
+Example:
+    python queue_compact.py --max-age-days 7 --dry-run
+"""
+
+import argparse
+import sys
+from sokrates.task_queue.manager import TaskQueueManager
+from sokrates.task_queue.compactor import TaskCompactor
+from sokrates.cli.colors import Colors
+from sokrates.cli.output_printer import OutputPrinter
+from sokrates.cli.helper import Helper
+
+def main():
+    """
+    Main function to compact the task queue database.
+
+    Sets up argument parsing, applies the retention policy and reports the result.
+    """
+    # Set up argument parser
+    parser = argparse.ArgumentParser(
+        description='Archives old finished tasks, trims the task history and vacuums the task queue database.',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        '--max-age-days', '-a',
+        type=float,
+        default=None,
+        help='Archive completed, failed and linked tasks not updated for this many days (default: task_retention.max_age_days)'
+    )
+
+    parser.add_argument(
+        '--max-history', '-mh',
+        type=int,
+        default=None,
+        help='Number of history entries kept per task (default: task_retention.max_history_per_task)'
+    )
+
+    parser.add_argument(
+        '--archive-directory', '-o',
+        default=None,
+        help='Directory for the archive files (default: task_retention.archive_directory)'
+    )
+
+    parser.add_argument(
+        '--no-vacuum',
+        action='store_true',
+        default=False,
+        help='Skip the VACUUM of the database file'
+    )
+
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        default=False,
+        help='Only show what would be archived'
+    )
+
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose output with debug information'
+    )
+
+    # Parse arguments
+    args = parser.parse_args()
+    config = Helper.load_config()
+
+    max_age_days = args.max_age_days if args.max_age_days is not None else config.get('task_retention.max_age_days')
+    max_history = args.max_history if args.max_history is not None else config.get('task_retention.max_history_per_task')
+    archive_directory = args.archive_directory or config.get('task_retention.archive_directory')
+
+    if args.verbose:
+        print(f"{Colors.BRIGHT_BLUE}Compacting task queue database {config.get('database_path')}...{Colors.RESET}")
+        print(f"- Max age: {max_age_days} days")
+        print(f"- Max history entries per task: {max_history}")
+        print(f"- Archive directory: {archive_directory}")
+
+    manager = None
+    try:
+        manager = TaskQueueManager(config=config)
+        compactor = TaskCompactor(manager.db, archive_directory)
+        result = compactor.compact(
+            max_age_days=max_age_days,
+            max_history_per_task=max_history,
+            vacuum=not args.no_vacuum,
+            dry_run=args.dry_run
+        )
+
+        if args.dry_run:
+            OutputPrinter.print_info("Tasks to archive", result['archived_tasks'])
+            OutputPrinter.print_info("History entries to trim", result['trimmed_history'])
+            return
+
+        if not result['archive_file']:
+            OutputPrinter.print_success("Nothing to compact")
+            return
+
+        OutputPrinter.print_success(f"Archived {result['archived_tasks']} tasks and trimmed "
+                                    f"{result['trimmed_history']} history entries")
+        OutputPrinter.print_info("Archive file", result['archive_file'])
+        OutputPrinter.print_info("Database size",
+                                 f"{result['database_size_before'] / 1024:.0f} KB -> {result['database_size_after'] / 1024:.0f} KB")
+
+    except Exception as e:
+        OutputPrinter.print_error(f"Error compacting task queue: {str(e)}")
+        sys.exit(1)
+
+    finally:
+        if manager is not None:
+            manager.close()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}Process interrupted by user{Colors.RESET}")
+        sys.exit(0)
+    except Exception as e:
+        print(f"{Colors.RED}Unexpected error: {str(e)}{Colors.RESET}")
+        sys.exit(1)
@@ -9,20 +9,39 @@ Usage:
     python queue_list.py [options]
 
 Options:
-    --status, -s: Filter by status (values: pending, in_progress, completed, failed)
+    --status, -s: Filter by status (values: pending, in_progress, completed, failed, linked)
     --priority, -p: Filter by priority (values: high, normal, low)
+    --created-after: Only tasks created at or after this date or time (ISO 8601, UTC)
+    --created-before: Only tasks created before this date or time (ISO 8601, UTC)
+    --limit, -l: Number of tasks per page (default: 50)
+    --after: Show the page after this task id (printed at the end of each page)
+    --newest-first: Show the newest tasks first
+
+Filtering and pagination run in the database, so listing stays fast for large queues.
 
 Example:
     python queue_list.py --status pending --priority high
+    python queue_list.py --status completed --after 1200
 """
 
 import argparse
 import sys
+from datetime import datetime, timezone
 from sokrates.task_queue.manager import TaskQueueManager
 from sokrates.cli.colors import Colors
 from sokrates.cli.output_printer import OutputPrinter
 from sokrates.cli.helper import Helper
 
+def parse_timestamp(value: str) -> datetime:
+    """Parses an ISO 8601 date or time for argparse, times without timezone are UTC"""
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date or time: {value} (expected ISO 8601, e.g. 2026-01-31 or 2026-01-31T12:00)")
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
 def main():
     """
     Main function to list queued tasks.
@@ -38,7 +57,7 @@ def main():
 
     parser.add_argument(
         '--status', '-s',
-        choices=['pending', 'in_progress', 'completed', 'failed'],
+        choices=['pending', 'in_progress', 'completed', 'failed', 'linked'],
         help='Filter tasks by status'
     )
 
@@ -48,31 +67,56 @@ def main():
         help='Filter tasks by priority'
     )
 
+    parser.add_argument(
+        '--created-after',
+        type=parse_timestamp,
+        help='Only tasks created at or after this date or time (ISO 8601, UTC)'
+    )
+
+    parser.add_argument(
+        '--created-before',
+        type=parse_timestamp,
+        help='Only tasks created before this date or time (ISO 8601, UTC)'
+    )
+
+    parser.add_argument(
+        '--limit', '-l',
+        type=int,
+        default=50,
+        help='Number of tasks per page (default: 50)'
+    )
+
+    parser.add_argument(
+        '--after',
+        type=int,
+        default=None,
+        help='Show the page after this task id'
+    )
+
+    parser.add_argument(
+        '--newest-first',
+        action='store_true',
+        help='Show the newest tasks first'
+    )
+
     # Parse arguments
     args = parser.parse_args()
     config = Helper.load_config()
 
+    manager = None
     try:
         # Initialize TaskQueueManager
         manager = TaskQueueManager(config=config)
 
-        # Build query parameters based on filters
-        query_params = {}
-        if args.status:
-            query_params['status'] = args.status
-        if args.priority:
-            query_params['priority'] = args.priority
-
-        # Get tasks from queue (for now, get all - we'll implement filtering in the manager later)
-        tasks = manager.get_all_tasks()
-
-        # TODO: do this on db level
-        # Filter tasks based on arguments
-        filtered_tasks = tasks
-        if args.status and args.status != 'all':
-            filtered_tasks = [t for t in tasks if t.status == args.status]
-        if args.priority and args.priority != 'all':
-            filtered_tasks = [t for t in tasks if t.priority == args.priority]
+        filtered_tasks = manager.list_tasks(
+            status=args.status,
+            priority=args.priority,
+            created_after=args.created_after,
+            created_before=args.created_before,
+            after_id=args.after,
+            limit=args.limit,
+            newest_first=args.newest_first
+        )
 
         # Display tasks
         OutputPrinter.print_section("TASKS", Colors.BRIGHT_BLUE, "=")
@@ -85,7 +129,8 @@ def main():
                     'pending': Colors.YELLOW,
                     'in_progress': Colors.BLUE,
                     'completed': Colors.GREEN,
-                    'failed': Colors.RED
+                    'failed': Colors.RED,
+                    'linked': Colors.CYAN
                 }.get(task.status, Colors.WHITE)
 
                 
@@ -99,15 +144,23 @@ def main():
                 print(f"    {Colors.BRIGHT_BLUE}Output Directory:{Colors.RESET} {task.output_directory}")
                 print(f"    {Colors.BRIGHT_BLUE}Created:{Colors.RESET} {task.created_at}")
                 print(f"    {Colors.BRIGHT_BLUE}Updated:{Colors.RESET} {task.updated_at}")
+                if task.next_attempt_at:
+                    print(f"    {Colors.BRIGHT_BLUE}Next Attempt:{Colors.RESET} {task.next_attempt_at} "
+                          f"(after {task.attempts} failed attempts, last error: {task.last_error})")
 
-        OutputPrinter.print(f"Total tasks: {len(filtered_tasks)}")
+        counts = manager.count_tasks_by_status()
+        OutputPrinter.print(f"Total tasks: {sum(counts.values())} "
+                            f"({', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))})")
+        if len(filtered_tasks) == args.limit:
+            OutputPrinter.print(f"Next page: --after {filtered_tasks[-1].task_id}")
 
     except Exception as e:
         OutputPrinter.print_error(f"Error listing tasks: {str(e)}")
         sys.exit(1)
 
     finally:
-        manager.close()
+        if manager is not None:
+            manager.close()
 
 if __name__ == "__main__":
     try:
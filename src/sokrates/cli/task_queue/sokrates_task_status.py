@@ -3,7 +3,8 @@
 CLI Interface for Checking Task Status
 
 This script provides a command-line interface for checking the status of tasks in the task queue system.
-It uses the TaskQueueManager class to retrieve detailed task information.
+It uses the TaskQueueManager class to retrieve detailed task information,
+including the recorded performance (tokens, time to first token, wall time) of every attempt and subtask.
 
 Usage:
     python queue_status.py <task_id> [options]
@@ -18,10 +19,23 @@ Example:
 import argparse
 import sys
 from sokrates.task_queue.manager import TaskQueueManager
+from sokrates.task_queue.status_tracker import StatusTracker
 from sokrates.cli.colors import Colors
 from sokrates.cli.output_printer import OutputPrinter
 from sokrates.cli.helper import Helper
 
+def format_metrics(metrics: dict) -> str:
+    """Formats a task or subtask metric record as a single line"""
+    def seconds(value):
+        return f"{value:.2f}s" if value is not None else "-"
+
+    estimated = " (estimated)" if metrics['usage_estimated'] else ""
+    return (f"wall time {seconds(metrics['wall_time'])}, "
+            f"{metrics['generations']} generations in {seconds(metrics['generation_time'])}, "
+            f"time to first token {seconds(metrics['time_to_first_token'])}, "
+            f"tokens {metrics['prompt_tokens'] or 0} prompt / {metrics['completion_tokens'] or 0} completion{estimated}, "
+            f"model {metrics['model'] or '-'} @ {metrics['provider'] or '-'}")
+
 def main():
     """
     Main function to check task status.
@@ -57,9 +71,7 @@ def main():
         # Initialize TaskQueueManager
         manager = TaskQueueManager(config=config)
 
-        # Get all tasks to find the specific one (we'll implement direct lookup later)
-        all_tasks = manager.get_all_tasks()
-        task = next((t for t in all_tasks if t['task_id'] == args.task_id), None)
+        task = StatusTracker(manager).get_status(args.task_id)
 
         if not task:
             OutputPrinter.print_error(f"Task {args.task_id} not found")
@@ -72,20 +84,46 @@ def main():
             'pending': Colors.YELLOW,
             'in_progress': Colors.BLUE,
             'completed': Colors.GREEN,
-            'failed': Colors.RED
-        }.get(task['status'], Colors.WHITE)
-
-        print(f"{Colors.BRIGHT_WHITE}Status:{Colors.RESET} {status_color}{task['status'].upper()}{Colors.RESET}")
-        print(f"{Colors.BRIGHT_WHITE}Priority:{Colors.RESET} {Colors.CYAN}{task['priority'].upper()}{Colors.RESET}")
-        print(f"{Colors.BRIGHT_WHITE}Description:{Colors.RESET} {task['description']}")
-        print(f"{Colors.BRIGHT_WHITE}File Path:{Colors.RESET} {task['file_path']}")
-        print(f"{Colors.BRIGHT_WHITE}Created:{Colors.RESET} {task['created_at']}")
-        print(f"{Colors.BRIGHT_WHITE}Updated:{Colors.RESET} {task['updated_at']}")
-
-        if task['status'] == 'completed':
-            print(f"{Colors.GREEN}Result:{Colors.RESET} {task.get('result', 'No result available')}")
-        elif task['status'] == 'failed':
-            print(f"{Colors.RED}Error:{Colors.RESET} {task.get('error_message', 'No error details available')}")
+            'failed': Colors.RED,
+            'linked': Colors.CYAN
+        }.get(task.status, Colors.WHITE)
+
+        print(f"{Colors.BRIGHT_WHITE}Status:{Colors.RESET} {status_color}{task.status.upper()}{Colors.RESET}")
+        print(f"{Colors.BRIGHT_WHITE}Priority:{Colors.RESET} {Colors.CYAN}{task.priority.upper()}{Colors.RESET}")
+        print(f"{Colors.BRIGHT_WHITE}Description:{Colors.RESET} {task.description}")
+        print(f"{Colors.BRIGHT_WHITE}Type:{Colors.RESET} {task.task_type}")
+        print(f"{Colors.BRIGHT_WHITE}File Path:{Colors.RESET} {task.file_path}")
+        print(f"{Colors.BRIGHT_WHITE}Created:{Colors.RESET} {task.created_at}")
+        print(f"{Colors.BRIGHT_WHITE}Updated:{Colors.RESET} {task.updated_at}")
+        print(f"{Colors.BRIGHT_WHITE}Attempts:{Colors.RESET} {task.attempts}")
+        if task.next_attempt_at:
+            print(f"{Colors.BRIGHT_WHITE}Next Attempt:{Colors.RESET} {task.next_attempt_at}")
+            print(f"{Colors.YELLOW}Last Error:{Colors.RESET} {task.last_error}")
+
+        if task.status == 'linked':
+            # a duplicate task file: the result is the one of the original task
+            print(f"{Colors.BRIGHT_WHITE}Linked To:{Colors.RESET} task {task.duplicate_of_id} (same task file content)")
+            original = StatusTracker(manager).get_status(task.duplicate_of_id)
+            if original is None:
+                print(f"{Colors.YELLOW}The linked task no longer exists{Colors.RESET}")
+            else:
+                task = original
+                print(f"{Colors.BRIGHT_WHITE}Linked Status:{Colors.RESET} {task.status.upper()}")
+                if task.output_directory:
+                    print(f"{Colors.BRIGHT_WHITE}Output Directory:{Colors.RESET} {task.output_directory}")
+
+        if task.status == 'completed':
+            print(f"{Colors.GREEN}Result:{Colors.RESET} {task.result or 'No result available'}")
+        elif task.status == 'failed':
+            print(f"{Colors.RED}Error:{Colors.RESET} {task.error_message or 'No error details available'}")
+
+        metrics = manager.get_task_metrics(task.task_id)
+        if metrics:
+            print(f"\n{Colors.BRIGHT_BLUE}Performance:{Colors.RESET}")
+            for metric in metrics:
+                print(f"{Colors.BRIGHT_WHITE}Attempt {metric['attempt']}:{Colors.RESET} {metric['status']} - {format_metrics(metric)}")
+                for subtask in metric['subtasks']:
+                    print(f"  Subtask {subtask['subtask_id']}: {subtask['status']} - {format_metrics(subtask)}")
 
         if args.verbose:
             # In a real implementation, we would show more detailed logs here
@@ -0,0 +1,194 @@
+# This script defines the `ClientRegistry` class, a process-wide registry of
+# OpenAI clients keyed by API endpoint and key. All registered clients share a
+# single `httpx` connection pool, so TCP/TLS connections are kept alive and
+# reused across `LLMApi` instances, workflows and tasks instead of being
+# re-established for every new client. `AsyncLLMApi` clients share one async
+# connection pool per event loop with the same limits.
+
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from .constants import Constants
+
+class ClientRegistry:
+    """
+    Process-wide registry of OpenAI clients sharing one HTTP connection pool.
+
+    The pool limits are set via configure() (from the `http` configuration
+    section) and apply to the shared httpx client created on first use.
+    Async connections are bound to their event loop, so AsyncOpenAI clients
+    share one httpx.AsyncClient per event loop.
+    """
+
+    _lock = threading.Lock()
+    _http_client = None
+    _clients = {}
+    # per event loop: the shared httpx.AsyncClient and the AsyncOpenAI clients using it
+    _async_pools = {}
+    _client_lookups = {}
+    _limits = {
+        "max_connections": Constants.DEFAULT_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": Constants.DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": Constants.DEFAULT_HTTP_KEEPALIVE_EXPIRY_SECONDS
+    }
+
+    logger = logging.getLogger(f"{__name__}.ClientRegistry")
+
+    @classmethod
+    def configure(cls, max_connections: Optional[int] = None,
+                  max_keepalive_connections: Optional[int] = None,
+                  keepalive_expiry: Optional[float] = None) -> None:
+        """
+        Sets the limits of the shared connection pool.
+        An already created pool is closed and recreated with the new limits on next use.
+
+        Args:
+            max_connections (int, optional): Maximum number of concurrent connections.
+            max_keepalive_connections (int, optional): Maximum number of idle connections kept alive.
+            keepalive_expiry (float, optional): Seconds an idle connection is kept alive.
+        """
+        with cls._lock:
+            limits = dict(cls._limits)
+            if max_connections is not None:
+                limits["max_connections"] = max_connections
+            if max_keepalive_connections is not None:
+                limits["max_keepalive_connections"] = max_keepalive_connections
+            if keepalive_expiry is not None:
+                limits["keepalive_expiry"] = keepalive_expiry
+            if limits != cls._limits:
+                cls._limits = limits
+                cls._reset()
+
+    @classmethod
+    def get_client(cls, api_endpoint: str, api_key: str, timeout: Optional[float] = None, client_class: type = OpenAI) -> OpenAI:
+        """
+        Returns the shared OpenAI client for the endpoint and key, creating it if needed.
+
+        Args:
+            api_endpoint (str): The URL of the LLM API endpoint.
+            api_key (str): The API key for authentication.
+            timeout (float, optional): Request timeout in seconds. Defaults to the openai client default.
+            client_class (type): The synchronous OpenAI client class to instantiate. Defaults to OpenAI.
+
+        Returns:
+            OpenAI: The shared client instance.
+        """
+        key = (client_class, api_endpoint, api_key, timeout)
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is None:
+                cls.logger.debug(f"Initializing shared openai client for endpoint {api_endpoint}...")
+                client_kwargs = {}
+                if timeout is not None:
+                    client_kwargs['timeout'] = timeout
+                client = client_class(
+                    base_url=api_endpoint,
+                    api_key=api_key,
+                    http_client=cls._get_http_client(),
+                    **client_kwargs
+                )
+                cls._clients[key] = client
+                cls._client_lookups[key] = 0
+            cls._client_lookups[key] += 1
+            return client
+
+    @classmethod
+    def get_async_client(cls, api_endpoint: str, api_key: str, timeout: Optional[float] = None) -> AsyncOpenAI:
+        """
+        Returns the shared AsyncOpenAI client of the running event loop for the endpoint
+        and key, creating it if needed. Must be called from within a coroutine.
+
+        Args:
+            api_endpoint (str): The URL of the LLM API endpoint.
+            api_key (str): The API key for authentication.
+            timeout (float, optional): Request timeout in seconds. Defaults to the openai client default.
+
+        Returns:
+            AsyncOpenAI: The shared client instance.
+        """
+        loop = asyncio.get_running_loop()
+        key = (AsyncOpenAI, api_endpoint, api_key, timeout)
+        with cls._lock:
+            # the pools of finished event loops can not be used any more
+            for closed_loop in [pool_loop for pool_loop in cls._async_pools if pool_loop.is_closed()]:
+                del cls._async_pools[closed_loop]
+            if loop not in cls._async_pools:
+                cls._async_pools[loop] = (httpx.AsyncClient(limits=httpx.Limits(**cls._limits), follow_redirects=True), {})
+            http_client, clients = cls._async_pools[loop]
+            client = clients.get(key)
+            if client is None:
+                cls.logger.debug(f"Initializing shared async openai client for endpoint {api_endpoint}...")
+                client_kwargs = {}
+                if timeout is not None:
+                    client_kwargs['timeout'] = timeout
+                client = AsyncOpenAI(
+                    base_url=api_endpoint,
+                    api_key=api_key,
+                    http_client=http_client,
+                    **client_kwargs
+                )
+                clients[key] = client
+                cls._client_lookups.setdefault(key, 0)
+            cls._client_lookups[key] += 1
+            return client
+
+    @classmethod
+    def _get_http_client(cls) -> httpx.Client:
+        """Returns the shared httpx client. Must be called with the lock held."""
+        if cls._http_client is None:
+            cls._http_client = httpx.Client(
+                limits=httpx.Limits(**cls._limits),
+                follow_redirects=True
+            )
+        return cls._http_client
+
+    @classmethod
+    def stats(cls) -> dict:
+        """
+        Returns statistics about the registry and the shared connection pool.
+
+        Returns:
+            dict: The pool limits, the open and idle connections per origin and
+                  the number of lookups of each registered client.
+        """
+        with cls._lock:
+            connections = []
+            if cls._http_client is not None:
+                # httpcore does not expose a public api for the pool state
+                pool = getattr(cls._http_client._transport, "_pool", None)
+                for connection in getattr(pool, "connections", []):
+                    connections.append({
+                        "origin": str(connection._origin),
+                        "idle": connection.is_idle(),
+                        "available": connection.is_available()
+                    })
+            return {
+                "limits": dict(cls._limits),
+                "connections": connections,
+                "clients": [
+                    {"api_endpoint": endpoint, "timeout": timeout, "lookups": lookups}
+                    for (_client_class, endpoint, _api_key, timeout), lookups in cls._client_lookups.items()
+                ]
+            }
+
+    @classmethod
+    def clear(cls) -> None:
+        """Closes the shared connection pool and forgets all registered clients."""
+        with cls._lock:
+            cls._reset()
+
+    @classmethod
+    def _reset(cls) -> None:
+        """Closes the shared connection pool. Must be called with the lock held."""
+        if cls._http_client is not None:
+            cls._http_client.close()
+        cls._http_client = None
+        cls._clients = {}
+        cls._client_lookups = {}
+        # async pools can only be closed on their event loop, they are released with it
+        cls._async_pools = {}
@@ -35,10 +35,59 @@ class Config:
       #   "default_temperature": Constants.DEFAULT_MODEL_TEMPERATURE
       # }
     ],
+    "provider_pools": [
+      # {
+      #   "name": "gpu-boxes",
+      #   "providers": ["local", "remote"],
+      #   "strategy": Constants.DEFAULT_PROVIDER_POOL_STRATEGY,
+      #   "ejection_seconds": Constants.DEFAULT_PROVIDER_EJECTION_SECONDS,
+      #   "request_timeout": 600
+      # }
+    ],
+    "llm": {
+      # request token usage of streamed responses, disable for servers rejecting stream_options
+      "stream_usage": Constants.DEFAULT_LLM_STREAM_USAGE
+    },
+    "http": {
+      "max_connections": Constants.DEFAULT_HTTP_MAX_CONNECTIONS,
+      "max_keepalive_connections": Constants.DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+      "keepalive_expiry": Constants.DEFAULT_HTTP_KEEPALIVE_EXPIRY_SECONDS
+    },
+    "cache": {
+      "enabled": False,
+      # cache refined prompts by input prompt, refinement template and model
+      "refinements": False,
+      "ttl_seconds": Constants.DEFAULT_CACHE_TTL_SECONDS,
+      "max_size_mb": Constants.DEFAULT_CACHE_MAX_SIZE_MB
+    },
+    "database": {
+      # sqlite pragmas applied to every connection of the task queue database
+      "journal_mode": Constants.DEFAULT_DATABASE_JOURNAL_MODE,
+      "synchronous": Constants.DEFAULT_DATABASE_SYNCHRONOUS,
+      "busy_timeout": Constants.DEFAULT_DATABASE_BUSY_TIMEOUT_MS,
+      "cache_size": Constants.DEFAULT_DATABASE_CACHE_SIZE,
+      "mmap_size": Constants.DEFAULT_DATABASE_MMAP_SIZE
+    },
+    "task_retention": {
+      # applied by `task-compact`: finished tasks are archived after max_age_days,
+      # the history of the remaining tasks is trimmed to max_history_per_task entries
+      "max_age_days": Constants.DEFAULT_TASK_RETENTION_MAX_AGE_DAYS,
+      "max_history_per_task": Constants.DEFAULT_TASK_RETENTION_MAX_HISTORY_PER_TASK
+    },
+    "task_queue": {
+      # handling of task files whose content is already queued: reject, coalesce or link
+      "duplicate_policy": Constants.DEFAULT_TASK_DUPLICATE_POLICY
+    },
     "daemon": {
       "processing_interval": Constants.DEFAULT_DAEMON_PROCESSING_INTERVAL,
+      "workers": Constants.DEFAULT_DAEMON_WORKERS,
+      "lease_seconds": Constants.DEFAULT_TASK_LEASE_SECONDS,
+      "priority_aging_seconds": Constants.DEFAULT_TASK_PRIORITY_AGING_SECONDS,
+      "subtask_concurrency": Constants.DEFAULT_SUBTASK_CONCURRENCY,
       "file_watcher": {
-        "enabled": False
+        "enabled": False,
+        "debounce_ms": Constants.DEFAULT_FILE_WATCHER_DEBOUNCE_MS,
+        "stable_ms": Constants.DEFAULT_FILE_WATCHER_STABLE_MS
       }
     }
   }
@@ -47,11 +96,15 @@ class Config:
     "home_path",
     "config_path",
     "logs_path",
+    "cache_path",
     "database_path",
     "prompts_directory",
     "default_provider",
     "daemon.processing_interval",
+    "daemon.workers",
+    "daemon.lease_seconds",
     "daemon.logfile_path",
+    "daemon.wakeup_socket_directory",
     "daemon.file_watcher.enabled"
   ]
   
@@ -86,6 +139,13 @@ class Config:
     # log paths
     self.config['logs_path'] = (self.get('home_path') / 'logs').resolve()
     self.config['daemon']['logfile_path'] = (self.get('logs_path') / 'daemon.log').resolve()
+    self.config['daemon']['wakeup_socket_directory'] = (self.get('home_path') / 'run').resolve()
+
+    # archive of compacted tasks
+    self.config['task_retention']['archive_directory'] = (self.get('home_path') / 'archive').resolve()
+
+    # cache path
+    self.config['cache_path'] = (self.get('home_path') / 'cache').resolve()
 
     # database path
     self.config['database_path'] = (self.get('home_path') / 'database.sqlite').resolve()
@@ -251,6 +311,33 @@ class Config:
       raise ValueError(f"Could not find configuration for provider: {provider_name}")
     return provider
 
+  def get_provider_pool(self, pool_name: str) -> dict:
+    """
+    Returns the configuration dict for the provider pool with the provided name.
+    
+    Provider pools group several providers serving the same model. All providers
+    listed in the pool must be configured in the providers section.
+    
+    Args:
+        pool_name: The name of the provider pool to retrieve
+        
+    Returns:
+        The provider pool configuration dictionary
+        
+    Raises:
+        ValueError: If no provider pool with the given name exists or it references unknown providers
+    """
+    pools = self.config.get('provider_pools') or []
+    pool = next(
+    (d for d in pools if d.get("name") == pool_name),
+      None
+    )
+    if not pool:
+      raise ValueError(f"Could not find configuration for provider pool: {pool_name}")
+    for provider_name in pool.get('providers') or []:
+      self.get_provider(provider_name)
+    return pool
+
   def _deep_merge_config(self, first: MutableMapping, second: MutableMapping) -> MutableMapping:
     """
     Recursively merge two config dicts.
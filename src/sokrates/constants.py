@@ -12,7 +12,38 @@ class Constants:
   # Model settings
   DEFAULT_MODEL = "qwen3-4b-instruct-2507"
   DEFAULT_MODEL_TEMPERATURE = 0.7
+
+  # Async client
+  DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+
+  # Token usage reporting of streamed responses (stream_options.include_usage)
+  DEFAULT_LLM_STREAM_USAGE = True
+
+  # Shared http connection pool
+  DEFAULT_HTTP_MAX_CONNECTIONS = 100
+  DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+  DEFAULT_HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+  # Response cache
+  DEFAULT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+  DEFAULT_CACHE_MAX_SIZE_MB = 512
+
+  # Provider pools
+  DEFAULT_PROVIDER_POOL_STRATEGY = "round_robin"
+  DEFAULT_PROVIDER_EJECTION_SECONDS = 30
   
+  # Task queue database (sqlite pragmas)
+  DEFAULT_DATABASE_JOURNAL_MODE = "wal"
+  DEFAULT_DATABASE_SYNCHRONOUS = "normal"
+  DEFAULT_DATABASE_BUSY_TIMEOUT_MS = 10000
+  DEFAULT_DATABASE_CACHE_SIZE = -16000  # negative values are KiB: 16 MB page cache
+  DEFAULT_DATABASE_MMAP_SIZE = 64 * 1024 * 1024
+
+  # Task queue retention (task-compact)
+  DEFAULT_TASK_RETENTION_MAX_AGE_DAYS = 30
+  DEFAULT_TASK_RETENTION_MAX_HISTORY_PER_TASK = 20
+  DEFAULT_TASK_DUPLICATE_POLICY = "reject"
+
   # paths
   DEFAULT_HOME_PATH = (Path.home() / ".sokrates").resolve()
   DEFAULT_PROMPTS_DIRECTORY = (Path(__file__).parent / "prompts").resolve()
@@ -20,6 +51,12 @@ class Constants:
   
   # Task daemon
   DEFAULT_DAEMON_PROCESSING_INTERVAL = 15
+  DEFAULT_DAEMON_WORKERS = 1
+  DEFAULT_TASK_LEASE_SECONDS = 600
+  DEFAULT_TASK_PRIORITY_AGING_SECONDS = 0  # disabled
+  DEFAULT_SUBTASK_CONCURRENCY = 1
+  DEFAULT_FILE_WATCHER_DEBOUNCE_MS = 500
+  DEFAULT_FILE_WATCHER_STABLE_MS = 1000
   DEFAULT_TASK_DAEMON_DEAD_LETTER_QUEUE_ENABLED = True
   DEFAULT_TASK_DAEMON_BASE_RETRY_DELAY = 2
   DEFAULT_TASK_DAEMON_MAX_RETRIES = 2
\ No newline at end of file
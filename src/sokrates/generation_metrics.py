@@ -0,0 +1,171 @@
+# This script defines the `GenerationMetrics` class, a small record holding
+# the timing and token usage information of a single LLM generation. Instances
+# are filled in by `LLMApi` while a response is streamed and can be inspected
+# by callers once the generation has finished.
+
+import math
+from typing import List, Optional
+
+class GenerationMetrics:
+    """
+    Timing and token usage information of a single LLM generation.
+
+    All timestamps are seconds since the epoch as returned by time.time().
+    Token counts are taken from the usage reported by the server. If the server
+    does not report usage, they are estimated from the character counts and
+    usage_estimated is set.
+    """
+
+    CHARACTERS_PER_TOKEN_ESTIMATE = 4
+
+    def __init__(self, model: Optional[str] = None, api_endpoint: Optional[str] = None):
+        """
+        Initializes an empty GenerationMetrics record.
+
+        Args:
+            model (str, optional): The name of the model used for the generation.
+            api_endpoint (str, optional): The endpoint the generation was sent to.
+        """
+        self.model = model
+        self.api_endpoint = api_endpoint
+        self.start_time = None
+        self.first_token_time = None
+        self.end_time = None
+        self.response_characters = 0
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.usage_estimated = False
+        self.cached = False
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """
+        Estimates the number of tokens of a text without a tokenizer.
+
+        Args:
+            text (str): The text to estimate the token count for.
+
+        Returns:
+            int: The estimated number of tokens.
+        """
+        if not text:
+            return 0
+        return math.ceil(len(text) / cls.CHARACTERS_PER_TOKEN_ESTIMATE)
+
+    def set_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Sets the token usage reported by the server.
+
+        Args:
+            prompt_tokens (int): Number of tokens in the prompt.
+            completion_tokens (int): Number of generated tokens.
+        """
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.usage_estimated = False
+
+    def estimate_usage(self, messages: List[dict]) -> None:
+        """
+        Estimates the token usage for servers that do not report it.
+        Only fills in the values that are still missing.
+
+        Args:
+            messages (List[dict]): The messages that were sent to the model.
+        """
+        if self.prompt_tokens is None:
+            self.prompt_tokens = sum(self.estimate_tokens(str(message.get("content") or "")) for message in messages)
+            self.usage_estimated = True
+        if self.completion_tokens is None:
+            self.completion_tokens = math.ceil(self.response_characters / self.CHARACTERS_PER_TOKEN_ESTIMATE)
+            self.usage_estimated = True
+
+    @property
+    def finished(self) -> bool:
+        """True once the generation has completed."""
+        return self.end_time is not None
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds between sending the request and receiving the first token."""
+        if self.start_time is None or self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    @property
+    def decode_duration(self) -> Optional[float]:
+        """Seconds between the first and the last received token."""
+        if self.first_token_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.first_token_time
+
+    @property
+    def decode_tokens_per_second(self) -> Optional[float]:
+        """Generated tokens per second after the first token arrived."""
+        duration = self.decode_duration
+        if not duration or not self.completion_tokens or self.completion_tokens < 2:
+            return None
+        # the first token arrives at the start of the decode duration
+        return (self.completion_tokens - 1) / duration
+
+    @property
+    def total_duration(self) -> Optional[float]:
+        """Seconds between sending the request and the end of the generation."""
+        if self.start_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def to_dict(self) -> dict:
+        """
+        Returns the metrics as a dictionary.
+
+        Returns:
+            dict: The metrics including the derived durations.
+        """
+        return {
+            "model": self.model,
+            "api_endpoint": self.api_endpoint,
+            "cached": self.cached,
+            "response_characters": self.response_characters,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "usage_estimated": self.usage_estimated,
+            "time_to_first_token": self.time_to_first_token,
+            "decode_duration": self.decode_duration,
+            "decode_tokens_per_second": self.decode_tokens_per_second,
+            "total_duration": self.total_duration
+        }
+
+    @classmethod
+    def summarize(cls, metrics: List["GenerationMetrics"]) -> dict:
+        """
+        Aggregates the metrics of several generations, e.g. the refinement and
+        execution calls of a task.
+
+        Args:
+            metrics (List[GenerationMetrics]): The metrics of the generations. Metrics of
+                generations that were never sent (e.g. after an earlier error) are ignored.
+
+        Returns:
+            dict: model and provider (comma separated if several were used), generations,
+                  summed prompt_tokens, completion_tokens and generation_time, the mean
+                  time_to_first_token and usage_estimated if any usage was estimated.
+        """
+        def total(values):
+            values = [value for value in values if value is not None]
+            return sum(values) if values else None
+
+        metrics = [m for m in metrics if m.start_time is not None]
+        first_token_times = [m.time_to_first_token for m in metrics if m.time_to_first_token is not None]
+        return {
+            "model": ", ".join(sorted({m.model for m in metrics if m.model})) or None,
+            "provider": ", ".join(sorted({m.api_endpoint for m in metrics if m.api_endpoint})) or None,
+            "generations": len(metrics),
+            "prompt_tokens": total(m.prompt_tokens for m in metrics),
+            "completion_tokens": total(m.completion_tokens for m in metrics),
+            "usage_estimated": any(m.usage_estimated for m in metrics),
+            "time_to_first_token": sum(first_token_times) / len(first_token_times) if first_token_times else None,
+            "generation_time": total(m.total_duration for m in metrics)
+        }
+
+    def __repr__(self) -> str:
+        return f"GenerationMetrics({self.to_dict()})"
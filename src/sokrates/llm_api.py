@@ -6,30 +6,62 @@
 
 import logging
 import time
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 from openai import OpenAI
+from .client_registry import ClientRegistry
 from .constants import Constants
+from .generation_metrics import GenerationMetrics
+from .response_cache import ResponseCache
 
 class LLMApi:
     """
     Handles interactions with OpenAI-compatible LLM APIs.
     Provides methods for model listing, text generation, and chat completions.
     """
-    def __init__(self, api_endpoint: str, api_key: str, client: OpenAI = None):
+
+    # process-wide default of stream_usage (`llm.stream_usage` in config.yml)
+    _default_stream_usage = Constants.DEFAULT_LLM_STREAM_USAGE
+
+    def __init__(self, api_endpoint: str, api_key: str, client: OpenAI = None, cache: ResponseCache = None, use_cache: bool = True, stream_usage: Optional[bool] = None, timeout: Optional[float] = None):
         """
         Initializes the LLMApi client.
 
         Args:
             api_endpoint (str): The URL of the LLM API endpoint.
             api_key (str): The API key for authentication.
+            client (OpenAI, optional): A preconfigured OpenAI client. Defaults to None.
+            cache (ResponseCache, optional): The response cache to use. If None, the process-wide
+                                             default cache (ResponseCache.get_default()) is used.
+            use_cache (bool): Set to False to bypass any response cache. Defaults to True.
+            stream_usage (bool, optional): Request token usage reporting for streamed responses
+                                 (stream_options.include_usage). Disable for servers rejecting
+                                 stream_options. Defaults to the process-wide default set with
+                                 set_default_stream_usage().
+            timeout (float, optional): Request timeout in seconds. Defaults to the openai client default.
         """
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.api_endpoint = api_endpoint
         self.api_key = api_key
         self.__validate_configuration()
         self.client = client
+        self.cache = cache
+        self.use_cache = use_cache
+        self.stream_usage = stream_usage
+        self.timeout = timeout
+        self.last_metrics = None
         
+    @classmethod
+    def set_default_stream_usage(cls, enabled: bool) -> None:
+        """
+        Sets whether instances created without stream_usage request the token usage of
+        streamed responses. Without it the usage is estimated from the response length.
+
+        Args:
+            enabled (bool): The process-wide default of stream_usage.
+        """
+        cls._default_stream_usage = bool(enabled)
+
     def __validate_configuration(self):
         if not self.api_endpoint:
             raise ValueError("api_endpoint is empty!")
@@ -38,8 +70,9 @@ class LLMApi:
         
     def get_openai_client(self) -> OpenAI:
         """
-        Creates and returns an OpenAI client instance configured with the
-        specified API endpoint and key.
+        Returns an OpenAI client instance configured with the specified API endpoint
+        and key. Unless a client was passed in, the client is taken from the
+        process-wide ClientRegistry and shares its HTTP connection pool.
 
         Returns:
             OpenAI: An initialized OpenAI client object.
@@ -47,13 +80,20 @@ class LLMApi:
         if self.client:
             return self.client
         
-        # initialize only if not initialized yet
-        self.logger.debug(f"Initializing openai client for endpoint {self.api_endpoint}...")
-        self.client = OpenAI(
-            base_url=self.api_endpoint,
-            api_key=self.api_key
-        )
-        return self.client
+        # clients are shared process-wide to reuse the pooled http connections
+        return ClientRegistry.get_client(self.api_endpoint, self.api_key,
+                                         timeout=self.timeout, client_class=OpenAI)
+
+    def get_response_cache(self) -> Optional[ResponseCache]:
+        """
+        Returns the response cache used by this instance.
+
+        Returns:
+            Optional[ResponseCache]: The configured cache, the process-wide default cache or None.
+        """
+        if not self.use_cache:
+            return None
+        return self.cache or ResponseCache.get_default()
 
     def list_models(self) -> List[str]:
         """
@@ -78,7 +118,7 @@ class LLMApi:
             self.logger.error(f"Error listing models: {str(e)}", exc_info=True)
             raise
 
-    def send(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None) -> str:
+    def send(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None, metrics: GenerationMetrics = None) -> str:
         """
         Sends a text prompt to the LLM server for generation and returns the response.
         Context can be provided as a list of strings which will be prepended to the main prompt.
@@ -90,15 +130,69 @@ class LLMApi:
             context (List[str], optional): List of context strings to prepend to the prompt. Defaults to None.
             max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
             temperature (float): Controls the randomness of the output. Higher values (e.g., 0.8) make the output more random, while lower values (e.g., 0.2) make it more focused and deterministic. Defaults to 0.7.
+            metrics (GenerationMetrics, optional): A metrics object to fill in. Defaults to None.
 
         Returns:
             str: The generated content from the LLM.
 
+        Raises:
+            Exception: If the API call to the LLM server fails.
+        """
+        return "".join(self.stream(prompt, model=model, context=context, max_tokens=max_tokens,
+                                   temperature=temperature, system_prompt=system_prompt, metrics=metrics))
+
+    def chat_completion(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, print_to_console = False, metrics: GenerationMetrics = None) -> str:
+        """
+        Sends a list of messages (conversation history) to the LLM server for chat completion.
+        The response is streamed back, and performance metrics are calculated.
+
+        Args:
+            messages (List[dict]): A list of message dictionaries representing the conversation history.
+                                   Each dictionary should have "role" (e.g., "user", "assistant")
+                                   and "content" keys.
+            model (str): The name of the model to use for chat completion. Defaults to Constants.DEFAULT_MODEL.
+            max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            print_to_console (bool): Print the streamed tokens while they arrive. Defaults to False.
+            metrics (GenerationMetrics, optional): A metrics object to fill in. Defaults to None.
+
+        Returns:
+            str: The generated content from the LLM for the chat completion.
+
+        Raises:
+            Exception: If the API call to the LLM server fails.
+        """
+        response_parts = []
+        for content in self.stream_chat(messages, model=model, max_tokens=max_tokens,
+                                        temperature=temperature, metrics=metrics):
+            if print_to_console:
+                print(content, end="", flush=True)
+            response_parts.append(content)
+        return "".join(response_parts)
+
+    def stream(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None, metrics: GenerationMetrics = None) -> Iterator[str]:
+        """
+        Sends a text prompt to the LLM server and yields the generated content chunk by chunk.
+
+        Args:
+            prompt (str): The main text prompt to send to the LLM.
+            model (str): The name of the model to use for generation. Defaults to Constants.DEFAULT_MODEL.
+            context (List[str], optional): List of context strings to prepend to the prompt. Defaults to None.
+            max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
+            temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            system_prompt (str, optional): A system prompt to use for processing the sent prompt (Default: None)
+            metrics (GenerationMetrics, optional): A metrics object that is filled in once the stream
+                                                   is exhausted. The same object is available as
+                                                   last_metrics afterwards. Defaults to None.
+
+        Yields:
+            str: The generated content chunks.
+
         Raises:
             Exception: If the API call to the LLM server fails.
         """
         self.logger.info(f"Generating with model {model}")
-        
+
         try:
             client = self.get_openai_client()
             
@@ -114,27 +208,27 @@ class LLMApi:
             self.logger.debug("-" * 20)
             self.logger.debug("")
                 
-            return self._stream_response(client, messages, model, max_tokens, temperature)
+            yield from self._stream_chunks(client, messages, model, max_tokens, temperature, metrics)
             
         except Exception as e:
             self.logger.error(f"Error calling LLM API at {self.api_endpoint}: {str(e)}", exc_info=True)
             raise
 
-    def chat_completion(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, print_to_console = False) -> str:
+    def stream_chat(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, metrics: GenerationMetrics = None) -> Iterator[str]:
         """
-        Sends a list of messages (conversation history) to the LLM server for chat completion.
-        The response is streamed back, and performance metrics are calculated.
+        Sends a list of messages (conversation history) to the LLM server and yields
+        the generated content chunk by chunk.
 
         Args:
-            messages (List[dict]): A list of message dictionaries representing the conversation history.
-                                   Each dictionary should have "role" (e.g., "user", "assistant")
-                                   and "content" keys.
+            messages (List[dict]): A list of message dictionaries with "role" and "content" keys.
             model (str): The name of the model to use for chat completion. Defaults to Constants.DEFAULT_MODEL.
             max_tokens (int): The maximum number of tokens to generate in the response. Defaults to 2000.
             temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            metrics (GenerationMetrics, optional): A metrics object that is filled in once the stream
+                                                   is exhausted. Defaults to None.
 
-        Returns:
-            str: The generated content from the LLM for the chat completion.
+        Yields:
+            str: The generated content chunks.
 
         Raises:
             Exception: If the API call to the LLM server fails.
@@ -152,7 +246,7 @@ class LLMApi:
             self.logger.debug("-" * 20)
             self.logger.debug("")
 
-            return self._stream_response(client, messages, model, max_tokens, temperature, print_to_console=print_to_console)
+            yield from self._stream_chunks(client, messages, model, max_tokens, temperature, metrics)
             
         except Exception as e:
             self.logger.error(f"Error calling LLM API at {self.api_endpoint}: {str(e)}", exc_info=True)
@@ -191,9 +285,10 @@ class LLMApi:
         
         return messages
 
-    def _stream_response(self, client: OpenAI, messages: List[dict], model: str, max_tokens: int = 2000, temperature: float = 0.7, print_to_console = False) -> str:
+    def _stream_chunks(self, client: OpenAI, messages: List[dict], model: str, max_tokens: int = 2000, temperature: float = 0.7, metrics: GenerationMetrics = None) -> Iterator[str]:
         """
-        Streams response from the LLM and calculates performance metrics.
+        Streams the response from the LLM chunk by chunk and fills in the generation metrics.
+        Identical requests are served from the response cache if one is configured.
         
         Args:
             client (OpenAI): The OpenAI client instance.
@@ -201,49 +296,183 @@ class LLMApi:
             model (str): The name of the model to use for generation.
             max_tokens (int): The maximum number of tokens to generate. Defaults to 2000.
             temperature (float): Controls the randomness of the output. Defaults to 0.7.
+            metrics (GenerationMetrics, optional): The metrics object to fill in. Defaults to None.
             
-        Returns:
-            str: The generated content from the LLM.
+        Yields:
+            str: The generated content chunks.
         """
-        start_time = time.time()
-        first_token_time = None
+        metrics = self._start_metrics(metrics, model)
+
+        cache_key, cached_content = self._lookup_cached_response(messages, model, max_tokens, temperature)
+        if cached_content is not None:
+            self._finish_cached_metrics(metrics, cached_content)
+            yield cached_content
+            return
+
         self.logger.info("Streaming generation ...")
         
-        response_content = ""
-        stream = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            stream=True
-        )
+        # only keep the chunks around if they are needed for the cache
+        response_parts = [] if cache_key else None
+        stream = client.chat.completions.create(**self._build_stream_request(messages, model, max_tokens, temperature))
         
         for chunk in stream:
-            content = chunk.choices[0].delta.content
+            content = self._process_chunk(chunk, metrics)
             if content:
-                if first_token_time is None:
-                    first_token_time = time.time()
-                if print_to_console:
-                    print(content, end="", flush=True)
-                response_content += content
+                if response_parts is not None:
+                    response_parts.append(content)
+                yield content
 
-        end_time = time.time()
-        
-        self.logger.info(f"Done generating using model {model}")
-        self.logger.info(f"Received response ({len(response_content)} characters)")
-            
-        if first_token_time is not None:
-            duration_to_first = first_token_time - start_time
-            duration_last_to_first = end_time - first_token_time
-            total_duration = end_time - start_time
-            self.logger.info(f"Time to first token: {duration_to_first:.4f}s")
-            self.logger.info(f"Time between first and last token: {duration_last_to_first:.4f}s")
-            self.logger.info(f"Total duration: {total_duration:.4f}s")
+        metrics.end_time = time.time()
+        metrics.estimate_usage(messages)
+        self._log_generation_metrics(metrics)
+
+        if response_parts is not None:
+            self._store_cached_response(cache_key, "".join(response_parts))
+
+    def _build_stream_request(self, messages: List[dict], model: str, max_tokens: int, temperature: float) -> dict:
+        """
+        Builds the keyword arguments for a streamed chat completion request.
+
+        Args:
+            messages (List[dict]): A list of message dictionaries for chat completion.
+            model (str): The name of the model to use for generation.
+            max_tokens (int): The maximum number of tokens to generate.
+            temperature (float): Controls the randomness of the output.
+
+        Returns:
+            dict: The request parameters.
+        """
+        request = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+        stream_usage = self.stream_usage if self.stream_usage is not None else LLMApi._default_stream_usage
+        if stream_usage:
+            request["stream_options"] = {"include_usage": True}
+        return request
+
+    def _process_chunk(self, chunk, metrics: GenerationMetrics) -> Optional[str]:
+        """
+        Extracts the content of a streamed chunk and records timing and usage information.
+
+        Args:
+            chunk: A chat completion chunk of the stream.
+            metrics (GenerationMetrics): The metrics of the running generation.
+
+        Returns:
+            Optional[str]: The content of the chunk, if any.
+        """
+        # with include_usage the last chunk carries the usage and no choices
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            if isinstance(prompt_tokens, int) and isinstance(completion_tokens, int):
+                metrics.set_usage(prompt_tokens, completion_tokens)
+
+        if not chunk.choices:
+            return None
+        content = chunk.choices[0].delta.content
+        if content:
+            if metrics.first_token_time is None:
+                metrics.first_token_time = time.time()
+            metrics.response_characters += len(content)
+        return content
+
+    def _start_metrics(self, metrics: Optional[GenerationMetrics], model: str) -> GenerationMetrics:
+        """
+        Prepares the metrics object for a new generation and exposes it as last_metrics.
+
+        Args:
+            metrics (GenerationMetrics, optional): A caller provided metrics object.
+            model (str): The name of the model used for the generation.
+
+        Returns:
+            GenerationMetrics: The metrics object to fill in.
+        """
+        if metrics is None:
+            metrics = GenerationMetrics()
+        metrics.model = model
+        metrics.api_endpoint = self.api_endpoint
+        metrics.start_time = time.time()
+        self.last_metrics = metrics
+        return metrics
+
+    def _finish_cached_metrics(self, metrics: GenerationMetrics, cached_content: str) -> None:
+        """
+        Completes the metrics of a generation that was served from the response cache.
+
+        Args:
+            metrics (GenerationMetrics): The metrics object of the generation.
+            cached_content (str): The cached response.
+        """
+        metrics.cached = True
+        metrics.first_token_time = metrics.end_time = time.time()
+        metrics.response_characters = len(cached_content)
+        metrics.completion_tokens = GenerationMetrics.estimate_tokens(cached_content)
+        metrics.usage_estimated = True
+        self.logger.info(f"Total duration: {metrics.total_duration:.4f}s (served from response cache)")
+
+    def _lookup_cached_response(self, messages: List[dict], model: str, max_tokens: int, temperature: float) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Looks up a generation request in the response cache.
+
+        Args:
+            messages (List[dict]): A list of message dictionaries for chat completion.
+            model (str): The name of the model to use for generation.
+            max_tokens (int): The maximum number of tokens to generate.
+            temperature (float): Controls the randomness of the output.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: The cache key (None if caching is disabled)
+                                                 and the cached content (None on a cache miss).
+        """
+        cache = self.get_response_cache()
+        if not cache:
+            return None, None
+
+        cache_key = ResponseCache.build_key(self.api_endpoint, model, messages, temperature, max_tokens)
+        cached_content = cache.get(cache_key)
+        if cached_content is not None:
+            self.logger.info(f"Response cache hit for model {model} (key: {cache_key})")
+            self.logger.info(f"Received response ({len(cached_content)} characters)")
+        return cache_key, cached_content
+
+    def _store_cached_response(self, cache_key: Optional[str], response_content: str) -> None:
+        """
+        Stores a generated response in the response cache.
+
+        Args:
+            cache_key (str, optional): The key returned by _lookup_cached_response. Nothing is stored if None.
+            response_content (str): The generated content.
+        """
+        cache = self.get_response_cache()
+        if cache and cache_key and response_content:
+            cache.set(cache_key, response_content)
+
+    def _log_generation_metrics(self, metrics: GenerationMetrics) -> None:
+        """
+        Logs timing information for a finished generation.
+
+        Args:
+            metrics (GenerationMetrics): The metrics of the finished generation.
+        """
+        self.logger.info(f"Done generating using model {metrics.model}")
+        self.logger.info(f"Received response ({metrics.response_characters} characters)")
             
-            tops = len(response_content) / duration_last_to_first
-            self.logger.info(f"Tokens / second: {tops:.4f}")
+        if metrics.first_token_time is not None:
+            self.logger.info(f"Time to first token: {metrics.time_to_first_token:.4f}s")
+            self.logger.info(f"Time between first and last token: {metrics.decode_duration:.4f}s")
+            self.logger.info(f"Total duration: {metrics.total_duration:.4f}s")
             
-        return response_content
+            usage_source = "estimated" if metrics.usage_estimated else "reported"
+            self.logger.info(f"Prompt tokens: {metrics.prompt_tokens} ({usage_source})")
+            self.logger.info(f"Completion tokens: {metrics.completion_tokens} ({usage_source})")
+            if metrics.decode_tokens_per_second is not None:
+                self.logger.info(f"Tokens / second: {metrics.decode_tokens_per_second:.4f}")
 
     def combine_context(self, context: List[str]) -> str:
         """
@@ -0,0 +1,270 @@
+# This script defines the `ProviderPool` class, a drop-in replacement for
+# `LLMApi` that spreads requests across several OpenAI-compatible endpoints
+# serving the same model. Providers are selected round-robin or by the lowest
+# number of outstanding requests. A provider that fails or times out is ejected
+# from the rotation for a configurable time and the request is retried on the
+# next provider, as long as no content has been streamed yet.
+
+import logging
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from .config import Config
+from .constants import Constants
+from .generation_metrics import GenerationMetrics
+from .llm_api import LLMApi
+
+class ProviderPool:
+    """
+    Load balancing and failover across multiple LLM providers.
+
+    Offers the same generation methods as LLMApi (send, chat_completion,
+    stream, stream_chat, list_models) and can be passed wherever an
+    LLMApi instance is expected.
+    """
+
+    STRATEGY_ROUND_ROBIN = "round_robin"
+    STRATEGY_LEAST_OUTSTANDING = "least_outstanding"
+    STRATEGIES = [STRATEGY_ROUND_ROBIN, STRATEGY_LEAST_OUTSTANDING]
+
+    def __init__(self, apis: List[LLMApi],
+                 strategy: str = Constants.DEFAULT_PROVIDER_POOL_STRATEGY,
+                 ejection_seconds: float = Constants.DEFAULT_PROVIDER_EJECTION_SECONDS):
+        """
+        Initializes the ProviderPool.
+
+        Args:
+            apis (List[LLMApi]): The LLMApi instances of the pooled providers.
+            strategy (str): Provider selection strategy, 'round_robin' or 'least_outstanding'.
+            ejection_seconds (float): Time in seconds a failing provider is excluded from selection.
+
+        Raises:
+            ValueError: If no providers are given or the strategy is unknown.
+        """
+        if not apis:
+            raise ValueError("A provider pool needs at least one provider!")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown provider pool strategy: {strategy}. Valid strategies: {', '.join(self.STRATEGIES)}")
+
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.apis = list(apis)
+        self.strategy = strategy
+        self.ejection_seconds = ejection_seconds
+        self.last_metrics = None
+
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._outstanding = [0] * len(self.apis)
+        self._requests = [0] * len(self.apis)
+        self._failures = [0] * len(self.apis)
+        self._ejected_until = [0.0] * len(self.apis)
+
+    @classmethod
+    def from_config(cls, config: Config, pool_name: str) -> "ProviderPool":
+        """
+        Creates a ProviderPool from a pool defined in the `provider_pools` configuration section.
+
+        Args:
+            config (Config): The loaded configuration.
+            pool_name (str): The name of the provider pool.
+
+        Returns:
+            ProviderPool: The configured provider pool.
+        """
+        pool_config = config.get_provider_pool(pool_name)
+        timeout = pool_config.get('request_timeout')
+        apis = []
+        for provider_name in pool_config.get('providers', []):
+            provider = config.get_provider(provider_name)
+            apis.append(LLMApi(api_endpoint=provider.get('api_endpoint'),
+                               api_key=provider.get('api_key'),
+                               timeout=timeout))
+        return cls(apis,
+                   strategy=pool_config.get('strategy', Constants.DEFAULT_PROVIDER_POOL_STRATEGY),
+                   ejection_seconds=pool_config.get('ejection_seconds', Constants.DEFAULT_PROVIDER_EJECTION_SECONDS))
+
+    @property
+    def api_endpoint(self) -> str:
+        """Comma separated list of the pooled endpoints, used for logging."""
+        return ", ".join(api.api_endpoint for api in self.apis)
+
+    def _acquire(self, exclude: List[int]) -> Optional[int]:
+        """
+        Selects a provider according to the strategy and marks a request as outstanding.
+        Ejected providers are only selected if all remaining providers are ejected.
+
+        Args:
+            exclude (List[int]): Indexes of providers that already failed for this request.
+
+        Returns:
+            Optional[int]: The index of the selected provider or None if all providers were tried.
+        """
+        with self._lock:
+            candidates = [i for i in range(len(self.apis)) if i not in exclude]
+            if not candidates:
+                return None
+
+            now = time.time()
+            healthy = [i for i in candidates if self._ejected_until[i] <= now]
+            if not healthy:
+                # everything is ejected: try the provider that is due to come back first
+                healthy = [min(candidates, key=lambda i: self._ejected_until[i])]
+
+            if self.strategy == self.STRATEGY_LEAST_OUTSTANDING:
+                index = min(healthy, key=lambda i: (self._outstanding[i], self._requests[i]))
+            else:
+                index = next((i for i in healthy if i >= self._next_index), healthy[0])
+                self._next_index = (index + 1) % len(self.apis)
+
+            self._outstanding[index] += 1
+            self._requests[index] += 1
+            return index
+
+    def _release(self, index: int, failed: bool = False) -> None:
+        """
+        Marks a request on a provider as finished and ejects the provider if the request failed.
+
+        Args:
+            index (int): The index of the provider.
+            failed (bool): Whether the request failed.
+        """
+        with self._lock:
+            self._outstanding[index] -= 1
+            if failed:
+                self._failures[index] += 1
+                self._ejected_until[index] = time.time() + self.ejection_seconds
+            else:
+                self._ejected_until[index] = 0.0
+        if failed:
+            self.logger.warning(f"Ejecting provider {self.apis[index].api_endpoint} for {self.ejection_seconds} seconds")
+
+    def stats(self) -> List[dict]:
+        """
+        Returns request statistics for each provider of the pool.
+
+        Returns:
+            List[dict]: Per provider endpoint, outstanding requests, total requests,
+                        failures and whether the provider is currently ejected.
+        """
+        now = time.time()
+        with self._lock:
+            return [{
+                "api_endpoint": api.api_endpoint,
+                "outstanding": self._outstanding[i],
+                "requests": self._requests[i],
+                "failures": self._failures[i],
+                "ejected": self._ejected_until[i] > now
+            } for i, api in enumerate(self.apis)]
+
+    def list_models(self) -> List[str]:
+        """
+        Lists the models available on the first responding provider.
+
+        Returns:
+            List[str]: A sorted list of model IDs.
+
+        Raises:
+            Exception: If no provider could list its models.
+        """
+        tried = []
+        last_error = None
+        while True:
+            index = self._acquire(tried)
+            if index is None:
+                if last_error is None:
+                    raise RuntimeError("No provider of the pool is available")
+                raise last_error
+            try:
+                models = self.apis[index].list_models()
+            except Exception as e:
+                self._release(index, failed=True)
+                tried.append(index)
+                last_error = e
+                continue
+            self._release(index)
+            return models
+
+    def send(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None, metrics: GenerationMetrics = None) -> str:
+        """
+        Sends a text prompt to one of the pooled providers and returns the response.
+        See LLMApi.send for the parameters.
+
+        Returns:
+            str: The generated content from the LLM.
+        """
+        return "".join(self.stream(prompt, model=model, context=context, max_tokens=max_tokens,
+                                   temperature=temperature, system_prompt=system_prompt, metrics=metrics))
+
+    def chat_completion(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, print_to_console = False, metrics: GenerationMetrics = None) -> str:
+        """
+        Sends a conversation to one of the pooled providers and returns the response.
+        See LLMApi.chat_completion for the parameters.
+
+        Returns:
+            str: The generated content from the LLM.
+        """
+        response_parts = []
+        for content in self.stream_chat(messages, model=model, max_tokens=max_tokens,
+                                        temperature=temperature, metrics=metrics):
+            if print_to_console:
+                print(content, end="", flush=True)
+            response_parts.append(content)
+        return "".join(response_parts)
+
+    def stream(self, prompt: str, model: str = Constants.DEFAULT_MODEL, context: List[str] = None, max_tokens: int = 2000, temperature: float = 0.7, system_prompt: str = None, metrics: GenerationMetrics = None) -> Iterator[str]:
+        """
+        Sends a text prompt to one of the pooled providers and yields the generated content.
+        See LLMApi.stream for the parameters.
+
+        Yields:
+            str: The generated content chunks.
+        """
+        messages = self.apis[0]._build_messages(prompt, system_prompt, context)
+        yield from self.stream_chat(messages, model=model, max_tokens=max_tokens,
+                                    temperature=temperature, metrics=metrics)
+
+    def stream_chat(self, messages: List[dict], model: str = Constants.DEFAULT_MODEL, max_tokens: int = 2000, temperature: float = 0.7, metrics: GenerationMetrics = None) -> Iterator[str]:
+        """
+        Sends a conversation to one of the pooled providers and yields the generated content.
+        If a provider fails before the first chunk arrived, the request is retried on the
+        next provider. Failures after content has been streamed are raised to the caller.
+        See LLMApi.stream_chat for the parameters.
+
+        Yields:
+            str: The generated content chunks.
+
+        Raises:
+            Exception: The last error if every provider of the pool failed.
+        """
+        tried = []
+        last_error = None
+        while True:
+            index = self._acquire(tried)
+            if index is None:
+                if last_error is None:
+                    raise RuntimeError("No provider of the pool is available")
+                raise last_error
+
+            api = self.apis[index]
+            streamed = False
+            try:
+                for content in api.stream_chat(messages, model=model, max_tokens=max_tokens,
+                                               temperature=temperature, metrics=metrics):
+                    streamed = True
+                    yield content
+            except GeneratorExit:
+                self._release(index)
+                raise
+            except Exception as e:
+                self._release(index, failed=True)
+                if streamed:
+                    raise
+                self.logger.warning(f"Provider {api.api_endpoint} failed: {e}. Trying the next provider ...")
+                tried.append(index)
+                last_error = e
+                continue
+
+            self._release(index)
+            self.last_metrics = api.last_metrics
+            return
@@ -0,0 +1,107 @@
+# This script defines the `RefinementCache` class, a persistent cache for refined
+# prompts. It shares the storage, expiry and eviction of `ResponseCache`, but
+# entries are keyed by the hashes of the input prompt, the refinement template
+# content and the refinement model, so identical refinements are skipped
+# regardless of the endpoint, temperature or token limit of the request.
+
+import hashlib
+import json
+from typing import List, Optional
+
+from .config import Config
+from .response_cache import ResponseCache
+
+class RefinementCache(ResponseCache):
+    """
+    Persistent SQLite backed cache for refined prompts.
+
+    Entries hold the cleaned refinement response, callers apply their own
+    formatting after a lookup so every caller can share an entry.
+
+    The cache is opt-in (`cache.refinements` in config.yml): refinements are only
+    cached once a cache is registered as process-wide default via set_default().
+    """
+
+    TABLE_NAME = "refinements"
+
+    # separate from the default response cache
+    _default = None
+
+    @staticmethod
+    def build_refinement_key(input_prompt: str, refinement_prompt: str, model: str, context: Optional[List[str]] = None) -> str:
+        """
+        Builds the cache key for a refinement.
+
+        Args:
+            input_prompt (str): The prompt to refine.
+            refinement_prompt (str): The content of the refinement template.
+            model (str): The name of the refinement model.
+            context (List[str], optional): Additional context sent with the refinement.
+
+        Returns:
+            str: A sha256 hex digest identifying the refinement.
+        """
+        def digest(text: str) -> str:
+            return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        payload = json.dumps({
+            "input_prompt": digest(input_prompt),
+            "refinement_prompt": digest(refinement_prompt),
+            "model": model,
+            "context": [digest(entry) for entry in context or []]
+        }, sort_keys=True)
+        return digest(payload)
+
+    def get_refinement(self, input_prompt: str, refinement_prompt: str, model: str,
+                       context: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Returns the cached refined prompt, or None if the refinement is not cached.
+
+        Args:
+            input_prompt (str): The prompt to refine.
+            refinement_prompt (str): The content of the refinement template.
+            model (str): The name of the refinement model.
+            context (List[str], optional): Additional context sent with the refinement.
+
+        Returns:
+            Optional[str]: The refined prompt or None.
+        """
+        refined_prompt = self.get(self.build_refinement_key(input_prompt, refinement_prompt, model, context))
+        if refined_prompt is not None:
+            self.logger.info(f"Refined prompt served from refinement cache (model: {model})")
+        return refined_prompt
+
+    def set_refinement(self, input_prompt: str, refinement_prompt: str, model: str, refined_prompt: str,
+                       context: Optional[List[str]] = None) -> None:
+        """
+        Stores a refined prompt.
+
+        Args:
+            input_prompt (str): The prompt that was refined.
+            refinement_prompt (str): The content of the refinement template.
+            model (str): The name of the refinement model.
+            refined_prompt (str): The refined prompt.
+            context (List[str], optional): Additional context sent with the refinement.
+        """
+        if refined_prompt:
+            self.set(self.build_refinement_key(input_prompt, refinement_prompt, model, context), refined_prompt)
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["RefinementCache"]:
+        """
+        Creates the refinement cache if it is enabled in the `cache` configuration section.
+        It is stored next to the response cache and uses the same ttl and maximum size.
+
+        Args:
+            config (Config): The loaded configuration.
+
+        Returns:
+            Optional[RefinementCache]: The refinement cache, or None if it is disabled.
+        """
+        if not config.get('cache.refinements'):
+            return None
+        return cls(
+            db_path=config.get('cache_path') / 'responses.sqlite',
+            ttl_seconds=config.get('cache.ttl_seconds'),
+            max_size_bytes=int(config.get('cache.max_size_mb') * 1024 * 1024)
+        )
@@ -0,0 +1,215 @@
+# This script defines the `ResponseCache` class, a persistent, content-addressed
+# cache for LLM responses stored in a SQLite database. Entries are keyed by a
+# hash of the request parameters (endpoint, model, messages, temperature and
+# max_tokens), expire after a configurable time to live and are evicted in
+# least-recently-used order once the configured maximum size is exceeded.
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .constants import Constants
+
+class ResponseCache:
+    """
+    Persistent SQLite backed cache for LLM responses.
+
+    The cache is opt-in: LLMApi instances only use a cache that is passed to them
+    explicitly or registered as process-wide default via set_default().
+    """
+
+    TABLE_NAME = "responses"
+
+    _default = None
+
+    def __init__(self, db_path: str | Path,
+                 ttl_seconds: Optional[int] = Constants.DEFAULT_CACHE_TTL_SECONDS,
+                 max_size_bytes: Optional[int] = Constants.DEFAULT_CACHE_MAX_SIZE_MB * 1024 * 1024):
+        """
+        Initializes the ResponseCache and creates the database if it does not exist.
+
+        Args:
+            db_path (str | Path): Path to the SQLite database file.
+            ttl_seconds (int, optional): Time to live of an entry in seconds. None disables expiry.
+            max_size_bytes (int, optional): Maximum total size of all cached values in bytes.
+                                            None disables size based eviction.
+        """
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_table()
+
+    def _create_table(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} ("
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_last_accessed_at "
+                f"ON {self.TABLE_NAME} (last_accessed_at)"
+            )
+
+    @staticmethod
+    def build_key(api_endpoint: str, model: str, messages: List[dict], temperature: float, max_tokens: int) -> str:
+        """
+        Builds the cache key for a generation request.
+
+        Args:
+            api_endpoint (str): The URL of the LLM API endpoint.
+            model (str): The name of the model.
+            messages (List[dict]): The messages sent to the model.
+            temperature (float): The sampling temperature.
+            max_tokens (int): The maximum number of tokens to generate.
+
+        Returns:
+            str: A sha256 hex digest identifying the request.
+        """
+        payload = json.dumps({
+            "api_endpoint": api_endpoint,
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached value for the key, or None if it is missing or expired.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The cached value or None.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                f"SELECT value, created_at FROM {self.TABLE_NAME} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._connection.execute(f"DELETE FROM {self.TABLE_NAME} WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                f"UPDATE {self.TABLE_NAME} SET last_accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Stores a value in the cache and evicts entries if the cache grew too large.
+
+        Args:
+            key (str): The cache key.
+            value (str): The value to store.
+        """
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if self.max_size_bytes is not None and size > self.max_size_bytes:
+            self.logger.debug(f"Not caching value of {size} bytes: exceeds max size of {self.max_size_bytes} bytes")
+            return
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE_NAME} (key, value, size, created_at, last_accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Removes expired entries and least recently used entries exceeding the maximum size."""
+        if self.ttl_seconds is not None:
+            self._connection.execute(
+                f"DELETE FROM {self.TABLE_NAME} WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        if self.max_size_bytes is None:
+            return
+
+        total_size = self._connection.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE_NAME}").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+
+        evict_keys = []
+        rows = self._connection.execute(f"SELECT key, size FROM {self.TABLE_NAME} ORDER BY last_accessed_at ASC")
+        for key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            evict_keys.append((key,))
+            total_size -= size
+        self._connection.executemany(f"DELETE FROM {self.TABLE_NAME} WHERE key = ?", evict_keys)
+        self.logger.debug(f"Evicted {len(evict_keys)} cache entries")
+
+    def stats(self) -> dict:
+        """
+        Returns statistics about the cache.
+
+        Returns:
+            dict: Number of entries, total size in bytes, hits and misses.
+        """
+        with self._lock:
+            entries, total_size = self._connection.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.TABLE_NAME}"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "size_bytes": total_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self.TABLE_NAME}")
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    @classmethod
+    def set_default(cls, cache: Optional["ResponseCache"]) -> None:
+        """
+        Registers the process-wide default cache used by LLMApi instances
+        without an explicitly configured cache.
+
+        Args:
+            cache (ResponseCache, optional): The cache to use, or None to disable caching.
+        """
+        cls._default = cache
+
+    @classmethod
+    def get_default(cls) -> Optional["ResponseCache"]:
+        """
+        Returns the process-wide default cache.
+
+        Returns:
+            Optional[ResponseCache]: The registered default cache or None.
+        """
+        return cls._default
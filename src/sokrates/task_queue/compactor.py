@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Task Queue Compactor Module
+
+This module implements the retention policy of the task queue database.
+Finished (completed, failed and linked) tasks older than the maximum age are moved, together with their
+history, to a gzip compressed JSONL archive. The history of the remaining
+tasks is trimmed to the newest entries per task (the trimmed entries are
+archived as well). Afterwards the database file is vacuumed, so the space
+of the deleted rows is returned to the filesystem.
+
+Archive format (one JSON object per line):
+    {"task_id": 1, "task": {...}, "history": [...], "metrics": [...]}   archived task with its history and metrics
+    {"task_id": 2, "task": null, "history": [...]}                      trimmed history entries of a remaining task
+
+Classes:
+    TaskCompactor: Archives old tasks and trims the task history
+"""
+
+import os
+import gzip
+import json
+import logging
+import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from .database import TaskQueueORMDatabase
+from .orm import utc_now
+
+class TaskCompactor:
+    """
+    Applies the retention policy to a task queue database.
+
+    Attributes:
+        database (TaskQueueORMDatabase): The task queue database
+        archive_directory (Path): Directory receiving the archive files
+
+    Methods:
+        compact(): Archive old tasks, trim the history and vacuum the database
+    """
+
+    def __init__(self, database: TaskQueueORMDatabase, archive_directory: str | Path, logger=None):
+        """
+        Initializes the TaskCompactor.
+
+        Args:
+            database (TaskQueueORMDatabase): The task queue database
+            archive_directory (str | Path): Directory receiving the archive files
+            logger (logging.Logger, optional): Logger to use
+        """
+        self.logger = logger or logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.database = database
+        self.archive_directory = Path(archive_directory)
+
+    def compact(self, max_age_days: Optional[float] = None, max_history_per_task: Optional[int] = None,
+                vacuum: bool = True, dry_run: bool = False) -> Dict[str, object]:
+        """
+        Archives and deletes finished tasks older than max_age_days and trims the history
+        of the remaining tasks to max_history_per_task entries.
+
+        The archive file is written completely before any row is deleted.
+
+        Args:
+            max_age_days (float, optional): Completed, failed and linked tasks not updated for this many days
+                are archived, tasks with linked tasks only together with them. None disables archiving of tasks.
+            max_history_per_task (int, optional): Number of history entries kept per task. None disables trimming.
+            vacuum (bool): Vacuum the database after deleting rows. Defaults to True.
+            dry_run (bool): Only count what would be archived. Defaults to False.
+
+        Returns:
+            dict: archived_tasks, trimmed_history, archive_file (None if nothing was archived),
+                  database_size_before and database_size_after in bytes
+        """
+        size_before = self._database_size()
+
+        task_ids = []
+        if max_age_days is not None:
+            task_ids = self.database.get_finished_task_ids(utc_now() - datetime.timedelta(days=max_age_days))
+
+        history_ids = []
+        if max_history_per_task is not None:
+            archived = set(task_ids)
+            history_ids = [history_id for history_id, task_id in self._excess_history(max_history_per_task)
+                           if task_id not in archived]
+
+        result = {
+            "archived_tasks": len(task_ids),
+            "trimmed_history": len(history_ids),
+            "archive_file": None,
+            "database_size_before": size_before,
+            "database_size_after": size_before
+        }
+        if dry_run or not (task_ids or history_ids):
+            return result
+
+        archive_file = self._write_archive(task_ids, history_ids)
+        try:
+            self.database.delete_archived(task_ids, history_ids)
+        except Exception:
+            # the transaction was rolled back and the rows are still in the database,
+            # do not keep a duplicate archive
+            archive_file.unlink(missing_ok=True)
+            raise
+        self.logger.info(f"Archived {len(task_ids)} tasks and {len(history_ids)} history entries to {archive_file}")
+
+        if vacuum:
+            self.database.vacuum()
+        result["archive_file"] = str(archive_file)
+        result["database_size_after"] = self._database_size()
+        return result
+
+    def _excess_history(self, max_history_per_task: int) -> List[tuple]:
+        """Returns (history_id, task_id) of the history entries exceeding the limit per task"""
+        history_ids = self.database.get_excess_history_ids(max_history_per_task)
+        return [(entry['history_id'], entry['task']) for entry in self.database.get_history(history_ids=history_ids)]
+
+    def _write_archive(self, task_ids: List[int], history_ids: List[int]) -> Path:
+        """
+        Writes the tasks with their history and the trimmed history entries to a new archive file.
+
+        Returns:
+            Path: The archive file
+        """
+        self.archive_directory.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        archive_file = self.archive_directory / f"tasks_{timestamp}.jsonl.gz"
+
+        history_by_task = {}
+        for entry in self.database.get_history(task_ids=task_ids) + self.database.get_history(history_ids=history_ids):
+            history_by_task.setdefault(entry['task'], []).append(entry)
+
+        with open(archive_file, "wb") as raw:
+            with gzip.open(raw, "wt", encoding="utf-8") as f:
+                for task in self.database.get_tasks(task_ids):
+                    history = history_by_task.pop(task['task_id'], [])
+                    metrics = self.database.get_task_metrics(task['task_id'])
+                    f.write(json.dumps({"task_id": task['task_id'], "task": task, "history": history, "metrics": metrics},
+                                       default=str) + "\n")
+                for task_id, history in history_by_task.items():
+                    f.write(json.dumps({"task_id": task_id, "task": None, "history": history}, default=str) + "\n")
+            # the archive must be on disk before the rows are deleted
+            raw.flush()
+            os.fsync(raw.fileno())
+        return archive_file
+
+    def _database_size(self) -> int:
+        """Returns the size of the database file including its WAL in bytes"""
+        paths = [Path(self.database.db_path), Path(f"{self.database.db_path}-wal")]
+        return sum(path.stat().st_size for path in paths if path.exists())
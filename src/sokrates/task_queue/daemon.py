@@ -6,11 +6,14 @@ This module provides a background daemon process for processing tasks
 from the task queue using TaskProcessor, with comprehensive status tracking.
 """
 
-import time
+import datetime
 import logging
+import threading
+from typing import Optional
 from sokrates.task_queue.processor import TaskProcessor
 from sokrates.task_queue.file_watcher import FileWatcher
-from sokrates.task_queue.file_processor import FileProcessor
+from sokrates.task_queue.wakeup import DaemonWakeup
+from sokrates.refinement_cache import RefinementCache
 from sokrates.config import Config
 class TaskQueueDaemon:
     """
@@ -18,7 +21,8 @@ class TaskQueueDaemon:
 
     Attributes:
         processor: TaskProcessor instance for task execution
-        processing_interval: Time between processing cycles in seconds
+        processing_interval: Polling interval of idle workers and of the lease recovery in seconds
+        wakeup: DaemonWakeup channel that lets idle workers claim added work right away
         running: Flag indicating if daemon is running
     """
 
@@ -36,14 +40,16 @@ class TaskQueueDaemon:
         self.processing_interval = self.config.get('daemon.processing_interval')
         self.daemon_logfile_path = self.config.get('daemon.logfile_path')
         self.running = False
+        self._stopped = threading.Event()
 
         # Set up logging
         self.setup_logger()
+        RefinementCache.set_default(RefinementCache.from_config(self.config))
         self.processor = TaskProcessor(config=self.config)
+        self.wakeup = DaemonWakeup(self.config.get('daemon.wakeup_socket_directory'), logger=self.logger)
         
         # Initialize file watcher components
         self.file_watcher = None
-        self.file_processor = None
         self._setup_file_watcher()
 
     def setup_logger(self):
@@ -64,18 +70,17 @@ class TaskQueueDaemon:
             return
             
         try:
-            # Initialize file processor
-            self.file_processor = FileProcessor(config=self.config, logger=self.logger)
-            
             watched_directories = self.config.get("daemon.file_watcher.watched_directories")
             file_extensions = self.config.get("daemon.file_watcher.file_extensions")
 
             # Initialize file watcher
             self.file_watcher = FileWatcher(
                 watch_directories=watched_directories,
-                file_processor_callback=self._process_watched_file,
+                file_processor_callback=self._queue_watched_file,
                 file_extensions=file_extensions,
-                logger=self.logger
+                logger=self.logger,
+                debounce_ms=self.config.get("daemon.file_watcher.debounce_ms"),
+                stable_ms=self.config.get("daemon.file_watcher.stable_ms")
             )
             
             self.logger.info(f"File watcher configured for directories: {watched_directories}")
@@ -84,44 +89,67 @@ class TaskQueueDaemon:
         except Exception as e:
             self.logger.error(f"Failed to set up file watcher: {e}")
             self.file_watcher = None
-            self.file_processor = None
 
-    def _process_watched_file(self, file_path: str):
+    def _queue_watched_file(self, file_path: str):
         """
-        Process a file detected by the file watcher.
-        
+        Queue a file detected by the file watcher and wake the idle workers.
+
+        The file is only recorded in the task queue here, the daemon workers execute it
+        through the refinement and execution pipeline. That keeps the watcher responsive,
+        queued files survive a restart and are processed by up to `daemon.workers` workers.
+
         Args:
             file_path: Path to the file that was detected
         """
         try:
-            self.logger.info(f"Processing watched file: {file_path}")
-            
-            if not self.file_processor:
-                self.logger.error("File processor not available")
-                return
-                
-            # Process the file through the refinement and execution pipeline
-            result = self.file_processor.process_file(file_path)
-            
-            if result['status'] == 'completed':
-                self.logger.info(f"Successfully processed file: {file_path}")
-                self.logger.info(f"Results saved to: {result['output_file']}")
+            queued = self.processor.manager.add_watched_file(file_path)
+            if queued['duplicate_of'] is not None:
+                self.logger.info(f"Watched file {file_path} is already queued as task {queued['task_id']}")
             else:
-                self.logger.error(f"Failed to process file: {file_path}")
-                self.logger.error(f"Error: {result['error']}")
-                
+                self.logger.info(f"Queued watched file {file_path} as task {queued['task_id']}")
+            self.wakeup.set()
         except Exception as e:
-            self.logger.error(f"Error processing watched file {file_path}: {e}")
+            self.logger.error(f"Error queueing watched file {file_path}: {e}")
+        finally:
+            # the watcher runs in its own thread, peewee connections are per thread
+            self.processor.manager.close()
 
-    def process_cycle(self):
-        """Process a single cycle of tasks using TaskProcessor."""
+    def _backfill_watched_files(self):
+        """Queue the files added to the watched directories while the daemon was not running."""
         try:
-            self.logger.debug(f"Starting processing cycle (processing_interval: {self.processing_interval}s)")
-            
-            self.processor.process_tasks()
-            self.logger.debug("Processing cycle completed")
+            result = self.processor.manager.backfill_watched_files(
+                self.file_watcher.scan_files(), [str(d) for d in self.file_watcher.get_watched_directories()])
+            self.logger.info(f"Scanned {result['scanned']} watched files: {result['queued']} queued, "
+                             f"{result['unchanged']} unchanged, {result['removed']} removed from the manifest")
+        except Exception as e:
+            self.logger.error(f"Failed to scan the watched directories: {e}")
+
+    def recover_expired_leases(self):
+        """Return the tasks of crashed workers to the queue, the workers claim them again."""
+        try:
+            self.processor.requeue_expired_tasks()
+        except Exception as e:
+            self.logger.error(f"Error recovering tasks with expired leases: {e}")
+        finally:
+            self.processor.manager.close()
+
+    def _next_wait_seconds(self) -> float:
+        """
+        Returns the maximum time an idle worker waits before it polls the queue: the
+        processing interval, or less if a scheduled retry becomes due earlier.
+        """
+        next_attempt_at: Optional[datetime.datetime] = None
+        try:
+            next_attempt_at = self.processor.manager.get_next_attempt_at()
         except Exception as e:
-            self.logger.error(f"Error during processing cycle: {e}")
+            self.logger.error(f"Failed to look up scheduled retries: {e}")
+        finally:
+            self.processor.manager.close()
+
+        if next_attempt_at is None:
+            return self.processing_interval
+        until_retry = (next_attempt_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return max(0, min(self.processing_interval, until_retry))
 
     def run(self):
         """Run the daemon main loop."""
@@ -133,10 +161,17 @@ class TaskQueueDaemon:
             if self.file_watcher:
                 self.file_watcher.start()
                 self.logger.info("File watcher started")
-            
+                # after starting the watcher, so no file added during the scan is missed
+                self._backfill_watched_files()
+
+            self.wakeup.start()
+            # the workers claim tasks on their own, idle ones wait for the wakeup channel
+            self._stopped.clear()
+            self.processor.start_workers(self.wakeup, self._next_wait_seconds)
+
             while self.running:
-                self.process_cycle()
-                time.sleep(self.processing_interval)
+                self.recover_expired_leases()
+                self._stopped.wait(self.processing_interval)
         except KeyboardInterrupt:
             pass
         finally:
@@ -154,17 +189,18 @@ class TaskQueueDaemon:
                 self.logger.info("Stopping file watcher...")
                 self.file_watcher.stop()
                 self.logger.info("File watcher stopped")
+
+            self._stopped.set()
+            # busy workers are not waited for, their tasks are released below
+            self.processor.stop_workers(self.wakeup, timeout=1)
+            self.wakeup.stop()
             
-            # Update any in_progress tasks to failed on shutdown
-            all_tasks = self.processor.manager.get_all_tasks()
-            for task in all_tasks:
-                if task.status == 'in_progress':
-                    task_id = task.task_id
-                    error_msg = "Daemon terminated during processing"
-                    self.processor.status_tracker.update_status(
-                        task_id, "failed", error=error_msg
-                    )
-                    self.logger.warning(f"Task {task_id} status updated to failed: {error_msg}")
+            # Return the in_progress tasks of this daemon to the queue, so they are resumed
+            # by the next daemon. Tasks leased by other daemons sharing the database are left alone.
+            released = self.processor.manager.release_leases(
+                self.processor.lease_owner_prefix, "Daemon terminated during processing")
+            for task_id in released:
+                self.logger.warning(f"Task {task_id} was interrupted and returned to the queue")
 
             self.processor.manager.close()
         except Exception as e:
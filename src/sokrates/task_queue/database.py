@@ -11,9 +11,12 @@ Classes:
 """
 
 from peewee import *
+from playhouse.migrate import SqliteMigrator, migrate
+import datetime
 import logging
 from typing import List, Dict, Optional
-from .orm import db, Task, TaskHistory
+from .orm import db, Task, TaskHistory, TaskMetric, SubtaskMetric, ProcessedFile, utc_now
+from sokrates.constants import Constants
 
 class TaskQueueORMDatabase:
     """
@@ -23,24 +26,58 @@ class TaskQueueORMDatabase:
     tasks, updating task status, and logging history changes. It leverages
     Peewee's ORM capabilities for type safety, security, and maintainability.
 
+    Connections are opened with a tuned pragma profile by default: WAL journaling
+    lets readers (task-list, task-status) proceed while a writer holds the lock,
+    synchronous=NORMAL avoids an fsync per commit in WAL mode and busy_timeout lets
+    concurrent writers (task-add, daemon workers) wait for the lock instead of
+    failing with "database is locked".
+
     Attributes:
         db_path (str): Path to the SQLite database file
+        pragmas (dict): SQLite pragmas applied to every connection
 
     Methods:
-        __init__(db_path: str): Initializes the database connection and creates tables
+        __init__(db_path: str, pragmas: dict): Initializes the database connection and creates tables
         add_task(): Add a new task to the queue using ORM
+        add_tasks(): Add many tasks in one transaction, handling duplicate task file contents
+        add_watched_file(), add_watched_files(): Queue files of watched directories unless they are already waiting
+        get_processed_files(), record_processed_files(), delete_processed_files():
+            Manifest of the queued files of watched directories, see TaskQueueManager.backfill_watched_files
         get_all_tasks(): Get all tasks using ORM queries
         get_pending_tasks(): Get pending tasks for processing
+        list_tasks(): Get a filtered page of tasks (keyset pagination)
+        count_tasks_by_status(): Get the number of tasks per status
+        claim_next_task(): Atomically claim the next pending task for a worker
         update_task_status(): Update task status with ORM operations
+        schedule_retry(): Reschedule a failed task for a later attempt
+        renew_leases(): Extend the leases of the tasks a daemon is working on
+        requeue_expired_leases(): Recover tasks of crashed workers
+        release_leases(): Return the tasks of a stopping daemon to the queue
+        add_task_metrics(), get_task_metrics(): Performance accounting per task attempt and subtask
+        get_finished_task_ids(), get_excess_history_ids(), delete_tasks(), delete_history(), delete_archived(), vacuum():
+            Retention and compaction, see TaskCompactor
         close(): Close the database connection (handled by Peewee)
     """
 
-    def __init__(self, db_path: str):
+    DEFAULT_PRAGMAS = {
+        "journal_mode": Constants.DEFAULT_DATABASE_JOURNAL_MODE,
+        "synchronous": Constants.DEFAULT_DATABASE_SYNCHRONOUS,
+        "busy_timeout": Constants.DEFAULT_DATABASE_BUSY_TIMEOUT_MS,
+        "cache_size": Constants.DEFAULT_DATABASE_CACHE_SIZE,
+        "mmap_size": Constants.DEFAULT_DATABASE_MMAP_SIZE
+    }
+
+    INSERT_BATCH_SIZE = 100
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict] = None):
         """
         Initializes the TaskQueueORMDatabase with configuration and database setup.
 
         Args:
             db_path (str): Path to the SQLite database file.
+            pragmas (dict, optional): SQLite pragmas for every connection (e.g. the `database`
+                section of the configuration). Defaults to DEFAULT_PRAGMAS, an empty dict
+                keeps the SQLite defaults.
         
         Side Effects:
             - Creates database tables if they don't exist
@@ -49,30 +86,293 @@ class TaskQueueORMDatabase:
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.logger.info(f"DB Path: {db_path}")
         self.db_path = db_path
-        # Initialize Peewee database instance
+        self.pragmas = dict(self.DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.logger.debug(f"DB pragmas: {self.pragmas}")
+        # Initialize Peewee database instance, the pragmas are applied on every connect
         self.db = db
-        self.db.init(db_path)
-        # Create all required tables in the database
-        self.db.create_tables([Task, TaskHistory])
+        self.db.init(db_path, pragmas=self.pragmas)
+        # Add new columns to existing tables first, indexes may depend on them
+        self._migrate_schema([Task, TaskHistory, TaskMetric, SubtaskMetric, ProcessedFile])
+        # Create all required tables and indexes in the database
+        self.db.create_tables([Task, TaskHistory, TaskMetric, SubtaskMetric, ProcessedFile])
         self.connection = self.db.connection
 
+    def _migrate_schema(self, models: List[Model]) -> None:
+        """
+        Adds columns introduced by newer versions to tables of an existing database.
+
+        Args:
+            models (List[Model]): The models whose tables should be migrated
+        """
+        migrator = SqliteMigrator(self.db)
+        operations = []
+        for model in models:
+            if not model.table_exists():
+                continue
+            existing_columns = {column.name for column in self.db.get_columns(model._meta.table_name)}
+            for field in model._meta.sorted_fields:
+                if field.column_name not in existing_columns:
+                    self.logger.info(f"Adding column {field.column_name} to table {model._meta.table_name}")
+                    operations.append(migrator.add_column(model._meta.table_name, field.column_name, field))
+        if operations:
+            with self.db.atomic():
+                migrate(*operations)
+
     def add_task(self, description: str, file_path: str,
-                 priority: str = "normal") -> Task:
-        """Add a new task to the queue using ORM"""
+                 priority: str = "normal", content_hash: Optional[str] = None,
+                 duplicate_policy: str = Task.DUPLICATE_POLICIES[0]) -> Task:
+        """
+        Add a new task to the queue using ORM.
+
+        Args:
+            description (str): Task description
+            file_path (str): Path of the task file
+            priority (str): Task priority. Defaults to "normal".
+            content_hash (str, optional): Hash of the task file content, enables the duplicate check
+            duplicate_policy (str): Handling of duplicates, see add_tasks(). Defaults to "reject".
+
+        Returns:
+            Task: The added task, with "coalesce" the existing task of a duplicate
+
+        Raises:
+            ValueError: If the priority is invalid or the duplicate is rejected
+        """
         self.logger.info(f"Adding task with: file_path={file_path}")
-        try:
-            # Create new task instance with all required fields
-            new_task = Task.create(
-                description=description,
-                file_path=file_path,
-                priority=priority
-            )
-            return new_task
+        added = self.add_tasks([{'description': description, 'file_path': file_path, 'priority': priority,
+                                 'content_hash': content_hash}], duplicate_policy=duplicate_policy)[0]
+        if added['task_id'] is None:
+            raise ValueError(f"Task already exists: duplicate of task {added['duplicate_of']}")
+        return Task.get_by_id(added['task_id'])
 
+    def add_tasks(self, tasks: List[Dict], duplicate_policy: str = Task.DUPLICATE_POLICIES[0]) -> List[Dict]:
+        """
+        Add many tasks in one transaction with multi-row inserts.
+
+        Tasks with a content_hash are duplicates if a pending or in_progress task, or an
+        earlier task of the same call, has the same hash. The duplicate_policy decides:
+            reject:   the duplicate is not added
+            coalesce: the duplicate is not added, the id of the existing task is returned
+            link:     the duplicate is added with status 'linked' and refers to the existing
+                      task, whose result it shares. Completed tasks count as existing as well.
+
+        Args:
+            tasks (List[Dict]): Tasks with description, file_path and optional priority, task_type and content_hash
+            duplicate_policy (str): One of Task.DUPLICATE_POLICIES. Defaults to "reject".
+
+        Returns:
+            List[Dict]: Per task in input order: task_id (None if rejected) and duplicate_of
+                (the id of the existing task, None if the task is not a duplicate)
+
+        Raises:
+            ValueError: If a task has an invalid priority or task_type or the duplicate policy
+                is unknown (nothing is added)
+        """
+        if duplicate_policy not in Task.DUPLICATE_POLICIES:
+            raise ValueError(f"Invalid duplicate policy: {duplicate_policy}. Valid policies: {', '.join(Task.DUPLICATE_POLICIES)}")
+        rows = []
+        for task in tasks:
+            priority = task.get('priority') or 'normal'
+            if priority not in Task.PRIORITIES:
+                raise ValueError(f"Invalid priority: {priority}. Valid priorities: {', '.join(Task.PRIORITIES)}")
+            task_type = task.get('task_type') or Task.TASK_TYPES[0]
+            if task_type not in Task.TASK_TYPES:
+                raise ValueError(f"Invalid task type: {task_type}. Valid task types: {', '.join(Task.TASK_TYPES)}")
+            now = utc_now()
+            rows.append({'description': task['description'], 'file_path': task['file_path'],
+                         'task_type': task_type,
+                         'priority': priority, 'content_hash': task.get('content_hash'),
+                         'created_at': now, 'updated_at': now})
+
+        self.logger.info(f"Adding {len(rows)} tasks ...")
+        results = [{'task_id': None, 'duplicate_of': None} for _ in rows]
+        try:
+            self._add_rows(rows, results, duplicate_policy)
         except IntegrityError as e:
-            print(f"Error: Task already exists: {e}")
+            # the unique index on active content hashes is the last line of defense
             raise ValueError(f"Task already exists: {e}")
 
+        rejected = [result['duplicate_of'] for result in results if result['task_id'] is None]
+        if rejected:
+            self.logger.info(f"Rejected {len(rejected)} duplicate tasks of tasks {rejected}")
+        return results
+
+    def add_watched_file(self, description: str, file_path: str, priority: str = "normal") -> Dict:
+        """
+        Queue a file of a watched directory as a 'watched_file' task, see add_watched_files().
+
+        Args:
+            description (str): Task description
+            file_path (str): Path of the watched file
+            priority (str): Task priority. Defaults to "normal".
+
+        Returns:
+            Dict: task_id and duplicate_of (the id of the pending task of the file, None if it was added)
+
+        Raises:
+            ValueError: If the priority is invalid
+        """
+        return self.add_watched_files([{'description': description, 'file_path': file_path}], priority=priority)[0]
+
+    def add_watched_files(self, files: List[Dict], priority: str = "normal") -> List[Dict]:
+        """
+        Queue files of watched directories as 'watched_file' tasks in one transaction.
+
+        A file that already has a pending task is not queued again, so repeated
+        detections of a file (e.g. by the startup scan and the watcher, or by several
+        daemons watching the same directory) result in a single execution. Files with
+        a size and mtime are recorded in the processed files manifest.
+
+        Args:
+            files (List[Dict]): Files with description, file_path and optional size, mtime_ns and content_hash
+            priority (str): Task priority. Defaults to "normal".
+
+        Returns:
+            List[Dict]: Per file in input order: task_id and duplicate_of (the id of the
+                pending task of the file, None if it was added)
+
+        Raises:
+            ValueError: If the priority is invalid
+        """
+        with self.db.atomic('IMMEDIATE'):
+            pending = {}
+            for batch in chunked(list({file['file_path'] for file in files}), self.INSERT_BATCH_SIZE):
+                query = (Task.select(Task.task_id, Task.file_path)
+                         .where(Task.file_path.in_(batch) & (Task.task_type == 'watched_file')
+                                & (Task.status == 'pending'))
+                         .tuples())
+                pending.update({file_path: task_id for task_id, file_path in query})
+
+            # the same file twice in one call is queued once
+            new_files = {}
+            for file in files:
+                if file['file_path'] not in pending:
+                    new_files.setdefault(file['file_path'], file)
+            added = self.add_tasks([{'description': file['description'], 'file_path': file_path,
+                                     'priority': priority, 'task_type': 'watched_file'}
+                                    for file_path, file in new_files.items()])
+            added_ids = {file_path: result['task_id'] for file_path, result in zip(new_files, added)}
+
+            results = []
+            for file in files:
+                task_id = pending.get(file['file_path'])
+                if task_id is not None:
+                    results.append({'task_id': task_id, 'duplicate_of': task_id})
+                else:
+                    results.append({'task_id': added_ids[file['file_path']], 'duplicate_of': None})
+
+            self.record_processed_files([dict(file, task_id=result['task_id'])
+                                         for file, result in zip(files, results) if file.get('mtime_ns') is not None])
+        return results
+
+    def get_processed_files(self) -> Dict[str, tuple]:
+        """
+        Get the manifest of queued watched files with one query.
+
+        Returns:
+            Dict[str, tuple]: (size, mtime_ns, content_hash) per file path
+        """
+        query = ProcessedFile.select(ProcessedFile.file_path, ProcessedFile.size,
+                                     ProcessedFile.mtime_ns, ProcessedFile.content_hash).tuples()
+        return {file_path: (size, mtime_ns, content_hash) for file_path, size, mtime_ns, content_hash in query}
+
+    def record_processed_files(self, files: List[Dict]) -> None:
+        """
+        Insert or update manifest entries with multi-row upserts.
+
+        Args:
+            files (List[Dict]): Files with file_path, size, mtime_ns and optional content_hash and task_id
+        """
+        now = utc_now()
+        rows = [{'file_path': file['file_path'], 'size': file['size'], 'mtime_ns': file['mtime_ns'],
+                 'content_hash': file.get('content_hash'), 'task_id': file.get('task_id'), 'updated_at': now}
+                for file in files]
+        with self.db.atomic('IMMEDIATE'):
+            for batch in chunked(rows, self.INSERT_BATCH_SIZE):
+                (ProcessedFile.insert_many(batch)
+                 .on_conflict(conflict_target=[ProcessedFile.file_path],
+                              preserve=[ProcessedFile.size, ProcessedFile.mtime_ns, ProcessedFile.content_hash,
+                                        ProcessedFile.updated_at],
+                              # a touched file keeps the task that executed its content
+                              update={ProcessedFile.task_id: fn.COALESCE(SQL('excluded.task_id'), ProcessedFile.task_id)})
+                 .execute())
+
+    def delete_processed_files(self, file_paths: List[str]) -> int:
+        """
+        Delete manifest entries, e.g. of files that were removed from a watched directory.
+
+        Args:
+            file_paths (List[str]): The file paths
+
+        Returns:
+            int: Number of deleted entries
+        """
+        deleted = 0
+        with self.db.atomic('IMMEDIATE'):
+            for batch in chunked(file_paths, self.INSERT_BATCH_SIZE):
+                deleted += ProcessedFile.delete().where(ProcessedFile.file_path.in_(batch)).execute()
+        return deleted
+
+    def _add_rows(self, rows: List[Dict], results: List[Dict], duplicate_policy: str) -> None:
+        """Resolves the duplicates of the task rows and inserts them in one transaction, see add_tasks()"""
+        with self.db.atomic('IMMEDIATE'):
+            existing = self._find_tasks_by_content_hash({row['content_hash'] for row in rows if row['content_hash']},
+                                                        include_completed=duplicate_policy == 'link')
+            new_rows, duplicates, first_by_hash = [], [], {}
+            for position, row in enumerate(rows):
+                content_hash = row['content_hash']
+                if content_hash in existing:
+                    results[position]['duplicate_of'] = existing[content_hash]
+                    duplicates.append(position)
+                elif content_hash in first_by_hash:
+                    duplicates.append(position)
+                else:
+                    if content_hash:
+                        first_by_hash[content_hash] = position
+                    new_rows.append(position)
+
+            self._insert_rows([rows[position] for position in new_rows],
+                              [results[position] for position in new_rows])
+            linked_rows, linked_results = [], []
+            for position in duplicates:
+                result = results[position]
+                if result['duplicate_of'] is None:
+                    # duplicate within this call: refers to the first task with the same content
+                    result['duplicate_of'] = results[first_by_hash[rows[position]['content_hash']]]['task_id']
+                if duplicate_policy == 'coalesce':
+                    result['task_id'] = result['duplicate_of']
+                elif duplicate_policy == 'link':
+                    linked_rows.append(dict(rows[position], status='linked', duplicate_of=result['duplicate_of']))
+                    linked_results.append(result)
+            self._insert_rows(linked_rows, linked_results)
+
+    def _insert_rows(self, rows: List[Dict], results: List[Dict]) -> None:
+        """Inserts task rows with multi-row inserts and stores the new ids in the results"""
+        task_ids = []
+        # stay below the sqlite limit of variables per statement
+        for batch in chunked(rows, self.INSERT_BATCH_SIZE):
+            last_id = Task.insert_many(batch).execute()
+            # rowids of a multi-row insert are consecutive while the write lock is held
+            task_ids.extend(range(last_id - len(batch) + 1, last_id + 1))
+        for result, task_id in zip(results, task_ids):
+            result['task_id'] = task_id
+
+    def _find_tasks_by_content_hash(self, content_hashes: set, include_completed: bool = False) -> Dict[str, int]:
+        """
+        Returns the newest pending or in_progress (optionally also completed) task per content hash.
+
+        Returns:
+            Dict[str, int]: The task id per content hash
+        """
+        statuses = Task.ACTIVE_STATUSES + (['completed'] if include_completed else [])
+        found = {}
+        for batch in chunked(list(content_hashes), self.INSERT_BATCH_SIZE):
+            query = (Task.select(Task.task_id, Task.content_hash)
+                     .where(Task.content_hash.in_(batch) & Task.status.in_(statuses))
+                     .order_by(Task.task_id)
+                     .tuples())
+            found.update({content_hash: task_id for task_id, content_hash in query})
+        return found
+
     def get_task(self, task_id) -> Task:
         self.logger.info("Retrieving task with id: {task_id} ...")
         return Task.select().where(Task.task_id==task_id).get()
@@ -85,13 +385,179 @@ class TaskQueueORMDatabase:
             query = query.limit(limit)
         return query
 
+    def list_tasks(self, status: Optional[str] = None, priority: Optional[str] = None,
+                   created_after: Optional[datetime.datetime] = None,
+                   created_before: Optional[datetime.datetime] = None,
+                   after_id: Optional[int] = None, limit: int = 50,
+                   newest_first: bool = False) -> List[Task]:
+        """
+        Get a page of tasks, filtered in the database and ordered by task id.
+
+        Pagination is keyset based: pass the id of the last task of a page as after_id
+        to get the next page. Unlike OFFSET, this does not read the skipped rows, so
+        late pages of a large queue are as fast as the first one.
+
+        Args:
+            status (str, optional): Only tasks with this status
+            priority (str, optional): Only tasks with this priority
+            created_after (datetime.datetime, optional): Only tasks created at or after this time (UTC)
+            created_before (datetime.datetime, optional): Only tasks created before this time (UTC)
+            after_id (int, optional): Id of the last task of the previous page
+            limit (int): Maximum number of tasks. Defaults to 50.
+            newest_first (bool): Order by descending task id. Defaults to False.
+
+        Returns:
+            List[Task]: The tasks of the page
+        """
+        query = Task.select()
+        if status is not None:
+            query = query.where(Task.status == status)
+        if priority is not None:
+            query = query.where(Task.priority == priority)
+        if created_after is not None:
+            query = query.where(Task.created_at >= created_after)
+        if created_before is not None:
+            query = query.where(Task.created_at < created_before)
+        if after_id is not None:
+            query = query.where(Task.task_id < after_id if newest_first else Task.task_id > after_id)
+        query = query.order_by(Task.task_id.desc() if newest_first else Task.task_id)
+        return list(query.limit(limit))
+
+    def count_tasks_by_status(self) -> Dict[str, int]:
+        """
+        Get the number of tasks per status with one GROUP BY query on the status index.
+
+        Returns:
+            Dict[str, int]: Number of tasks for each status that has tasks
+        """
+        query = (Task.select(Task.status, fn.COUNT(Task.task_id).alias('count'))
+                 .group_by(Task.status)
+                 .tuples())
+        return {status: count for status, count in query}
+
     def get_pending_tasks(self, limit: Optional[int] = None) -> List[Dict]:
-        """Get pending tasks for processing using ORM"""
+        """
+        Get pending tasks in scheduling order: by priority, then oldest first.
+
+        Each priority is read with its own query, so the (status, priority, created_at)
+        index serves the ordering. Aging is not applied here.
+        """
         self.logger.info("Retrieving all pending tasks ...")
-        query = Task.select().where(Task.status == 'pending')
-        if limit is not None:
-            query = query.limit(limit)
-        return [row for row in query.dicts()]
+        tasks = []
+        for condition in self._priority_conditions():
+            query = (Task.select()
+                     .where((Task.status == 'pending') & condition)
+                     .order_by(Task.created_at, Task.task_id))
+            if limit is not None:
+                if len(tasks) >= limit:
+                    break
+                query = query.limit(limit - len(tasks))
+            tasks.extend(query.dicts())
+        return tasks
+
+    def _priority_conditions(self) -> List:
+        """
+        Returns one filter per scheduling priority, highest first.
+        Tasks with a priority outside Task.PRIORITIES are scheduled last.
+        """
+        return ([Task.priority == priority for priority in Task.PRIORITIES] +
+                [Task.priority.not_in(Task.PRIORITIES)])
+
+    @staticmethod
+    def _due_condition(now: datetime.datetime):
+        """Filter for tasks that are not waiting for a scheduled retry"""
+        return Task.next_attempt_at.is_null() | (Task.next_attempt_at <= now)
+
+    def _select_next_pending_task(self, aging_seconds: Optional[float] = None) -> Optional[Task]:
+        """
+        Selects the task to run next: the oldest pending task of the highest priority.
+        Tasks waiting for a scheduled retry are skipped until their next_attempt_at.
+
+        Only the head of each priority queue is read (one index seek per priority).
+        With aging, a task gains one priority level per aging_seconds it has been
+        waiting, so low priority tasks are not starved by a steady stream of
+        high priority tasks.
+
+        Args:
+            aging_seconds (float, optional): Waiting time per priority level gained. None or 0 disables aging.
+
+        Returns:
+            Optional[Task]: The next task, or None if no task is pending
+        """
+        now = utc_now()
+        heads = []
+        for rank, condition in enumerate(self._priority_conditions()):
+            head = (Task.select()
+                    .where((Task.status == 'pending') & condition & self._due_condition(now))
+                    .order_by(Task.created_at, Task.task_id)
+                    .first())
+            if head is not None:
+                heads.append((rank, head))
+                if not aging_seconds:
+                    break
+
+        if not heads:
+            return None
+        if not aging_seconds:
+            return heads[0][1]
+
+        def effective_rank(entry):
+            rank, task = entry
+            waited = (now - self._as_datetime(task.created_at)).total_seconds()
+            return (max(0, rank - int(waited // aging_seconds)), str(task.created_at), task.task_id)
+        return min(heads, key=effective_rank)[1]
+
+    @staticmethod
+    def _as_datetime(value) -> datetime.datetime:
+        """Converts a stored timestamp (timezone aware timestamps are returned as strings) to a UTC datetime"""
+        if isinstance(value, str):
+            value = datetime.datetime.fromisoformat(value)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value
+
+    def claim_next_task(self, lease_owner: Optional[str] = None,
+                        lease_seconds: Optional[float] = None,
+                        aging_seconds: Optional[float] = None) -> Optional[Dict]:
+        """
+        Atomically claims the next pending task and marks it as in_progress.
+
+        The select and the status update run in one IMMEDIATE transaction, so
+        concurrent workers (threads or daemon processes sharing the database)
+        never claim the same task. The claiming worker is recorded as lease owner
+        and the attempt counter of the task is incremented.
+        Tasks are claimed by priority and then in FIFO order.
+
+        Args:
+            lease_owner (str, optional): Identifier of the claiming worker
+            lease_seconds (float, optional): Duration of the lease. If None, the lease does not expire.
+            aging_seconds (float, optional): Waiting time after which a task is promoted by one priority level.
+
+        Returns:
+            Optional[Dict]: The claimed task, or None if no task is pending
+        """
+        # an idle queue is detected with a plain read, without taking the write lock
+        if self._select_next_pending_task(aging_seconds) is None:
+            return None
+
+        with self.db.atomic('IMMEDIATE'):
+            task = self._select_next_pending_task(aging_seconds)
+            if task is None:
+                return None
+
+            now = utc_now()
+            lease_expires_at = now + datetime.timedelta(seconds=lease_seconds) if lease_seconds is not None else None
+            claimed = (Task.update(status='in_progress', updated_at=now,
+                                   lease_owner=lease_owner, lease_expires_at=lease_expires_at,
+                                   attempts=Task.attempts + 1, next_attempt_at=None)
+                       .where((Task.task_id == task.task_id) & (Task.status == 'pending'))
+                       .execute())
+            if not claimed:
+                return None
+
+            TaskHistory.create(task=task.task_id, status='in_progress')
+            self.logger.info(f"Claimed task with id: {task.task_id} (lease owner: {lease_owner})")
+            return Task.select().where(Task.task_id == task.task_id).dicts().get()
 
     def update_task_status(self, task_id: str, status: str,
                            result: Optional[str] = None, error: Optional[str] = None,
@@ -101,23 +567,34 @@ class TaskQueueORMDatabase:
         self.logger.info(f"Updating task status for task with id: {task_id} ...")
 
         try:
-            # Retrieve the task
-            task = Task.get(Task.task_id == task_id)
-            
-            # Update fields directly on model instance
-            task.status = status
-            task.result = result
-            task.error_message = error
-            task.output_directory = output_directory
-            task.save()
-            
-            # Log to history table using ORM
-            TaskHistory.create(
-                task=task,
-                status=status,
-                result=result,
-                error_message=error
-            )
+            # status and history are written together, even with concurrent workers.
+            # IMMEDIATE takes the write lock upfront instead of failing on lock upgrade.
+            with self.db.atomic('IMMEDIATE'):
+                # Retrieve the task
+                task = Task.get(Task.task_id == task_id)
+                
+                # Update fields directly on model instance
+                task.status = status
+                task.result = result
+                task.error_message = error
+                if error is not None:
+                    task.last_error = error
+                if output_directory is not None:
+                    task.output_directory = output_directory
+                task.updated_at = utc_now()
+                if status != 'in_progress':
+                    # the task is no longer worked on
+                    task.lease_owner = None
+                    task.lease_expires_at = None
+                task.save()
+                
+                # Log to history table using ORM
+                TaskHistory.create(
+                    task=task,
+                    status=status,
+                    result=result,
+                    error_message=error
+                )
         except DoesNotExist:
             print(f"Task {task_id} not found")
             raise ValueError(f"Task {task_id} not found")
@@ -125,6 +602,335 @@ class TaskQueueORMDatabase:
             print(f"Failed to update task status: {e}")
             raise
     
+    def schedule_retry(self, task_id: str, error: str, delay_seconds: float) -> None:
+        """
+        Reschedule a failed task: it becomes pending again, but is not claimed
+        before the retry delay has passed. Workers keep processing other tasks
+        in the meantime and the retry survives daemon restarts.
+
+        Args:
+            task_id (str): Unique identifier for the task
+            error (str): Error of the failed attempt
+            delay_seconds (float): Delay until the task may be claimed again
+
+        Raises:
+            ValueError: If the task does not exist
+        """
+        now = utc_now()
+        with self.db.atomic('IMMEDIATE'):
+            updated = (Task.update(status='pending', updated_at=now,
+                                   next_attempt_at=now + datetime.timedelta(seconds=delay_seconds),
+                                   error_message=error, last_error=error,
+                                   lease_owner=None, lease_expires_at=None)
+                       .where(Task.task_id == task_id)
+                       .execute())
+            if not updated:
+                raise ValueError(f"Task {task_id} not found")
+            TaskHistory.create(task=task_id, status='retrying', error_message=error)
+        self.logger.info(f"Task {task_id} scheduled for retry in {delay_seconds}s")
+
+    def get_next_attempt_at(self) -> Optional[datetime.datetime]:
+        """
+        Get the earliest scheduled retry of the pending tasks.
+
+        Returns:
+            Optional[datetime.datetime]: The earliest next_attempt_at in UTC, or None if no retry is scheduled
+        """
+        next_attempt_at = (Task.select(fn.MIN(Task.next_attempt_at))
+                           .where((Task.status == 'pending') & Task.next_attempt_at.is_null(False))
+                           .scalar())
+        return self._as_datetime(next_attempt_at) if next_attempt_at is not None else None
+
+    def set_task_output_directory(self, task_id: str, output_directory: str) -> None:
+        """
+        Store the output directory of a task without changing its status.
+
+        Args:
+            task_id (str): Unique identifier for the task
+            output_directory (str): Output directory of the task
+        """
+        Task.update(output_directory=output_directory, updated_at=utc_now()).where(Task.task_id == task_id).execute()
+
+    def get_leased_tasks(self, lease_owner_prefix: str) -> List[Task]:
+        """
+        Get the in_progress tasks leased by a worker or a group of workers.
+
+        Args:
+            lease_owner_prefix (str): Lease owner or lease owner prefix (e.g. the `host:pid` of a daemon)
+
+        Returns:
+            List[Task]: The leased tasks
+        """
+        query = Task.select().where((Task.status == 'in_progress') &
+                                    (Task.lease_owner.startswith(lease_owner_prefix)))
+        return list(query)
+
+    def renew_leases(self, lease_owner_prefix: str, lease_seconds: float) -> int:
+        """
+        Extend the leases of the in_progress tasks leased by a worker or a group of workers.
+
+        Args:
+            lease_owner_prefix (str): Lease owner or lease owner prefix (e.g. the `host:pid` of a daemon)
+            lease_seconds (float): New duration of the leases from now
+
+        Returns:
+            int: Number of renewed leases
+        """
+        lease_expires_at = utc_now() + datetime.timedelta(seconds=lease_seconds)
+        with self.db.atomic('IMMEDIATE'):
+            return (Task.update(lease_expires_at=lease_expires_at)
+                    .where((Task.status == 'in_progress') &
+                           (Task.lease_owner.startswith(lease_owner_prefix)))
+                    .execute())
+
+    def requeue_expired_leases(self, max_attempts: Optional[int] = None) -> List[int]:
+        """
+        Return in_progress tasks whose lease has expired to the queue.
+
+        A lease expires when its worker stopped renewing it, e.g. because the daemon
+        was killed or ran out of memory. Only the (status, lease_expires_at) index
+        range of expired leases is read, not the whole table.
+
+        Args:
+            max_attempts (int, optional): Tasks that already used this many attempts are
+                marked failed instead, so a task crashing its worker is not requeued forever.
+
+        Returns:
+            List[int]: Ids of the recovered tasks
+        """
+        now = utc_now()
+        with self.db.atomic('IMMEDIATE'):
+            expired = list(Task.select(Task.task_id, Task.attempts, Task.lease_owner)
+                           .where((Task.status == 'in_progress') & (Task.lease_expires_at < now)))
+            for task in expired:
+                error = f"Lease of {task.lease_owner} expired"
+                if max_attempts is not None and task.attempts >= max_attempts:
+                    status, error = 'failed', f"{error} after {task.attempts} attempts"
+                else:
+                    status = 'pending'
+                Task.update(status=status, updated_at=now, lease_owner=None, lease_expires_at=None,
+                            error_message=error, last_error=error).where(Task.task_id == task.task_id).execute()
+                TaskHistory.create(task=task.task_id, status=status, error_message=error)
+                self.logger.warning(f"Task {task.task_id}: {error}, status set to {status}")
+        return [task.task_id for task in expired]
+
+    def release_leases(self, lease_owner_prefix: str, reason: str) -> List[int]:
+        """
+        Return the in_progress tasks of a worker or a group of workers to the queue.
+        The interrupted attempt is not counted.
+
+        Args:
+            lease_owner_prefix (str): Lease owner or lease owner prefix (e.g. the `host:pid` of a daemon)
+            reason (str): Reason recorded in the task history
+
+        Returns:
+            List[int]: Ids of the released tasks
+        """
+        now = utc_now()
+        with self.db.atomic('IMMEDIATE'):
+            leased = [task.task_id for task in self.get_leased_tasks(lease_owner_prefix)]
+            if leased:
+                (Task.update(status='pending', updated_at=now, lease_owner=None, lease_expires_at=None,
+                             attempts=fn.MAX(Task.attempts - 1, 0))
+                 .where(Task.task_id.in_(leased) & (Task.status == 'in_progress'))
+                 .execute())
+                TaskHistory.insert_many([{'task': task_id, 'status': 'pending', 'error_message': reason}
+                                         for task_id in leased]).execute()
+        return leased
+
+    def get_finished_task_ids(self, finished_before: datetime.datetime) -> List[int]:
+        """
+        Get the ids of completed, failed and linked tasks that were last updated before a point in time.
+        Tasks that other tasks are linked to are only returned together with all of their linked
+        tasks, so no remaining task refers to a deleted original.
+
+        Args:
+            finished_before (datetime.datetime): Only tasks updated before this time are returned
+
+        Returns:
+            List[int]: The task ids, oldest first
+        """
+        finished_statuses = ['completed', 'failed', 'linked']
+        linked = Task.alias()
+        live_links = (linked.select(linked.task_id)
+                      .where((linked.duplicate_of == Task.task_id)
+                             & ~(linked.status.in_(finished_statuses) & (linked.updated_at < finished_before))))
+        query = (Task.select(Task.task_id)
+                 .where(Task.status.in_(finished_statuses) & (Task.updated_at < finished_before)
+                        & ~fn.EXISTS(live_links))
+                 .order_by(Task.task_id))
+        return [task.task_id for task in query]
+
+    def get_tasks(self, task_ids: List[int]) -> List[Dict]:
+        """
+        Get tasks by id.
+
+        Args:
+            task_ids (List[int]): The task ids
+
+        Returns:
+            List[Dict]: The tasks as dicts, ordered by id
+        """
+        tasks = []
+        for batch in chunked(task_ids, self.INSERT_BATCH_SIZE):
+            tasks.extend(Task.select().where(Task.task_id.in_(batch)).order_by(Task.task_id).dicts())
+        return tasks
+
+    def get_history(self, task_ids: Optional[List[int]] = None,
+                    history_ids: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Get history entries of tasks, or history entries by id.
+
+        Args:
+            task_ids (List[int], optional): Return all history entries of these tasks
+            history_ids (List[int], optional): Return these history entries
+
+        Returns:
+            List[Dict]: The history entries as dicts (`task` is the task id), oldest first
+        """
+        column, ids = (TaskHistory.task, task_ids) if task_ids is not None else (TaskHistory.history_id, history_ids or [])
+        history = []
+        for batch in chunked(ids, self.INSERT_BATCH_SIZE):
+            history.extend(TaskHistory.select().where(column.in_(batch)).dicts())
+        return sorted(history, key=lambda entry: entry['history_id'])
+
+    def get_excess_history_ids(self, max_per_task: int) -> List[int]:
+        """
+        Get the history entries exceeding the newest max_per_task entries of each task.
+
+        Args:
+            max_per_task (int): Number of history entries to keep per task
+
+        Returns:
+            List[int]: Ids of the older history entries
+        """
+        ranked = (TaskHistory.select(TaskHistory.history_id,
+                                     fn.ROW_NUMBER().over(partition_by=[TaskHistory.task],
+                                                          order_by=[TaskHistory.history_id.desc()]).alias('position'))
+                  .alias('ranked'))
+        query = (TaskHistory.select(ranked.c.history_id)
+                 .from_(ranked)
+                 .where(ranked.c.position > max_per_task)
+                 .order_by(ranked.c.history_id))
+        return [row[0] for row in query.tuples()]
+
+    def delete_tasks(self, task_ids: List[int]) -> int:
+        """
+        Delete tasks with their history and metrics in one transaction.
+
+        Args:
+            task_ids (List[int]): The task ids
+
+        Returns:
+            int: Number of deleted tasks
+        """
+        deleted = 0
+        with self.db.atomic('IMMEDIATE'):
+            for batch in chunked(task_ids, self.INSERT_BATCH_SIZE):
+                TaskHistory.delete().where(TaskHistory.task.in_(batch)).execute()
+                metric_ids = TaskMetric.select(TaskMetric.metric_id).where(TaskMetric.task.in_(batch))
+                SubtaskMetric.delete().where(SubtaskMetric.metric.in_(metric_ids)).execute()
+                TaskMetric.delete().where(TaskMetric.task.in_(batch)).execute()
+                deleted += Task.delete().where(Task.task_id.in_(batch)).execute()
+        return deleted
+
+    def delete_archived(self, task_ids: List[int], history_ids: List[int]) -> int:
+        """
+        Delete archived tasks (with their history and metrics) and trimmed history entries
+        in one transaction, so either all archived rows are deleted or none.
+
+        Args:
+            task_ids (List[int]): The ids of the archived tasks
+            history_ids (List[int]): The ids of the trimmed history entries
+
+        Returns:
+            int: Number of deleted tasks
+        """
+        with self.db.atomic('IMMEDIATE'):
+            self.delete_history(history_ids)
+            return self.delete_tasks(task_ids)
+
+    def delete_history(self, history_ids: List[int]) -> int:
+        """
+        Delete history entries in one transaction.
+
+        Args:
+            history_ids (List[int]): The history entry ids
+
+        Returns:
+            int: Number of deleted history entries
+        """
+        deleted = 0
+        with self.db.atomic('IMMEDIATE'):
+            for batch in chunked(history_ids, self.INSERT_BATCH_SIZE):
+                deleted += TaskHistory.delete().where(TaskHistory.history_id.in_(batch)).execute()
+        return deleted
+
+    METRIC_FIELDS = ('model', 'provider', 'generations', 'prompt_tokens', 'completion_tokens',
+                     'usage_estimated', 'time_to_first_token', 'generation_time', 'wall_time')
+
+    def add_task_metrics(self, task_id: Optional[int], status: str, metrics: Dict,
+                         subtasks: Optional[List[Dict]] = None, attempt: int = 1,
+                         source: Optional[str] = None) -> int:
+        """
+        Record the performance of a task attempt and its subtasks in one transaction.
+
+        Args:
+            task_id (int, optional): The task, None for work without a task (e.g. watched files)
+            status (str): Outcome of the attempt ('completed' or 'failed')
+            metrics (dict): Summary of the attempt, see GenerationMetrics.summarize, plus wall_time
+            subtasks (List[dict], optional): Per subtask: subtask_id, status and the same metrics keys
+            attempt (int): The attempt number of the task. Defaults to 1.
+            source (str, optional): Origin of work without a task, e.g. the file path
+
+        Returns:
+            int: The id of the task metric
+        """
+        with self.db.atomic('IMMEDIATE'):
+            metric = TaskMetric.create(task=task_id, source=source, attempt=attempt, status=status,
+                                       **self._metric_values(TaskMetric, metrics))
+            rows = [{"metric": metric.metric_id, "subtask_id": str(subtask['subtask_id']), "status": subtask['status'],
+                     **self._metric_values(SubtaskMetric, subtask)}
+                    for subtask in subtasks or []]
+            for batch in chunked(rows, self.INSERT_BATCH_SIZE):
+                SubtaskMetric.insert_many(batch).execute()
+        return metric.metric_id
+
+    def _metric_values(self, model, metrics: Dict) -> Dict:
+        """Returns a value for every metric column, missing values get the column default"""
+        return {field: metrics[field] if metrics.get(field) is not None else getattr(model, field).default
+                for field in self.METRIC_FIELDS}
+
+    def get_task_metrics(self, task_id: int) -> List[Dict]:
+        """
+        Get the recorded metrics of a task, one entry per attempt, oldest first.
+
+        Args:
+            task_id (int): The task id
+
+        Returns:
+            List[Dict]: The task metrics, each with a `subtasks` list
+        """
+        metrics = list(TaskMetric.select().where(TaskMetric.task == task_id).order_by(TaskMetric.metric_id).dicts())
+        subtasks = {}
+        if metrics:
+            query = (SubtaskMetric.select()
+                     .where(SubtaskMetric.metric.in_([metric['metric_id'] for metric in metrics]))
+                     .order_by(SubtaskMetric.subtask_metric_id)
+                     .dicts())
+            for subtask in query:
+                subtasks.setdefault(subtask['metric'], []).append(subtask)
+        for metric in metrics:
+            metric['subtasks'] = subtasks.get(metric['metric_id'], [])
+        return metrics
+
+    def vacuum(self) -> None:
+        """Rebuilds the database file to return the space of deleted rows to the filesystem"""
+        self.db.execute_sql("VACUUM")
+        if str(self.pragmas.get("journal_mode", "")).lower() == "wal":
+            # VACUUM writes the whole database through the WAL, truncate it afterwards
+            self.db.execute_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def remove_task(self, task_id: str) -> None:
         """
         Remove a task from the queue.
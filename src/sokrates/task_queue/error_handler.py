@@ -44,7 +44,7 @@ class ErrorHandler:
 
         Args:
             task (dict): Task information
-            current_attempt (int): Current retry attempt number
+            current_attempt (int): Number of the failed attempt (the persisted attempts of the task)
 
         Returns:
             bool: True if task should be retried, False otherwise
@@ -86,7 +86,8 @@ class ErrorHandler:
 
     def handle_failure(self, manager, task_id, error_message, current_attempt=1):
         """
-        Handle task failure by updating status and determining next steps.
+        Handle task failure by rescheduling or failing the task.
+        Retries are scheduled with exponential backoff instead of blocking the caller.
 
         Args:
             manager: TaskQueueManager instance for database operations
@@ -98,11 +99,11 @@ class ErrorHandler:
             str: Next action ("retry", "dead_letter", or "fail")
         """
         if self.should_retry(None, current_attempt):
-            # Update status to retrying and calculate delay
-            manager.update_task_status(
+            # Reschedule the task, it is claimed again once the delay has passed
+            manager.schedule_retry(
                 task_id,
-                "retrying",
-                error=error_message
+                error_message,
+                self.get_retry_delay(current_attempt)
             )
             return "retry"
         else:
@@ -7,14 +7,19 @@ the existing prompt refinement and execution pipeline.
 """
 
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from sokrates.file_helper import FileHelper
 from sokrates.prompt_refiner import PromptRefiner
 from sokrates.llm_api import LLMApi
+from sokrates.generation_metrics import GenerationMetrics
+from sokrates.constants import Constants
+from sokrates.refinement_cache import RefinementCache
 
 
 class FileProcessor:
@@ -24,6 +29,13 @@ class FileProcessor:
     This class reads file contents, refines them using the existing PromptRefiner,
     and executes them via the LLM API, following the same workflow as the
     existing task processing system.
+
+    Every file can select its provider in the frontmatter. Requests are sent
+    through one LLMApi per provider and at most `max_concurrent_requests` (from
+    the provider configuration) are in flight per provider. Files dispatched with
+    process_files() or provider_executor() run on an executor of their provider
+    sized to that limit, so the files of a slow provider never occupy the threads
+    of the other providers.
     """
 
     DEFAULT_MAX_TOKENS_REFINEMENT = 6000
@@ -43,11 +55,13 @@ class FileProcessor:
         # Initialize components
         self.refiner = PromptRefiner()
 
-        default_provider = config.get_default_provider()
-        self.llm_api = LLMApi(
-            api_endpoint=default_provider.get('api_endpoint'),
-            api_key=default_provider.get('api_key')
-        )
+        # per provider name: LLMApi, the semaphore limiting its requests in flight
+        # and the executor running the files dispatched to the provider
+        self._llm_apis = {}
+        self._provider_slots = {}
+        self._provider_executors = {}
+        self._provider_lock = threading.Lock()
+        self.llm_api = self._get_llm_api(config.get_default_provider())
         
         # Output directory for file processing results
         self.output_dir = config.get('home_path') / "tasks" / "results"
@@ -58,6 +72,77 @@ class FileProcessor:
         self.refinement_prompt = self._load_refinement_prompt()
         
     
+    def _get_llm_api(self, provider_config: Dict[str, Any]) -> LLMApi:
+        """Returns the LLMApi of a provider, created on first use."""
+        name = provider_config.get('name') or provider_config.get('api_endpoint')
+        with self._provider_lock:
+            if name not in self._llm_apis:
+                self._llm_apis[name] = LLMApi(
+                    api_endpoint=provider_config.get('api_endpoint'),
+                    api_key=provider_config.get('api_key')
+                )
+            return self._llm_apis[name]
+
+    @staticmethod
+    def _provider_limit(provider_config: Dict[str, Any]) -> int:
+        """Returns the maximum number of requests in flight to a provider."""
+        return max(1, int(provider_config.get('max_concurrent_requests') or Constants.DEFAULT_MAX_CONCURRENT_REQUESTS))
+
+    def _provider_slot(self, provider_config: Dict[str, Any]) -> threading.BoundedSemaphore:
+        """Returns the semaphore limiting the requests in flight to a provider, created on first use."""
+        name = provider_config.get('name') or provider_config.get('api_endpoint')
+        with self._provider_lock:
+            if name not in self._provider_slots:
+                self._provider_slots[name] = threading.BoundedSemaphore(self._provider_limit(provider_config))
+            return self._provider_slots[name]
+
+    def provider_executor(self, file_path: str) -> ThreadPoolExecutor:
+        """
+        Returns the executor of the provider a file is sent to, created on first use.
+
+        The executor runs at most `max_concurrent_requests` files of the provider at
+        the same time, files of other providers are dispatched to their own executor.
+
+        Args:
+            file_path: Path to the file to dispatch
+
+        Returns:
+            ThreadPoolExecutor: The executor of the provider of the file
+        """
+        provider_config = self._resolve_file_provider(file_path)
+        name = provider_config.get('name') or provider_config.get('api_endpoint')
+        with self._provider_lock:
+            if name not in self._provider_executors:
+                self._provider_executors[name] = ThreadPoolExecutor(
+                    max_workers=self._provider_limit(provider_config),
+                    thread_name_prefix=f"file-processor-{name}"
+                )
+            return self._provider_executors[name]
+
+    def _resolve_file_provider(self, file_path: str) -> Dict[str, Any]:
+        """Returns the provider configuration selected in the frontmatter of a file, the default provider if there is none."""
+        try:
+            provider_name = FileHelper.read_file_with_frontmatter(file_path)['metadata'].get('provider')
+            if provider_name:
+                return self.config.get_provider(provider_name)
+        except Exception as e:
+            # process_file reports unreadable files and falls back to the default provider
+            self.logger.debug(f"Could not resolve the provider of {file_path}: {e}")
+        return self.config.get_default_provider()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down the provider executors.
+
+        Args:
+            wait: Wait until the dispatched files are processed
+        """
+        with self._provider_lock:
+            executors = list(self._provider_executors.values())
+            self._provider_executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
     def _load_refinement_prompt(self) -> str:
         """Load the refinement prompt from file."""
         try:
@@ -146,13 +231,14 @@ Refined prompt:"""
            return provider_config, None, None, False
    
     def _refine_prompt_if_enabled(self, file_content: str, provider_config: Dict[str, Any],
-                                 model_name: Optional[str], temperature: Optional[float], refinement_enabled: bool) -> Optional[str]:
+                                 model_name: Optional[str], temperature: Optional[float], refinement_enabled: bool,
+                                 metrics: Optional[GenerationMetrics] = None) -> Optional[str]:
        """Refine prompt if enabled in metadata."""
        refined_prompt = None
        if refinement_enabled:
            self.logger.info(f"Refining the prompt for file...")
            self.logger.debug("Calling _refine_prompt_with_config")
-           refined_prompt = self._refine_prompt_with_config(file_content, provider_config, model_name, temperature)
+           refined_prompt = self._refine_prompt_with_config(file_content, provider_config, model_name, temperature, metrics=metrics)
            if refined_prompt:
                self.logger.info("Prompt refinement completed successfully")
            else:
@@ -195,7 +281,7 @@ Refined prompt:"""
            file_path: Path to the file to process
            
        Returns:
-           Dict containing processing results and metadata
+           Dict containing processing results and metadata, including the performance `metrics`
        """
        # Add input validation at the beginning
        if not file_path or not isinstance(file_path, str):
@@ -221,8 +307,11 @@ Refined prompt:"""
            "refined_prompt": None,
            "execution_result": None,
            "output_file": None,
-           "processing_duration": None
+           "processing_duration": None,
+           "metrics": None
        }
+       # refinement and execution call, summarized in result["metrics"]
+       generations = [GenerationMetrics(), GenerationMetrics()]
        
        try:
            # Step 1: Read and validate file content
@@ -236,7 +325,8 @@ Refined prompt:"""
            provider_config, model_name, temperature, refinement_enabled = self._resolve_configuration(metadata)
            
            # Step 3: Refine the prompt (only if refinement is enabled in metadata)
-           refined_prompt = self._refine_prompt_if_enabled(file_content, provider_config, model_name, temperature, refinement_enabled)
+           refined_prompt = self._refine_prompt_if_enabled(file_content, provider_config, model_name, temperature, refinement_enabled,
+                                                           metrics=generations[0])
            if not refined_prompt:
                result["status"] = "failed"
                result["error"] = "Prompt refinement failed"
@@ -246,7 +336,8 @@ Refined prompt:"""
            self.logger.info(f"Refined prompt: {len(refined_prompt)} characters")
            
            # Step 4: Execute the refined prompt
-           execution_result = self._execute_prompt_with_provider_config(refined_prompt, provider_config, model_name, temperature)
+           execution_result = self._execute_prompt_with_provider_config(refined_prompt, provider_config, model_name, temperature,
+                                                                        metrics=generations[1])
            if not execution_result:
                result["status"] = "failed"
                result["error"] = "Prompt execution failed"
@@ -278,24 +369,69 @@ Refined prompt:"""
            
        finally:
            result["processing_end_time"] = datetime.now().isoformat()
+           result["metrics"] = {**GenerationMetrics.summarize(generations), "wall_time": time.time() - start_time}
            
        return result
     
     
-    def _refine_prompt_with_config(self, input_prompt: str, provider_config: Dict[str, Any], model_name: Optional[str] = None, temperature: Optional[float] = None) -> Optional[str]:
+    def process_files(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+       """
+       Process several files concurrently through the refinement and execution pipeline.
+
+       The provider of every file is resolved before it is dispatched to the executor
+       of that provider, which processes up to `max_concurrent_requests` files at the
+       same time. A slow provider does not hold back the files of the other providers,
+       regardless of the order of file_paths.
+
+       Args:
+           file_paths: Paths to the files to process
+
+       Returns:
+           List of the process_file() results in the order of file_paths. Files that
+           could not be processed at all get a failed result with the error.
+       """
+       if not file_paths:
+           return []
+       self.logger.info(f"Processing {len(file_paths)} files")
+
+       def process(file_path):
+           try:
+               return self.process_file(file_path)
+           except Exception as e:
+               self.logger.error(f"File processing failed for {file_path}: {e}")
+               return {"file_path": file_path, "status": "failed", "error": str(e),
+                       "output_file": None, "metrics": None}
+
+       futures = [self.provider_executor(file_path).submit(process, file_path) for file_path in file_paths]
+       return [future.result() for future in futures]
+
+    def _refine_prompt_with_config(self, input_prompt: str, provider_config: Dict[str, Any], model_name: Optional[str] = None, temperature: Optional[float] = None,
+                                   metrics: Optional[GenerationMetrics] = None) -> Optional[str]:
        """
        Refine the input prompt using the existing refinement workflow with custom configuration.
+       Refinements are served from the refinement cache if one is configured.
        
        Args:
            input_prompt: The raw prompt from the file
            provider_config: Provider configuration dictionary
            model_name: Specific model name to use (optional)
            temperature: Specific temperature to use (optional)
+           metrics: Metrics object filled in for the LLM call (optional)
            
        Returns:
            Refined prompt, or None if refinement failed
        """
        try:
+           model_to_use = model_name or provider_config.get('default_model')
+           cache = RefinementCache.get_default()
+           if cache is not None:
+               # the cache holds the cleaned response, formatting is applied on every call
+               cleaned_response = cache.get_refinement(input_prompt, self.refinement_prompt, model_to_use)
+               if cleaned_response is not None:
+                   if metrics is not None:
+                       metrics.cached = True
+                   return self.refiner.format_as_markdown(cleaned_response)
+
            # Use the existing PromptRefiner to combine and refine the prompt
            combined_prompt = self.refiner.combine_refinement_prompt(
                input_prompt=input_prompt,
@@ -303,24 +439,26 @@ Refined prompt:"""
            )
            
            # Send to LLM for refinement with custom configuration
-           model_to_use = model_name or provider_config.get('default_model')
            temp_to_use = temperature if temperature is not None else provider_config.get('default_temperature')
            
            self.logger.info(f"Refinement configuration: model={model_to_use} , temperature={temp_to_use}")
-           refined_response = self.llm_api.send(
-               prompt=combined_prompt,
-               model=model_to_use,
-               max_tokens=self.DEFAULT_MAX_TOKENS_REFINEMENT,
-               temperature=temp_to_use
-           )
+           with self._provider_slot(provider_config):
+               refined_response = self._get_llm_api(provider_config).send(
+                   prompt=combined_prompt,
+                   model=model_to_use,
+                   max_tokens=self.DEFAULT_MAX_TOKENS_REFINEMENT,
+                   temperature=temp_to_use,
+                   metrics=metrics
+               )
            
            # Clean the response
            cleaned_response = self.refiner.clean_response(refined_response)
            
-           # Format as markdown
-           refined_prompt = self.refiner.format_as_markdown(cleaned_response)
+           if cache is not None:
+               cache.set_refinement(input_prompt, self.refinement_prompt, model_to_use, cleaned_response)
            
-           return refined_prompt
+           # Format as markdown
+           return self.refiner.format_as_markdown(cleaned_response)
            
        except Exception as e:
            error_msg = f"Error refining prompt: {e}"
@@ -328,7 +466,8 @@ Refined prompt:"""
            return None
     
     
-    def _execute_prompt_with_provider_config(self, refined_prompt: str, provider_config: Dict[str, Any], model_name: Optional[str] = None, temperature: Optional[float] = None) -> Optional[str]:
+    def _execute_prompt_with_provider_config(self, refined_prompt: str, provider_config: Dict[str, Any], model_name: Optional[str] = None, temperature: Optional[float] = None,
+                                             metrics: Optional[GenerationMetrics] = None) -> Optional[str]:
        """
        Execute the refined prompt using the LLM API with specific provider configuration.
        
@@ -337,6 +476,7 @@ Refined prompt:"""
            provider_config: Provider configuration dictionary
            model_name: Specific model name to use (optional)
            temperature: Specific temperature to use (optional)
+           metrics: Metrics object filled in for the LLM call (optional)
            
        Returns:
            Execution result, or None if execution failed
@@ -348,12 +488,14 @@ Refined prompt:"""
            temp_to_use = temperature if temperature is not None else provider_config.get('default_temperature')
            
            self.logger.info(f"Execution configuration: model={model_to_use} , temperature={temp_to_use}")
-           execution_result = self.llm_api.send(
-               prompt=refined_prompt,
-               model=model_to_use,
-               max_tokens=self.DEFAULT_MAX_TOKENS_EXECUTION,
-               temperature=temp_to_use
-           )
+           with self._provider_slot(provider_config):
+               execution_result = self._get_llm_api(provider_config).send(
+                   prompt=refined_prompt,
+                   model=model_to_use,
+                   max_tokens=self.DEFAULT_MAX_TOKENS_EXECUTION,
+                   temperature=temp_to_use,
+                   metrics=metrics
+               )
 
            self.logger.info(f"Execution result content length: {len(execution_result)}")
            
@@ -4,25 +4,39 @@ File Watcher Module
 
 This module provides functionality for monitoring directories for new files
 and triggering prompt processing workflows when files are detected.
+
+Detected files are debounced per path: a file is handed to the callback once no
+event arrived for it for `debounce_ms` and its size and mtime stayed unchanged
+for `stable_ms`. Files that are still being copied (rsync, scp) or that are saved
+via a temporary file and a rename (editors) are therefore processed exactly once,
+after the last write.
 """
 
+import os
 import logging
 import threading
 import time
 from pathlib import Path
-from typing import List, Callable
+from typing import Dict, Iterator, List, Callable, Optional, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from sokrates.constants import Constants
 
 class FileWatcherEventHandler(FileSystemEventHandler):
     """
     Custom event handler for file system events.
-    Processes file creation and modification events.
+
+    Created, modified and moved-in files are collected as pending per path,
+    repeated events for a path are coalesced. process_pending() hands the
+    files that settled (no events for debounce_ms, unchanged size and mtime
+    for stable_ms) to the callback.
     """
     
     def __init__(self, callback: Callable[[str], None], 
                  file_extensions: List[str] = None,
-                 logger: logging.Logger = None):
+                 logger: logging.Logger = None,
+                 debounce_ms: int = Constants.DEFAULT_FILE_WATCHER_DEBOUNCE_MS,
+                 stable_ms: int = Constants.DEFAULT_FILE_WATCHER_STABLE_MS):
         """
         Initialize the event handler.
         
@@ -30,23 +44,54 @@ class FileWatcherEventHandler(FileSystemEventHandler):
             callback: Function to call when a relevant file event occurs
             file_extensions: List of file extensions to process (e.g., ['.txt', '.md'])
             logger: Logger instance for logging events
+            debounce_ms: Quiet period after the last event of a file before it is checked
+            stable_ms: Time the size and mtime of a file must stay unchanged before it is processed
         """
         self.callback = callback
         self.file_extensions = file_extensions or ['.txt', '.md']
         self.logger = logger or logging.getLogger(__name__)
+        self.debounce_seconds = debounce_ms / 1000
+        self.stable_seconds = stable_ms / 1000
+        # path -> {"last_event", "stat", "stat_since"}
+        self.pending: Dict[str, dict] = {}
+        self.lock = threading.Lock()
         
     def on_created(self, event):
         """Handle file creation events."""
         if not event.is_directory:
             self._process_file_event(event.src_path, "created")
 
+    def on_modified(self, event):
+        """Handle file modification events, only files that are still pending are affected."""
+        if not event.is_directory:
+            with self.lock:
+                if event.src_path in self.pending:
+                    self.pending[event.src_path]["last_event"] = time.monotonic()
+
+    def on_moved(self, event):
+        """Handle files renamed into place, e.g. by rsync or editors saving via a temporary file."""
+        if not event.is_directory:
+            self._discard(event.src_path)
+            self._process_file_event(event.dest_path, "moved")
+
+    def on_deleted(self, event):
+        """Handle file deletion events, a deleted pending file is not processed."""
+        if not event.is_directory:
+            self._discard(event.src_path)
+
+    def _discard(self, file_path: str):
+        """Removes a file from the pending files."""
+        with self.lock:
+            if self.pending.pop(file_path, None) is not None:
+                self.logger.debug(f"Discarded pending file {file_path}")
+
     def _process_file_event(self, file_path: str, event_type: str):
         """
-        Process a file system event.
+        Process a file system event: the file becomes pending until it settled.
         
         Args:
             file_path: Path to the file that triggered the event
-            event_type: Type of event ('created' or 'modified')
+            event_type: Type of event ('created' or 'moved')
         """
         try:
             # Check if file extension is in our allowed list
@@ -61,11 +106,50 @@ class FileWatcherEventHandler(FileSystemEventHandler):
                 return
                 
             self.logger.info(f"File {event_type}: {file_path}")
-            self.callback(file_path)
+            with self.lock:
+                entry = self.pending.setdefault(file_path, {"stat": None, "stat_since": None})
+                entry["last_event"] = time.monotonic()
             
         except Exception as e:
             self.logger.error(f"Error processing {event_type} event for file {file_path}: {e}")
 
+    def process_pending(self, now: Optional[float] = None) -> List[str]:
+        """
+        Hands the pending files that settled to the callback, each exactly once.
+
+        Args:
+            now: The current time.monotonic() value, for tests
+
+        Returns:
+            List[str]: The processed file paths
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        with self.lock:
+            for file_path, entry in list(self.pending.items()):
+                if now - entry["last_event"] < self.debounce_seconds:
+                    continue
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    # moved away or deleted without an event reaching us
+                    del self.pending[file_path]
+                    continue
+                current = (stat.st_size, stat.st_mtime_ns)
+                if entry["stat"] != current:
+                    entry["stat"], entry["stat_since"] = current, now
+                if now - entry["stat_since"] >= self.stable_seconds:
+                    del self.pending[file_path]
+                    ready.append(file_path)
+
+        # the callback may run for minutes, new events are collected meanwhile
+        for file_path in ready:
+            try:
+                self.callback(file_path)
+            except Exception as e:
+                self.logger.error(f"Error processing file {file_path}: {e}")
+        return ready
+
 class FileWatcher:
     """
     File system watcher for monitoring directories and processing new files.
@@ -74,11 +158,16 @@ class FileWatcher:
     file creation and modification events, then processes detected files
     through the provided callback function.
     """
+
+    # seconds between checks of the pending files
+    POLL_INTERVAL = 0.1
     
     def __init__(self, watch_directories: List[str], 
                  file_processor_callback: Callable[[str], None],
                  file_extensions: List[str] = None,
-                 logger: logging.Logger = None):
+                 logger: logging.Logger = None,
+                 debounce_ms: int = Constants.DEFAULT_FILE_WATCHER_DEBOUNCE_MS,
+                 stable_ms: int = Constants.DEFAULT_FILE_WATCHER_STABLE_MS):
         """
         Initialize the FileWatcher.
         
@@ -87,11 +176,15 @@ class FileWatcher:
             file_processor_callback: Function to call when a new file is detected
             file_extensions: List of file extensions to process (default: ['.txt', '.md'])
             logger: Logger instance for logging events
+            debounce_ms: Quiet period after the last event of a file before it is checked
+            stable_ms: Time the size and mtime of a file must stay unchanged before it is processed
         """
         self.watch_directories = [Path(d).resolve() for d in watch_directories]
         self.file_processor_callback = file_processor_callback
         self.file_extensions = file_extensions or ['.txt', '.md']
         self.logger = logger or logging.getLogger(__name__)
+        self.debounce_ms = debounce_ms
+        self.stable_ms = stable_ms
         
         self.observer = None
         self.event_handler = None
@@ -133,7 +226,9 @@ class FileWatcher:
         self.event_handler = FileWatcherEventHandler(
             callback=self.file_processor_callback,
             file_extensions=self.file_extensions,
-            logger=self.logger
+            logger=self.logger,
+            debounce_ms=self.debounce_ms,
+            stable_ms=self.stable_ms
         )
         
         # Create and start observer
@@ -154,9 +249,10 @@ class FileWatcher:
         """Run the observer in a separate thread."""
         try:
             self.observer.start()
-            # Keep the observer running
+            # Keep the observer running and hand settled files to the callback
             while self.running:
-                time.sleep(1)
+                self.event_handler.process_pending()
+                time.sleep(self.POLL_INTERVAL)
         except Exception as e:
             self.logger.error(f"Error in file watcher observer: {e}")
         finally:
@@ -183,6 +279,50 @@ class FileWatcher:
         """Check if the file watcher is running."""
         return self.running
         
+    def scan_files(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Lists the files with allowed extensions in the watched directories, recursively.
+        Used to find files that were added while the watcher was not running.
+
+        Returns:
+            Iterator[Tuple[str, os.stat_result]]: Path and stat result per file
+        """
+        for directory in self.watch_directories:
+            yield from self.scan_directory(str(directory), self.file_extensions, self.logger)
+
+    @staticmethod
+    def scan_directory(directory: str, file_extensions: List[str],
+                       logger: logging.Logger = None) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Lists the files with the given extensions below a directory with os.scandir,
+        without reading them. Unreadable directories are logged and skipped.
+
+        Args:
+            directory: The directory to scan
+            file_extensions: List of file extensions to include (e.g., ['.txt', '.md'])
+            logger: Logger instance for logging errors
+
+        Returns:
+            Iterator[Tuple[str, os.stat_result]]: Path and stat result per file
+        """
+        logger = logger or logging.getLogger(__name__)
+        directories = [directory]
+        while directories:
+            try:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in file_extensions:
+                            try:
+                                stat = entry.stat()
+                            except FileNotFoundError:
+                                # removed during the scan
+                                continue
+                            yield entry.path, stat
+            except OSError as e:
+                logger.error(f"Failed to scan directory: {e}")
+
     def get_watched_directories(self) -> List[Path]:
         """Get the list of directories being watched."""
         return self.watch_directories.copy()
@@ -8,9 +8,16 @@ It handles adding tasks, retrieving pending tasks, and updating task status.
 Classes:
     TaskQueueManager: Manages task queue operations with database integration
 """
-from typing import List, Dict, Optional
+import os
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Dict, Optional, Tuple
 from .database import TaskQueueORMDatabase
 from sokrates.config import Config
+from sokrates.constants import Constants
+from sokrates.file_helper import FileHelper
 from sokrates.task_queue.orm import Task
 
 class TaskQueueManager:
@@ -20,36 +27,43 @@ class TaskQueueManager:
         Initializes the TaskQueueManager with database configuration.
 
         Args:
-            db_path (str, optional): Path to the SQLite database file.
-                If None, uses the default from TaskQueueORMDatabase.
+            config (Config): Provides the database_path, the sqlite pragmas (`database` section)
+                and the duplicate policy (`task_queue.duplicate_policy`)
         """
         self.config = config
-        self.db = TaskQueueORMDatabase(self.config.get('database_path'))
+        self.db = TaskQueueORMDatabase(self.config.get('database_path'),
+                                       pragmas=self.config.config.get('database'))
+        self.duplicate_policy = ((self.config.config.get('task_queue') or {}).get('duplicate_policy')
+                                 or Constants.DEFAULT_TASK_DUPLICATE_POLICY)
 
     def get_task(self, task_id) -> Task:
         return self.db.get_task(task_id=task_id)
 
     def add_task_from_file(self, task_file_path: str,
-                          priority: str = "normal") -> str:
+                          priority: str = "normal", duplicate_policy: Optional[str] = None) -> str:
         """
         Add a new task from JSON file to the queue.
 
         Args:
             task_file_path (str): Path to the JSON file containing task definition
             priority (str, optional): Task priority level. Defaults to "normal".
+            duplicate_policy (str, optional): Handling of a task file whose content is already queued
+                (reject, coalesce or link). Defaults to `task_queue.duplicate_policy`.
 
         Returns:
-            str: The generated task ID
+            str: The generated task ID, with "coalesce" the ID of the already queued task
 
         Raises:
-            ValueError: If task file cannot be loaded or parsed
+            ValueError: If task file cannot be loaded or parsed, or it is a rejected duplicate
             Exception: If database operation fails
         """
         try:
             new_task = self.db.add_task(
                 description = "Task from JSON file",
                 file_path=task_file_path,
-                priority=priority
+                priority=priority,
+                content_hash=self.content_hash(task_file_path),
+                duplicate_policy=duplicate_policy or self.duplicate_policy
             )
             
             return str(new_task.task_id)
@@ -57,6 +71,243 @@ class TaskQueueManager:
         except Exception as e:
             raise ValueError(f"Failed to add task from {task_file_path}: {e}")
 
+    def add_tasks_from_files(self, entries: List[Dict], priority: str = "normal",
+                             duplicate_policy: Optional[str] = None) -> Dict[str, List]:
+        """
+        Add many task files to the queue in one transaction.
+
+        Every entry is validated first: the task file must exist and contain a JSON
+        object with a `subtasks` list, and the priority must be valid. Invalid entries
+        are reported and skipped, the valid entries are added. Task files whose content
+        is already queued are handled by the duplicate policy: rejected duplicates are
+        reported as errors.
+
+        Args:
+            entries (List[Dict]): Entries with `task_file` and optional `priority` and `description`
+            priority (str, optional): Priority of entries without their own priority. Defaults to "normal".
+            duplicate_policy (str, optional): reject, coalesce or link. Defaults to `task_queue.duplicate_policy`.
+
+        Returns:
+            Dict[str, List]: `added` - list of {source, task_id, duplicate_of}, `errors` - list of {source, error}
+
+        Raises:
+            Exception: If database operation fails
+        """
+        tasks, sources, errors = [], [], []
+        for entry in entries:
+            source = entry.get('source') or entry.get('task_file')
+            error = self._validate_task_entry(entry, priority)
+            if error:
+                errors.append({"source": source, "error": error})
+                continue
+            tasks.append({
+                "description": entry.get('description') or "Task from JSON file",
+                "file_path": str(Path(entry['task_file']).resolve()),
+                "priority": entry.get('priority') or priority,
+                "content_hash": self.content_hash(entry['task_file'])
+            })
+            sources.append(source)
+
+        added = []
+        results = self.db.add_tasks(tasks, duplicate_policy=duplicate_policy or self.duplicate_policy) if tasks else []
+        for source, result in zip(sources, results):
+            if result['task_id'] is None:
+                errors.append({"source": source, "error": f"Duplicate of task {result['duplicate_of']}"})
+            else:
+                added.append({"source": source, **result})
+        return {"added": added, "errors": errors}
+
+    def add_tasks_from_directory(self, directory: str, priority: str = "normal",
+                                 duplicate_policy: Optional[str] = None) -> Dict[str, List]:
+        """
+        Add all JSON task files of a directory (not recursive) in one transaction.
+
+        Args:
+            directory (str): Directory containing the task files
+            priority (str, optional): Priority of the added tasks. Defaults to "normal".
+            duplicate_policy (str, optional): reject, coalesce or link. Defaults to `task_queue.duplicate_policy`.
+
+        Returns:
+            Dict[str, List]: `added` and `errors`, see add_tasks_from_files()
+
+        Raises:
+            ValueError: If the directory does not exist
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise ValueError(f"Task directory does not exist: {directory}")
+        entries = [{"task_file": str(path)} for path in sorted(directory.glob("*.json"))]
+        return self.add_tasks_from_files(entries, priority, duplicate_policy=duplicate_policy)
+
+    def add_tasks_from_manifest(self, manifest_path: str, priority: str = "normal",
+                                duplicate_policy: Optional[str] = None) -> Dict[str, List]:
+        """
+        Add the task files listed in a JSONL manifest in one transaction.
+
+        Each non-empty line is a JSON object with `task_file` and optional `priority`
+        and `description`. Relative task file paths are resolved against the directory
+        of the manifest.
+
+        Args:
+            manifest_path (str): Path to the JSONL manifest
+            priority (str, optional): Priority of lines without their own priority. Defaults to "normal".
+            duplicate_policy (str, optional): reject, coalesce or link. Defaults to `task_queue.duplicate_policy`.
+
+        Returns:
+            Dict[str, List]: `added` and `errors` (sources are `<manifest>:<line>`), see add_tasks_from_files()
+
+        Raises:
+            ValueError: If the manifest cannot be read
+        """
+        manifest_path = Path(manifest_path)
+        try:
+            lines = manifest_path.read_text(encoding="utf-8").splitlines()
+        except OSError as e:
+            raise ValueError(f"Failed to read task manifest {manifest_path}: {e}")
+
+        entries, errors = [], []
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            source = f"{manifest_path}:{line_number}"
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                errors.append({"source": source, "error": f"Invalid JSON: {e}"})
+                continue
+            if not isinstance(entry, dict) or not entry.get('task_file'):
+                errors.append({"source": source, "error": "Missing required field: task_file"})
+                continue
+            entry = dict(entry, source=source,
+                         task_file=str(manifest_path.parent / Path(entry['task_file']).expanduser()))
+            entries.append(entry)
+
+        result = self.add_tasks_from_files(entries, priority, duplicate_policy=duplicate_policy)
+        result["errors"] = errors + result["errors"]
+        return result
+
+    def add_watched_file(self, file_path: str, priority: str = "normal") -> Dict:
+        """
+        Queue a file detected in a watched directory, it is executed by the daemon workers
+        through the FileProcessor pipeline. A file that is already waiting is not queued again.
+        The file is recorded in the processed files manifest, see backfill_watched_files().
+
+        Args:
+            file_path (str): Path of the watched file
+            priority (str, optional): Task priority level. Defaults to "normal".
+
+        Returns:
+            Dict: task_id and duplicate_of (the id of the waiting task of the file, None if it was added)
+
+        Raises:
+            Exception: If the file cannot be read or the database operation fails
+        """
+        file_path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+            return self.db.add_watched_files([self._watched_file_entry(file_path, stat, self.content_hash(file_path))],
+                                             priority=priority)[0]
+        except Exception as e:
+            raise Exception(f"Failed to queue watched file {file_path}: {e}")
+
+    def backfill_watched_files(self, files: Iterable[Tuple[str, os.stat_result]], directories: List[str],
+                               priority: str = "normal") -> Dict[str, int]:
+        """
+        Queue the files of watched directories that were added or changed while no watcher was running.
+
+        The files are compared with the processed files manifest: files with the size and
+        mtime recorded when they were queued are skipped without reading them, only new and
+        changed files are hashed. Changed files with the recorded content hash (e.g. touched
+        files) are not queued again. Manifest entries of files that no longer exist in the
+        directories are removed.
+
+        Args:
+            files (Iterable[Tuple[str, os.stat_result]]): Path and stat result per file, see FileWatcher.scan_files()
+            directories (List[str]): The scanned directories
+            priority (str, optional): Priority of the queued files. Defaults to "normal".
+
+        Returns:
+            Dict[str, int]: Number of `scanned`, `queued` and `unchanged` files and of `removed` manifest entries
+        """
+        known = self.db.get_processed_files()
+        seen, new_files, touched_files = set(), [], []
+        for file_path, stat in files:
+            file_path = os.path.abspath(file_path)
+            seen.add(file_path)
+            recorded = known.get(file_path)
+            if recorded is not None and recorded[:2] == (stat.st_size, stat.st_mtime_ns):
+                continue
+            try:
+                content_hash = self.content_hash(file_path)
+            except OSError:
+                # removed since the scan
+                continue
+            entry = self._watched_file_entry(file_path, stat, content_hash)
+            if recorded is not None and recorded[2] == content_hash:
+                touched_files.append(entry)
+            else:
+                new_files.append(entry)
+
+        prefixes = tuple(os.path.join(os.path.abspath(directory), "") for directory in directories)
+        removed = [file_path for file_path in known if file_path not in seen and file_path.startswith(prefixes)]
+
+        if touched_files:
+            self.db.record_processed_files(touched_files)
+        if new_files:
+            self.db.add_watched_files(new_files, priority=priority)
+        if removed:
+            self.db.delete_processed_files(removed)
+        return {"scanned": len(seen), "queued": len(new_files),
+                "unchanged": len(seen) - len(new_files), "removed": len(removed)}
+
+    @staticmethod
+    def _watched_file_entry(file_path: str, stat: os.stat_result, content_hash: str) -> Dict:
+        """Returns the add_watched_files() entry of a watched file"""
+        return {"description": f"Watched file {os.path.basename(file_path)}", "file_path": file_path,
+                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "content_hash": content_hash}
+
+    @staticmethod
+    def content_hash(task_file_path: str) -> str:
+        """
+        Returns the sha256 hash of a task file, identical task files are duplicates.
+
+        Args:
+            task_file_path (str): Path of the task file
+
+        Returns:
+            str: The hex digest
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        digest = hashlib.sha256()
+        with open(task_file_path, "rb") as f:
+            while chunk := f.read(65536):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _validate_task_entry(entry: Dict, default_priority: str) -> Optional[str]:
+        """
+        Validates a bulk add entry.
+
+        Returns:
+            Optional[str]: The validation error, or None if the entry is valid
+        """
+        priority = entry.get('priority') or default_priority
+        if priority not in Task.PRIORITIES:
+            return f"Invalid priority: {priority}. Valid priorities: {', '.join(Task.PRIORITIES)}"
+        task_file = entry.get('task_file')
+        if not task_file or not Path(task_file).is_file():
+            return f"Task file not found: {task_file}"
+        try:
+            tasks = FileHelper.read_json_file(task_file)
+        except (OSError, ValueError) as e:
+            return f"Invalid task file: {e}"
+        if not isinstance(tasks, dict) or not isinstance(tasks.get('subtasks'), list):
+            return "Invalid task file: a JSON object with a subtasks list is required"
+        return None
+
     def get_all_tasks(self, limit: Optional[int] = None):
         """
         Get all tasks for processing.
@@ -69,6 +320,41 @@ class TaskQueueManager:
         except Exception as e:
             raise Exception(f"Failed to retrieve all tasks: {e}")
 
+    def list_tasks(self, status: Optional[str] = None, priority: Optional[str] = None,
+                   created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                   after_id: Optional[int] = None, limit: int = 50,
+                   newest_first: bool = False) -> List[Task]:
+        """
+        Get a filtered page of tasks. Pass the id of the last task of a page as after_id for the next page.
+
+        Args:
+            status (str, optional): Only tasks with this status
+            priority (str, optional): Only tasks with this priority
+            created_after (datetime, optional): Only tasks created at or after this time (UTC)
+            created_before (datetime, optional): Only tasks created before this time (UTC)
+            after_id (int, optional): Id of the last task of the previous page
+            limit (int): Maximum number of tasks. Defaults to 50.
+            newest_first (bool): Order by descending task id. Defaults to False.
+
+        Returns:
+            List[Task]: The tasks of the page
+        """
+        try:
+            return self.db.list_tasks(status=status, priority=priority,
+                                      created_after=created_after, created_before=created_before,
+                                      after_id=after_id, limit=limit, newest_first=newest_first)
+        except Exception as e:
+            raise Exception(f"Failed to list tasks: {e}")
+
+    def count_tasks_by_status(self) -> Dict[str, int]:
+        """
+        Get the number of tasks per status.
+
+        Returns:
+            Dict[str, int]: Number of tasks for each status that has tasks
+        """
+        return self.db.count_tasks_by_status()
+
     def get_pending_tasks(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get pending tasks for processing.
@@ -84,6 +370,29 @@ class TaskQueueManager:
         except Exception as e:
             raise Exception(f"Failed to retrieve pending tasks: {e}")
 
+    def claim_next_task(self, lease_owner: Optional[str] = None,
+                        lease_seconds: Optional[float] = None,
+                        aging_seconds: Optional[float] = None) -> Optional[Dict]:
+        """
+        Atomically claim the next pending task for processing.
+
+        Args:
+            lease_owner (str, optional): Identifier of the claiming worker
+            lease_seconds (float, optional): Duration of the lease in seconds
+            aging_seconds (float, optional): Waiting time after which a task is promoted by one priority level
+
+        Returns:
+            Optional[Dict]: The claimed task dictionary, or None if no task is pending
+
+        Raises:
+            Exception: If database operation fails
+        """
+        try:
+            return self.db.claim_next_task(lease_owner=lease_owner, lease_seconds=lease_seconds,
+                                           aging_seconds=aging_seconds)
+        except Exception as e:
+            raise Exception(f"Failed to claim next task: {e}")
+
     def update_task_status(self, task_id: str, status: str,
                           result: Optional[str] = None, error: Optional[str] = None,
                           output_directory: Optional[str] = None) -> None:
@@ -107,6 +416,127 @@ class TaskQueueManager:
         except Exception as e:
             raise Exception(f"Failed to update task status for {task_id}: {e}")
 
+    def schedule_retry(self, task_id: str, error: str, delay_seconds: float) -> None:
+        """
+        Reschedule a failed task for another attempt after a delay.
+
+        Args:
+            task_id (str): Unique identifier for the task
+            error (str): Error of the failed attempt
+            delay_seconds (float): Delay until the task may be claimed again
+
+        Raises:
+            Exception: If database operation fails
+        """
+        try:
+            self.db.schedule_retry(task_id, error, delay_seconds)
+        except Exception as e:
+            raise Exception(f"Failed to schedule retry for {task_id}: {e}")
+
+    def get_next_attempt_at(self) -> Optional[datetime]:
+        """
+        Get the earliest scheduled retry of the pending tasks.
+
+        Returns:
+            Optional[datetime]: The earliest next_attempt_at in UTC, or None if no retry is scheduled
+        """
+        return self.db.get_next_attempt_at()
+
+    def record_task_metrics(self, task_id: Optional[int], status: str, metrics: Dict,
+                            subtasks: Optional[List[Dict]] = None, attempt: int = 1,
+                            source: Optional[str] = None) -> int:
+        """
+        Record the performance of a task attempt and its subtasks.
+
+        Args:
+            task_id (int, optional): The task, None for work without a task
+            status (str): Outcome of the attempt ('completed' or 'failed')
+            metrics (dict): Summary of the attempt, see GenerationMetrics.summarize, plus wall_time
+            subtasks (List[dict], optional): Per subtask: subtask_id, status and the same metrics keys
+            attempt (int): The attempt number of the task. Defaults to 1.
+            source (str, optional): Origin of work without a task, e.g. the file path
+
+        Returns:
+            int: The id of the task metric
+        """
+        try:
+            return self.db.add_task_metrics(task_id, status, metrics, subtasks=subtasks,
+                                            attempt=attempt, source=source)
+        except Exception as e:
+            raise Exception(f"Failed to record metrics for {task_id or source}: {e}")
+
+    def get_task_metrics(self, task_id: int) -> List[Dict]:
+        """
+        Get the recorded metrics of a task, one entry per attempt with its subtasks.
+
+        Args:
+            task_id (int): The task id
+
+        Returns:
+            List[Dict]: The task metrics, oldest attempt first
+        """
+        return self.db.get_task_metrics(task_id)
+
+    def set_task_output_directory(self, task_id: str, output_directory: str) -> None:
+        """
+        Store the output directory of a task, so retries and restarts reuse it.
+
+        Args:
+            task_id (str): Unique identifier for the task
+            output_directory (str): Output directory of the task
+        """
+        self.db.set_task_output_directory(task_id, output_directory)
+
+    def get_leased_tasks(self, lease_owner_prefix: str) -> List[Task]:
+        """
+        Get the in_progress tasks leased by a worker or a daemon process.
+
+        Args:
+            lease_owner_prefix (str): Lease owner or lease owner prefix
+
+        Returns:
+            List[Task]: The leased tasks
+        """
+        return self.db.get_leased_tasks(lease_owner_prefix)
+
+    def renew_leases(self, lease_owner_prefix: str, lease_seconds: float) -> int:
+        """
+        Extend the leases of the tasks leased by a worker or a daemon process.
+
+        Args:
+            lease_owner_prefix (str): Lease owner or lease owner prefix
+            lease_seconds (float): New duration of the leases from now
+
+        Returns:
+            int: Number of renewed leases
+        """
+        return self.db.renew_leases(lease_owner_prefix, lease_seconds)
+
+    def requeue_expired_leases(self, max_attempts: Optional[int] = None) -> List[int]:
+        """
+        Return in_progress tasks with expired leases (crashed workers) to the queue.
+
+        Args:
+            max_attempts (int, optional): Tasks with this many attempts are marked failed instead
+
+        Returns:
+            List[int]: Ids of the recovered tasks
+        """
+        return self.db.requeue_expired_leases(max_attempts)
+
+    def release_leases(self, lease_owner_prefix: str, reason: str) -> List[int]:
+        """
+        Return the in_progress tasks of a worker or a daemon process to the queue.
+
+        Args:
+            lease_owner_prefix (str): Lease owner or lease owner prefix
+            reason (str): Reason recorded in the task history
+
+        Returns:
+            List[int]: Ids of the released tasks
+        """
+        return self.db.release_leases(lease_owner_prefix, reason)
+
     def remove_task(self, task_id: str) -> None:
         self.db.remove_task(task_id=task_id)
 
@@ -4,27 +4,112 @@ import datetime
 # Create database instance - will be initialized with path
 db = SqliteDatabase(None)
 
+def utc_now() -> datetime.datetime:
+    """Returns the current time in UTC, used as default for all timestamps"""
+    return datetime.datetime.now(datetime.timezone.utc)
+
 class BaseModel(Model):
     """Base model class for all Peewee models"""
     class Meta:
         database = db
 
 class Task(BaseModel):
+    # scheduling order of the priorities, highest first
+    PRIORITIES = ['high', 'normal', 'low']
+    # a task file may be queued only once while one of its tasks is in these states
+    ACTIVE_STATUSES = ['pending', 'in_progress']
+    # handling of a task file whose content is already queued, the first one is the default
+    DUPLICATE_POLICIES = ['reject', 'coalesce', 'link']
+    # JSON task files executed by SequentialTaskExecutor, prompt files dropped into
+    # a watched directory executed by FileProcessor. The first one is the default
+    TASK_TYPES = ['task_file', 'watched_file']
+
     task_id = AutoField(primary_key=True, unique=True)
     description = TextField(null=False)
     file_path = TextField(null=False)
+    task_type = CharField(default='task_file')  # Can be 'task_file', 'watched_file'
     priority = CharField(default='normal')  # Can be 'low', 'normal', 'high'
-    status = CharField(default='pending')   # Can be 'pending', 'in_progress', 'completed', 'failed'
-    created_at = DateTimeField(default=datetime.datetime.now(datetime.timezone.utc))
-    updated_at = DateTimeField(default=datetime.datetime.now(datetime.timezone.utc))
+    status = CharField(default='pending')   # Can be 'pending', 'in_progress', 'completed', 'failed', 'linked'
+    created_at = DateTimeField(default=utc_now)
+    updated_at = DateTimeField(default=utc_now)
     result = TextField(null=True)
     output_directory = TextField(null=True)
     error_message = TextField(null=True)
+    lease_owner = CharField(null=True)          # worker holding the task while in_progress
+    lease_expires_at = DateTimeField(null=True)
+    attempts = IntegerField(default=0)          # number of times the task was claimed for execution
+    next_attempt_at = DateTimeField(null=True)  # a pending retry is not claimed before this time
+    last_error = TextField(null=True)           # error of the most recent failed attempt
+    content_hash = CharField(null=True)         # sha256 of the task file content
+    duplicate_of = ForeignKeyField('self', backref='duplicates', null=True)  # original of a 'linked' task
+
+    class Meta:
+        indexes = (
+            # next task lookup: oldest pending task per priority
+            (('status', 'priority', 'created_at'), False),
+            # crash recovery: in_progress tasks with expired leases
+            (('status', 'lease_expires_at'), False),
+            # listing and counting by status: entries are ordered by task_id (rowid) within a status
+            (('status',), False),
+            # duplicate lookup, also for finished tasks
+            (('content_hash',), False),
+            # lookup of the queued task of a watched file
+            (('file_path',), False),
+        )
+
+# at most one active task per task file content, enforced even for concurrent task-add calls
+# (sqlite does not allow parameters in the WHERE clause of a partial index)
+Task.add_index(Task.index(Task.content_hash, unique=True, name='task_content_hash_active')
+               .where(SQL(f"status IN ({', '.join(repr(status) for status in Task.ACTIVE_STATUSES)})")))
 
 class TaskHistory(BaseModel):
     history_id = AutoField(primary_key=True)
     task = ForeignKeyField(Task, backref='history', null=False)
-    status = CharField(null=False)  # Can be 'pending', 'in_progress', 'completed', 'failed'
-    changed_at = DateTimeField(default=datetime.datetime.now(datetime.timezone.utc))
+    status = CharField(null=False)  # Can be 'pending', 'in_progress', 'retrying', 'completed', 'failed'
+    changed_at = DateTimeField(default=utc_now)
     result = TextField(null=True)
-    error_message = TextField(null=True)
\ No newline at end of file
+    error_message = TextField(null=True)
+
+
+class TaskMetric(BaseModel):
+    """Performance of one execution attempt of a task, or of work without a task (task is null)"""
+    metric_id = AutoField(primary_key=True)
+    task = ForeignKeyField(Task, backref='metrics', null=True)
+    source = TextField(null=True)                # origin of work without a task, e.g. a file path
+    attempt = IntegerField(default=1)            # retries are recorded as attempts > 1
+    status = CharField(null=False)               # 'completed' or 'failed'
+    model = CharField(null=True)
+    provider = TextField(null=True)              # api endpoint(s) that served the generations
+    generations = IntegerField(default=0)        # number of LLM calls
+    prompt_tokens = IntegerField(null=True)
+    completion_tokens = IntegerField(null=True)
+    usage_estimated = BooleanField(default=False)
+    time_to_first_token = FloatField(null=True)  # mean over the generations, seconds
+    generation_time = FloatField(null=True)      # summed duration of the generations, seconds
+    wall_time = FloatField(null=True)            # seconds
+    created_at = DateTimeField(default=utc_now)
+
+class SubtaskMetric(BaseModel):
+    """Performance of a subtask executed during a task attempt"""
+    subtask_metric_id = AutoField(primary_key=True)
+    metric = ForeignKeyField(TaskMetric, backref='subtasks', null=False)
+    subtask_id = CharField(null=False)
+    status = CharField(null=False)               # 'completed' or 'failed'
+    model = CharField(null=True)
+    provider = TextField(null=True)
+    generations = IntegerField(default=0)
+    prompt_tokens = IntegerField(null=True)
+    completion_tokens = IntegerField(null=True)
+    usage_estimated = BooleanField(default=False)
+    time_to_first_token = FloatField(null=True)
+    generation_time = FloatField(null=True)
+    wall_time = FloatField(null=True)
+
+class ProcessedFile(BaseModel):
+    """Manifest of the files of watched directories that were queued, read by the startup scan"""
+    file_path = TextField(primary_key=True)
+    size = BigIntegerField()
+    mtime_ns = BigIntegerField()
+    content_hash = CharField(null=True)          # sha256 of the file content when it was queued
+    task_id = IntegerField(null=True)            # the task executing the file, kept after the task is archived
+    updated_at = DateTimeField(default=utc_now)
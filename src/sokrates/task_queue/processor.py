@@ -3,37 +3,55 @@
 Task Queue Processor Module
 
 This module provides functionality for processing tasks from the queue.
-It integrates with SequentialTaskExecutor to execute LLM workflows.
+It integrates with SequentialTaskExecutor to execute LLM workflows and with
+FileProcessor to execute the files queued by the file watcher.
 
 Classes:
     TaskProcessor: Manages task execution and status updates
 """
 
+import os
 import time
+import socket
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional
 from .manager import TaskQueueManager
 from .status_tracker import StatusTracker
 from .error_handler import ErrorHandler
+from .file_processor import FileProcessor
+from .wakeup import DaemonWakeup
 from sokrates.workflows.sequential_task_executor import SequentialTaskExecutor
+from sokrates.provider_pool import ProviderPool
+from sokrates.file_helper import FileHelper
 from sokrates.config import Config
 
 class TaskProcessor:
     """
-    Processes tasks from the queue using SequentialTaskExecutor.
+    Processes tasks from the queue using SequentialTaskExecutor, files queued by
+    the file watcher are processed using FileProcessor.
 
     This class provides methods for executing queued tasks,
-    handling errors, and managing task lifecycle.
+    handling errors, and managing task lifecycle. Up to `daemon.workers`
+    tasks are executed in parallel, each worker claims its tasks atomically.
+    Watched files are dispatched to the executor of their provider in
+    FileProcessor, so workers never wait for the request slots of a busy provider.
 
     Attributes:
         manager: TaskQueueManager instance for database operations
         status_tracker: StatusTracker instance for tracking progress
         error_handler: ErrorHandler instance for error management
+        workers: Number of tasks executed in parallel
+        lease_owner_prefix: Identifies the tasks leased by this process (`host:pid:`)
+        lease_seconds: Lease duration, renewed by a heartbeat every third of the duration
 
     Methods:
         process_tasks(): Process pending tasks from the queue
-        execute_task(): Execute a single task using SequentialTaskExecutor
+        start_workers(): Start the long-lived workers of the daemon
+        stop_workers(): Stop the long-lived workers of the daemon
+        requeue_expired_tasks(): Recover tasks whose lease expired
     """
 
     DEFAULT_TEMPERATURE = 0.7
@@ -51,112 +69,443 @@ class TaskProcessor:
         self.status_tracker = StatusTracker(self.manager)
         self.error_handler = ErrorHandler()
         self.logger = logger or logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.workers = max(1, int(self.config.get('daemon.workers')))
+        self.lease_seconds = self.config.get('daemon.lease_seconds')
+        self.priority_aging_seconds = self.config.get('daemon.priority_aging_seconds')
+        self.subtask_concurrency = self.config.get('daemon.subtask_concurrency')
+        self.lease_owner_prefix = f"{socket.gethostname()}:{os.getpid()}:"
+        self.llm_api = self._create_provider_pool()
+        # executes watched file tasks, created when the first one is claimed
+        self.file_processor = None
+        self._file_processor_lock = threading.Lock()
+        # long-lived workers of the daemon, see start_workers()
+        self._worker_threads = []
+        self._workers_stopped = threading.Event()
+        self._heartbeat = None
+
+    def _create_provider_pool(self) -> Optional[ProviderPool]:
+        """
+        Creates the provider pool configured under daemon.provider_pool.
+
+        Returns:
+            Optional[ProviderPool]: The provider pool, or None if tasks are executed on the default provider.
+        """
+        pool_name = (self.config.config.get('daemon') or {}).get('provider_pool')
+        if not pool_name:
+            return None
+        self.logger.info(f"Executing tasks on provider pool: {pool_name}")
+        return ProviderPool.from_config(self.config, pool_name)
 
     def process_tasks(self, limit: Optional[int] = None):
         """
-        Process pending tasks from the queue.
+        Process pending tasks from the queue until it is empty, with up to `daemon.workers`
+        workers. The daemon keeps its workers running with start_workers() instead.
 
         Args:
             limit (int, optional): Maximum number of tasks to process. If None, processes all.
         """
-        try:
-            # Get pending tasks
-            pending_tasks = self.manager.get_pending_tasks(limit)
-            self.logger.info(f"Number of pending tasks: {len(pending_tasks)}")
+        # shared between the workers to stop claiming once the limit is reached
+        budget = threading.Semaphore(limit) if limit is not None else None
+        # watched files running on the executors of their providers
+        dispatched = []
+        heartbeat_stopped = threading.Event()
+        heartbeat = threading.Thread(target=self._renew_leases, args=(heartbeat_stopped,),
+                                     name="lease-heartbeat", daemon=True)
 
-            if not pending_tasks:
+        try:
+            self.requeue_expired_tasks()
+            heartbeat.start()
+            if self.workers == 1:
+                processed = self._run_worker(budget, dispatched)
+            else:
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="task-worker") as pool:
+                    futures = [pool.submit(self._run_worker, budget, dispatched) for _ in range(self.workers)]
+                    processed = sum(future.result() for future in futures)
+            for future in dispatched:
+                future.result()
+
+            if not processed:
                 self.logger.info("No pending tasks to process.")
-                return
-
-            for task in pending_tasks:
-                self._process_single_task_file(task)
-                time.sleep(1)  # Small delay between tasks
+            else:
+                self.logger.info(f"Processed {processed} tasks with {self.workers} workers")
 
         except Exception as e:
             self.logger.info(f"Error processing tasks: {e}")
         finally:
+            heartbeat_stopped.set()
+            if heartbeat.is_alive():
+                heartbeat.join()
+            self.manager.close()
+
+    def start_workers(self, wakeup: DaemonWakeup, wait_seconds: Callable[[], float]) -> None:
+        """
+        Starts `daemon.workers` workers that keep running until stop_workers() is called.
+
+        Every worker claims and processes tasks until the queue is empty, then waits for
+        a wakeup notification or the polling interval and claims again. A long running
+        task only occupies its own worker, tasks added meanwhile start on an idle one.
+
+        Args:
+            wakeup (DaemonWakeup): Signals that tasks were added
+            wait_seconds (Callable[[], float]): Returns the maximum time an idle worker waits before it polls the queue
+        """
+        self._workers_stopped.clear()
+        self._heartbeat = threading.Thread(target=self._renew_leases, args=(self._workers_stopped,),
+                                           name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+        self._worker_threads = [
+            threading.Thread(target=self._serve_worker, args=(wakeup, wait_seconds),
+                             name=f"task-worker_{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._worker_threads:
+            thread.start()
+        self.logger.info(f"Started {self.workers} task workers")
+
+    def stop_workers(self, wakeup: DaemonWakeup, timeout: Optional[float] = None) -> None:
+        """
+        Stops the workers started with start_workers(). Idle workers stop right away,
+        busy workers after their current task.
+
+        Args:
+            wakeup (DaemonWakeup): The wakeup channel the workers wait on
+            timeout (float, optional): Maximum time to wait for each worker
+        """
+        self._workers_stopped.set()
+        wakeup.set()
+        for thread in self._worker_threads + [self._heartbeat]:
+            if thread is not None and thread.is_alive():
+                thread.join(timeout)
+        self._worker_threads = []
+        self._heartbeat = None
+
+    def _serve_worker(self, wakeup: DaemonWakeup, wait_seconds: Callable[[], float]) -> None:
+        """
+        Worker loop of start_workers(): claims tasks until the queue is empty, then waits
+        for a wakeup notification or the polling interval.
+
+        Args:
+            wakeup (DaemonWakeup): Signals that tasks were added
+            wait_seconds (Callable[[], float]): Returns the maximum time to wait while idle
+        """
+        try:
+            while not self._workers_stopped.is_set():
+                try:
+                    task = self._claim_next_task()
+                except Exception as e:
+                    self.logger.error(f"Failed to claim the next task: {e}")
+                    task = None
+                if task is None:
+                    wakeup.wait(wait_seconds())
+                    continue
+                if self.workers > 1:
+                    # pass the notification on: another idle worker claims the next added task
+                    wakeup.set()
+                self._handle_claimed_task(task)
+        finally:
+            # peewee connections are per thread
+            self.manager.close()
+
+    def _claim_next_task(self) -> Optional[dict]:
+        """Claims the next pending task for the current worker thread."""
+        return self.manager.claim_next_task(
+            lease_owner=f"{self.lease_owner_prefix}{threading.current_thread().name}",
+            lease_seconds=self.lease_seconds,
+            aging_seconds=self.priority_aging_seconds
+        )
+
+    def _handle_claimed_task(self, task, dispatched: Optional[List[Future]] = None) -> None:
+        """
+        Processes a claimed task on the current worker, watched files are dispatched
+        to the executor of their provider.
+
+        Args:
+            task (dict): The claimed task
+            dispatched (List[Future], optional): Collects the futures of the dispatched watched files.
+        """
+        if task.get('task_type') == 'watched_file':
+            future = self._dispatch_watched_file(task)
+            if dispatched is not None:
+                dispatched.append(future)
+        else:
+            self._process_claimed_task(task)
+
+    def requeue_expired_tasks(self) -> None:
+        """
+        Recovers tasks whose lease expired because their worker died (killed daemon, OOM, ...).
+        Tasks that already used all retries are marked failed.
+        """
+        recovered = self.manager.requeue_expired_leases(max_attempts=self.error_handler.max_retries + 1)
+        if recovered:
+            self.logger.warning(f"Recovered tasks with expired leases: {recovered}")
+
+    def _renew_leases(self, stopped: threading.Event) -> None:
+        """
+        Heartbeat: renews the leases of this process until stopped, so only leases
+        of workers that stopped running expire.
+
+        Args:
+            stopped (threading.Event): Set when processing has finished
+        """
+        interval = max(1.0, self.lease_seconds / 3)
+        try:
+            while not stopped.wait(interval):
+                try:
+                    self.manager.renew_leases(self.lease_owner_prefix, self.lease_seconds)
+                except Exception as e:
+                    self.logger.error(f"Failed to renew task leases: {e}")
+        finally:
+            # peewee connections are per thread
             self.manager.close()
 
+    def _run_worker(self, budget: Optional[threading.Semaphore] = None, dispatched: Optional[List[Future]] = None) -> int:
+        """
+        Claims and processes pending tasks until the queue is empty or the budget is used up.
+        Watched files are dispatched to the executor of their provider and the worker
+        claims the next task right away.
+
+        Args:
+            budget (threading.Semaphore, optional): Remaining number of tasks to process.
+            dispatched (List[Future], optional): Collects the futures of the dispatched watched files.
+
+        Returns:
+            int: Number of tasks processed or dispatched by this worker
+        """
+        processed = 0
+        try:
+            while budget is None or budget.acquire(blocking=False):
+                task = self._claim_next_task()
+                if task is None:
+                    break
+                self._handle_claimed_task(task, dispatched)
+                processed += 1
+        finally:
+            # peewee connections are per thread
+            if threading.current_thread() is not threading.main_thread():
+                self.manager.close()
+        return processed
+
+    def _process_claimed_task(self, task) -> None:
+        """
+        Processes a claimed task, a task that raises is marked failed.
+
+        Args:
+            task (dict): Task information from the queue, already claimed (in_progress)
+        """
+        try:
+            self._process_single_task_file(task)
+        except Exception as e:
+            self.logger.error(f"Error processing task {task['task_id']}: {e}")
+            self.status_tracker.update_status(task['task_id'], "failed", error=str(e))
+
+    def _dispatch_watched_file(self, task) -> Future:
+        """
+        Dispatches a claimed watched file to the executor of its provider. The executor
+        runs at most `max_concurrent_requests` files of the provider at the same time,
+        the lease of the task is renewed by the heartbeat while it waits.
+
+        Args:
+            task (dict): The claimed watched file task
+
+        Returns:
+            Future: Completes once the task is processed
+        """
+        def process():
+            try:
+                self._process_claimed_task(task)
+            finally:
+                # peewee connections are per thread
+                self.manager.close()
+
+        return self._get_file_processor().provider_executor(task['file_path']).submit(process)
+
     def _process_single_task_file(self, task):
         """
         Process a single task through execution and status updates.
 
+        Task files keep their output directory across retries and daemon restarts,
+        so subtasks completed by an earlier attempt are not executed again.
+        Watched files are executed through the FileProcessor pipeline.
+
         Args:
-            task (dict): Task information from the queue
+            task (dict): Task information from the queue, already claimed (in_progress)
         """
         task_id = task['task_id']
-        file_path = task['file_path']
-        
-        # TODO: Refactor Config dependency
-        # remove tight coupling with Config class and pass along the parameters directly
-        
-        default_provider = self.config.get_default_provider() 
 
-        executor = SequentialTaskExecutor(
-                api_endpoint=default_provider.get('api_endpoint'),
-                api_key=default_provider.get('api_key'),
-                model=default_provider.get('default_model'),
-                temperature=self.DEFAULT_TEMPERATURE,
-                refinement_prompt_path=self.config.get('prompts_directory') / 'refine-prompt.md'
-                )
-        
-        self.logger.debug(f"Task Execution output directory: {executor.output_dir}")
+        watched_file = task.get('task_type') == 'watched_file'
+        if watched_file:
+            file_processor = self._get_file_processor()
+            output_dir = str(file_processor.output_dir)
+        else:
+            executor = self._create_executor(self._get_output_directory(task))
+            output_dir = executor.output_dir
+
+        self.logger.debug(f"Task Execution output directory: {output_dir}")
 
         try:
-            # Update status to in_progress
-            self.status_tracker.update_status(task_id, "in_progress")
+            if watched_file:
+                result = self._execute_watched_file(file_processor, task)
+                summary = f"results saved to {result['output_file']}"
+            else:
+                # Execute task using SequentialTaskExecutor
+                result = self._execute(executor, task)
+                summary = f"{result['successful_tasks']}/{result['total_tasks']} tasks"
 
-            # Execute task using SequentialTaskExecutor
-            result = executor.execute_tasks_from_file(file_path)
+            self.logger.debug(f"Updating status: task_id={task_id}, status=completed, output_directory={output_dir}")
 
-            self.logger.debug(f"Updating status: task_id={task_id}, status=completed, output_directory={executor.output_dir}")
+            attempt_info = f" on attempt {task['attempts']}" if (task.get('attempts') or 1) > 1 else ""
 
             # Update status to completed with result
             self.status_tracker.update_status(
                 task_id=task_id,
                 status="completed",
-                result=f"Successfully executed: {result['successful_tasks']}/{result['total_tasks']} tasks",
-                output_directory=executor.output_dir
+                result=f"Successfully executed{attempt_info}: {summary}",
+                output_directory=output_dir
             )
 
         except Exception as e:
-            # Handle errors with retry logic
-            current_attempt = 1
+            # Failed attempts are rescheduled instead of waited on, so this worker moves on
+            # to other tasks. Completed subtasks are resumed from their checkpoints on retry.
+            current_attempt = task.get('attempts') or 1
+            self.error_handler.log_error(task_id, str(e), current_attempt)
+
+            next_action = self.error_handler.handle_failure(
+                self.manager,
+                task_id,
+                str(e),
+                current_attempt
+            )
+
+            if next_action == "retry":
+                self.logger.info(f"Task {task_id} failed on attempt {current_attempt}, "
+                                 f"retrying in {self.error_handler.get_retry_delay(current_attempt)}s: {e}")
+            elif next_action == "dead_letter":
+                self.logger.info(f"Moving task {task_id} to dead letter queue after max retries")
+            else:  # fail
+                self.logger.info(f"Task {task_id} failed permanently: {e}")
 
-            while True:
-                self.error_handler.log_error(task_id, str(e), current_attempt)
+    def _create_executor(self, output_dir: str) -> SequentialTaskExecutor:
+        """
+        Creates the executor of a task file on the default provider, or on the provider pool.
+
+        Args:
+            output_dir (str): The output directory of the task
 
-                next_action = self.error_handler.handle_failure(
-                    self.manager,
-                    task_id,
-                    str(e),
-                    current_attempt
+        Returns:
+            SequentialTaskExecutor: The executor
+        """
+        # TODO: Refactor Config dependency
+        # remove tight coupling with Config class and pass along the parameters directly
+        default_provider = self.config.get_default_provider()
+        return SequentialTaskExecutor(
+                api_endpoint=default_provider.get('api_endpoint'),
+                api_key=default_provider.get('api_key'),
+                model=default_provider.get('default_model'),
+                temperature=self.DEFAULT_TEMPERATURE,
+                refinement_prompt_path=self.config.get('prompts_directory') / 'refine-prompt.md',
+                output_dir=output_dir,
+                llm_api=self.llm_api,
+                subtask_concurrency=self.subtask_concurrency
                 )
 
-                if next_action == "retry":
-                    self.logger.info(f"Retrying task {task_id} (attempt {current_attempt})...")
-                    time.sleep(self.error_handler.get_retry_delay(current_attempt))
+    def _get_file_processor(self) -> FileProcessor:
+        """
+        Returns the FileProcessor executing watched files, created on first use and
+        shared by the workers.
+        """
+        with self._file_processor_lock:
+            if self.file_processor is None:
+                self.file_processor = FileProcessor(config=self.config, logger=self.logger)
+            return self.file_processor
 
-                    try:
-                        # Retry the execution
-                        result = executor.execute_tasks_from_file(file_path)
+    def _get_output_directory(self, task) -> str:
+        """
+        Returns the output directory of a task, creating and storing it on the first attempt.
 
-                        self.status_tracker.update_status(
-                            task_id=task_id,
-                            status="completed",
-                            result=f"Successfully executed on retry {current_attempt}: {result['successful_tasks']}/{result['total_tasks']} tasks",
-                            output_directory=executor.output_dir
-                        )
-                        break  # Successful retry, exit the loop
+        Args:
+            task (dict): Task information from the queue
 
-                    except Exception as retry_e:
-                        current_attempt += 1
-                        e = retry_e  # Update error for next iteration
+        Returns:
+            str: The output directory of the task
+        """
+        if task.get('output_directory'):
+            return task['output_directory']
 
-                elif next_action == "dead_letter":
-                    self.logger.info(f"Moving task {task_id} to dead letter queue after max retries")
-                    break
+        # one directory per task: parallel workers must not share subtask checkpoints
+        output_dir = str(Path(FileHelper.create_and_return_task_execution_directory()) / f"task_{task['task_id']}")
+        self.manager.set_task_output_directory(task['task_id'], output_dir)
+        return output_dir
 
-                else:  # fail
-                    self.logger.info(f"Task {task_id} failed permanently: {e}")
-                    break
+    def _execute(self, executor: SequentialTaskExecutor, task) -> dict:
+        """
+        Executes a task file, records the metrics of the attempt and raises if any
+        subtask failed, so the task is retried.
+
+        Args:
+            executor (SequentialTaskExecutor): The executor of the task
+            task (dict): The claimed task
+
+        Returns:
+            dict: The execution result
+
+        Raises:
+            RuntimeError: If subtasks failed
+        """
+        started = time.perf_counter()
+        try:
+            result = executor.execute_tasks_from_file(task['file_path'])
+        except Exception:
+            self._record_metrics(task, "failed", {}, time.perf_counter() - started)
+            raise
+        self._record_metrics(task, "failed" if result['failed_tasks'] else "completed", result,
+                             time.perf_counter() - started)
+        if result['failed_tasks']:
+            raise RuntimeError(f"{result['failed_tasks']}/{result['total_tasks']} subtasks failed")
+        return result
+
+    def _execute_watched_file(self, file_processor: FileProcessor, task) -> dict:
+        """
+        Executes a watched file through the refinement and execution pipeline, records
+        the metrics of the attempt and raises if the file failed, so the task is retried.
+        On success the file is removed from the watched directory.
+
+        Args:
+            file_processor (FileProcessor): The file processor
+            task (dict): The claimed task
+
+        Returns:
+            dict: The result of FileProcessor.process_file
+
+        Raises:
+            RuntimeError: If processing the file failed
+        """
+        started = time.perf_counter()
+        try:
+            result = file_processor.process_file(task['file_path'])
+        except Exception:
+            self._record_metrics(task, "failed", {}, time.perf_counter() - started)
+            raise
+        self._record_metrics(task, result['status'], result, time.perf_counter() - started)
+        if result['status'] != 'completed':
+            raise RuntimeError(result['error'] or "Processing the file failed")
+        return result
+
+    def _record_metrics(self, task, status: str, result: dict, wall_time: float) -> None:
+        """
+        Stores the performance metrics of a task attempt and its executed subtasks.
+        Failing to store them is logged, it does not fail the task.
+
+        Args:
+            task (dict): The claimed task
+            status (str): Outcome of the attempt
+            result (dict): The execution result of SequentialTaskExecutor or FileProcessor
+            wall_time (float): Duration of the attempt in seconds
+        """
+        subtasks = [{"subtask_id": detail["task_id"], "status": detail["status"], **detail["metrics"]}
+                    for detail in result.get('details', []) if detail.get('metrics')]
+        try:
+            self.manager.record_task_metrics(task['task_id'], status,
+                                             {**(result.get('metrics') or {}), "wall_time": wall_time},
+                                             subtasks=subtasks, attempt=task.get('attempts') or 1)
+        except Exception as e:
+            self.logger.error(f"Failed to record metrics of task {task['task_id']}: {e}")
@@ -9,6 +9,8 @@ Classes:
     StatusTracker: Manages task status tracking and reporting
 """
 
+from peewee import DoesNotExist
+
 class StatusTracker:
     """
     Tracks the status of tasks in the queue system.
@@ -62,11 +64,11 @@ class StatusTracker:
             task_id (str): Unique identifier for the task
 
         Returns:
-            dict: Task information including status
+            Task: Task information including status, or None if the task does not exist
         """
         try:
-            # In a real implementation, we would query the database directly
-            tasks = self.manager.get_all_tasks()
-            return next((t for t in tasks if t.task_id == task_id), None)
+            return self.manager.get_task(task_id)
+        except DoesNotExist:
+            return None
         except Exception as e:
             raise Exception(f"Failed to retrieve task status: {e}")
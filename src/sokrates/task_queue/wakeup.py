@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Task Queue Daemon Wakeup Module
+
+This module provides a lightweight wakeup channel for the task queue daemon.
+Each running daemon listens on a Unix datagram socket in a shared socket
+directory. Clients like `task-add` send a datagram to every socket in that
+directory after enqueueing work, so idle workers of the daemons claim it
+immediately instead of waiting for the next polling interval, also while
+other workers are busy with long running tasks.
+
+Classes:
+    DaemonWakeup: Listens for wakeup notifications and notifies running daemons
+"""
+
+import os
+import socket
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+class DaemonWakeup:
+    """
+    Wakeup channel between task queue clients and running daemons.
+
+    On platforms without Unix domain sockets the channel is disabled and the
+    daemon falls back to polling with its processing interval.
+
+    Attributes:
+        socket_directory (Path): Directory containing the sockets of all running daemons
+        socket_path (Path): Socket of this daemon, set once start() was called
+
+    Methods:
+        start(): Bind the socket of this daemon and listen for notifications
+        wait(): Block until a notification arrives or the timeout passes
+        set(): Wake the daemon from within the same process
+        stop(): Close and remove the socket
+        notify(): Send a wakeup notification to all running daemons
+    """
+
+    SOCKET_SUFFIX = ".sock"
+    MESSAGE = b"wakeup"
+
+    def __init__(self, socket_directory: str | Path, logger=None):
+        """
+        Initializes the DaemonWakeup.
+
+        Args:
+            socket_directory (str | Path): Directory for the daemon sockets
+            logger (logging.Logger, optional): Logger to use
+        """
+        self.logger = logger or logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.socket_directory = Path(socket_directory)
+        self.socket_path = None
+        self._event = threading.Event()
+        self._socket = None
+        self._thread = None
+        self._stopped = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Returns True if Unix domain sockets are available on this platform."""
+        return hasattr(socket, "AF_UNIX")
+
+    def start(self) -> bool:
+        """
+        Binds the socket of this daemon and starts listening for notifications.
+
+        Returns:
+            bool: True if the wakeup channel is active, False if the daemon has to rely on polling
+        """
+        if not self.is_supported():
+            self.logger.info("Unix domain sockets are not supported, daemon wakeup is disabled")
+            return False
+
+        try:
+            self.socket_directory.mkdir(parents=True, exist_ok=True)
+            self.socket_path = self.socket_directory / f"{os.getpid()}{self.SOCKET_SUFFIX}"
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.bind(str(self.socket_path))
+        except OSError as e:
+            self.logger.warning(f"Failed to set up daemon wakeup socket at {self.socket_path}: {e}")
+            self._socket = None
+            return False
+
+        self._stopped = False
+        self._thread = threading.Thread(target=self._listen, name="daemon-wakeup", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Listening for wakeup notifications on {self.socket_path}")
+        return True
+
+    def _listen(self) -> None:
+        """Receives notifications until the channel is stopped."""
+        while not self._stopped:
+            try:
+                self._socket.recv(64)
+            except OSError:
+                break
+            self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a notification arrives or the timeout passes.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds
+
+        Returns:
+            bool: True if woken by a notification, False on timeout
+        """
+        woken = self._event.wait(timeout)
+        self._event.clear()
+        return woken
+
+    def set(self) -> None:
+        """Wakes the idle workers from within the same process (e.g. from the file watcher)."""
+        self._event.set()
+
+    def stop(self) -> None:
+        """Stops listening, removes the socket and wakes any waiting caller."""
+        self._stopped = True
+        if self._socket is not None:
+            # unblock the listener thread before closing the socket
+            self._send(self.socket_path)
+            if self._thread is not None:
+                self._thread.join(timeout=1)
+            self._socket.close()
+            self._socket = None
+        if self.socket_path is not None and self.socket_path.exists():
+            self.socket_path.unlink()
+        self._event.set()
+
+    @classmethod
+    def notify(cls, socket_directory: str | Path) -> int:
+        """
+        Sends a wakeup notification to all daemons listening in the socket directory.
+        Sockets left behind by daemons that are no longer running are removed.
+
+        Args:
+            socket_directory (str | Path): Directory containing the daemon sockets
+
+        Returns:
+            int: Number of notified daemons
+        """
+        socket_directory = Path(socket_directory)
+        if not cls.is_supported() or not socket_directory.is_dir():
+            return 0
+
+        notified = 0
+        for socket_path in socket_directory.glob(f"*{cls.SOCKET_SUFFIX}"):
+            if cls._send(socket_path):
+                notified += 1
+            else:
+                try:
+                    socket_path.unlink()
+                except OSError:
+                    pass
+        return notified
+
+    @staticmethod
+    def _send(socket_path: Path) -> bool:
+        """
+        Sends a single notification without blocking.
+
+        Returns:
+            bool: False if nobody is listening on the socket
+        """
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        client.setblocking(False)
+        try:
+            client.sendto(DaemonWakeup.MESSAGE, str(socket_path))
+            return True
+        except BlockingIOError:
+            # the receive buffer is full: the daemon already has pending notifications
+            return True
+        except OSError:
+            # no daemon is listening (connection refused or socket removed)
+            return False
+        finally:
+            client.close()
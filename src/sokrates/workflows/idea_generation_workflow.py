@@ -16,6 +16,7 @@ from sokrates import PromptRefiner
 from sokrates import FileHelper
 from sokrates import Constants
 from sokrates import Utils
+from sokrates.refinement_cache import RefinementCache
 
 class IdeaGenerationWorkflow:
     """
@@ -217,18 +218,27 @@ class IdeaGenerationWorkflow:
         Returns:
             str: The final output from the LLM after executing the refined prompt.
         """
-        combined_refinement = self.prompt_refiner.combine_refinement_prompt(
-            execution_prompt,
-            FileHelper.read_file(self.refinement_prompt_file)
-        )
-        
-        refined_prompt = self.llm_api.send(
-            combined_refinement,
-            model=self.refinement_llm_model,
-            max_tokens=self.max_tokens,
-            temperature=self.temperature
-        )
-        cleaned_refined = self.prompt_refiner.clean_response(refined_prompt)
+        refinement_prompt = FileHelper.read_file(self.refinement_prompt_file)
+        cache = RefinementCache.get_default()
+        cleaned_refined = None
+        if cache is not None:
+            cleaned_refined = cache.get_refinement(execution_prompt, refinement_prompt, self.refinement_llm_model)
+
+        if cleaned_refined is None:
+            combined_refinement = self.prompt_refiner.combine_refinement_prompt(
+                execution_prompt,
+                refinement_prompt
+            )
+            
+            refined_prompt = self.llm_api.send(
+                combined_refinement,
+                model=self.refinement_llm_model,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            )
+            cleaned_refined = self.prompt_refiner.clean_response(refined_prompt)
+            if cache is not None:
+                cache.set_refinement(execution_prompt, refinement_prompt, self.refinement_llm_model, cleaned_refined)
         
         final_output = self.llm_api.send(
             cleaned_refined,
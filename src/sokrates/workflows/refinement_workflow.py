@@ -9,7 +9,9 @@ from typing import List, Optional
 from pathlib import Path
 import logging
 from sokrates.llm_api import LLMApi
+from sokrates.generation_metrics import GenerationMetrics
 from sokrates.prompt_refiner import PromptRefiner
+from sokrates.refinement_cache import RefinementCache
 from sokrates.file_helper import FileHelper
 
 class RefinementWorkflow:
@@ -29,7 +31,8 @@ class RefinementWorkflow:
         api_key: str, 
         model: str, 
         max_tokens: int = 20000,
-        temperature: float = 0.7) -> None:
+        temperature: float = 0.7,
+        llm_api: LLMApi = None) -> None:
       """
       Initializes the RefinementWorkflow.
 
@@ -39,31 +42,46 @@ class RefinementWorkflow:
           model (str): The default LLM model to use.
           max_tokens (int): The maximum number of tokens for LLM responses. Defaults to 20000.
           temperature (float): The sampling temperature for LLM responses. Defaults to 0.7.
+          llm_api (LLMApi, optional): An LLM client to use instead of creating one for the
+              api_endpoint, e.g. a ProviderPool. Defaults to None.
       """
       self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-      self.llm_api = LLMApi(api_endpoint=api_endpoint, api_key=api_key)
+      self.llm_api = llm_api or LLMApi(api_endpoint=api_endpoint, api_key=api_key)
       self.refiner = PromptRefiner()
       self.model = model
       self.max_tokens = max_tokens
       self.temperature = temperature
 
-    def refine_prompt(self, input_prompt: str, refinement_prompt: str, context: List[str]=None) -> str:
+    def refine_prompt(self, input_prompt: str, refinement_prompt: str, context: List[str]=None, metrics: GenerationMetrics = None) -> str:
       """
       Refines an input prompt using a specified refinement prompt and an LLM.
+      Refinements are served from the refinement cache if one is configured.
 
       Args:
           input_prompt (str): The initial prompt to be refined.
           refinement_prompt (str): The prompt containing instructions for refinement.
           context (List[str], optional): additional context to include in the refinement prompt
+          metrics (GenerationMetrics, optional): A metrics object to fill in for the refinement call.
 
       Returns:
           str: The refined and formatted prompt as a Markdown string.
       """
       self.logger.debug(f"Refining prompt: {input_prompt}")
 
-      combined_prompt = self.refiner.combine_refinement_prompt(input_prompt, refinement_prompt)
-      response_content = self.llm_api.send(combined_prompt, model=self.model, max_tokens=self.max_tokens, context=context)
-      processed_content = self.refiner.clean_response(response_content)
+      # the cache holds the cleaned response, formatting is applied on every call
+      cache = RefinementCache.get_default()
+      processed_content = None
+      if cache is not None:
+        processed_content = cache.get_refinement(input_prompt, refinement_prompt, self.model, context=context)
+        if processed_content is not None and metrics is not None:
+          metrics.cached = True
+
+      if processed_content is None:
+        combined_prompt = self.refiner.combine_refinement_prompt(input_prompt, refinement_prompt)
+        response_content = self.llm_api.send(combined_prompt, model=self.model, max_tokens=self.max_tokens, context=context, metrics=metrics)
+        processed_content = self.refiner.clean_response(response_content)
+        if cache is not None:
+          cache.set_refinement(input_prompt, refinement_prompt, self.model, processed_content, context=context)
 
       # Format as markdown
       markdown_output = self.refiner.format_as_markdown(processed_content)
@@ -75,7 +93,8 @@ class RefinementWorkflow:
           refinement_model: str = None,
           refinement_temperature: float = None,
           execution_model: str = None,
-          max_tokens: int = None
+          max_tokens: int = None,
+          metrics: List[GenerationMetrics] = None
           ) -> str:
       """
       Refines an input prompt and then sends the refined prompt to an LLM for execution.
@@ -86,6 +105,7 @@ class RefinementWorkflow:
           refinement_model (str, optional): The model to use for refinement. Defaults to self.model.
           execution_model (str, optional): The model to use for execution. Defaults to self.model.
           refinement_temperature (float, optional): The temperature for refinement. Defaults to self.temperature.
+          metrics (List[GenerationMetrics], optional): Receives the metrics of the refinement and the execution call.
 
       Returns:
           str: The executed response as a Markdown string.
@@ -100,12 +120,16 @@ class RefinementWorkflow:
         max_tokens = self.max_tokens
       
       self.logger.info("Refining and sending prompt...")
-      refined_prompt = self.refine_prompt(input_prompt=input_prompt, refinement_prompt=refinement_prompt)
+      refinement_metrics, execution_metrics = GenerationMetrics(), GenerationMetrics()
+      if metrics is not None:
+        metrics.extend([refinement_metrics, execution_metrics])
+      refined_prompt = self.refine_prompt(input_prompt=input_prompt, refinement_prompt=refinement_prompt,
+          metrics=refinement_metrics)
       
       self.logger.info(f"Sending refined prompt to model: {execution_model}")
       
       response_content = self.llm_api.send(refined_prompt, model=execution_model, 
-          temperature=refinement_temperature, max_tokens=max_tokens)
+          temperature=refinement_temperature, max_tokens=max_tokens, metrics=execution_metrics)
       processed_content = self.refiner.clean_response(response_content)
 
       # Format as markdown
@@ -9,29 +9,42 @@ Parameters:
   - model (str): Model identifier to use.
   - temperature (float): Controls randomness in prompt refinement. 
   - output_dir (str, optional): Directory path for saving results.
+  - subtask_concurrency (int, optional): Maximum number of subtasks executed in parallel.
 """
 
 import os
+import time
 import logging
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
 from pathlib import Path
 from .refinement_workflow import RefinementWorkflow
+from .subtask_manifest import SubtaskManifest
 from sokrates.file_helper import FileHelper
 from sokrates.llm_api import LLMApi
+from sokrates.generation_metrics import GenerationMetrics
+from sokrates.constants import Constants
 
 class SequentialTaskExecutor:
     """
-    Executes tasks defined in a JSON file sequentially.
+    Executes tasks defined in a JSON file.
 
     This class reads tasks from a JSON file (same format as BreakdownTask output),
     processes each task by analyzing concepts, generating prompts, refining them,
     and executing the tasks using LLM APIs. Results are saved to a specified directory.
 
+    Subtasks may list the ids of other subtasks in an optional `depends_on` field.
+    A subtask starts once all of its dependencies are completed, independent
+    subtasks run in parallel up to `subtask_concurrency`. With the default
+    concurrency of 1 the subtasks are executed in file order.
+
     Main Responsibilities:
         - Load tasks from JSON files
-        - Process tasks sequentially with error handling
+        - Process tasks in dependency order with error handling
         - Manage refinement workflows for prompt generation
         - Save execution results to output directory
+        - Checkpoint completed subtasks, so re-running a task file in the same
+          output directory resumes at the first incomplete subtask
 
     Attributes:
         api_endpoint (str): API endpoint for LLM service
@@ -39,6 +52,8 @@ class SequentialTaskExecutor:
         model (str): LLM model identifier
         output_dir (str): Directory path for saving results
         workflow (RefinementWorkflow): Workflow instance for prompt refinement
+        manifest (SubtaskManifest): Checkpoints of the completed subtasks in output_dir
+        subtask_concurrency (int): Maximum number of subtasks executed in parallel
         refinement_enabled (bool): Should prompts be refined before execution first
 
     Methods:
@@ -55,7 +70,9 @@ class SequentialTaskExecutor:
                  temperature: float,
                  output_dir: str | Path | None = None,
                  refinement_enabled: bool = True,
-                 max_tokens = DEFAULT_MAX_TOKENS
+                 max_tokens = DEFAULT_MAX_TOKENS,
+                 llm_api: LLMApi = None,
+                 subtask_concurrency: int = Constants.DEFAULT_SUBTASK_CONCURRENCY
                  ):
         """
         Initializes the SequentialTaskExecutor with configuration and workflow setup.
@@ -66,6 +83,9 @@ class SequentialTaskExecutor:
             model (str): LLM model to use. 
             output_dir (str, optional): Directory where task results will be saved.
                 If None, defaults to "$HOME/.sokrates/tasks/results".
+            llm_api (LLMApi, optional): An LLM client shared by all subtasks, e.g. a ProviderPool.
+                If None, a client for the api_endpoint is created.
+            subtask_concurrency (int, optional): Maximum number of independent subtasks executed in parallel.
 
         Side Effects:
             - Creates output directory if it doesn't exist
@@ -80,9 +100,12 @@ class SequentialTaskExecutor:
         self.output_dir = FileHelper.create_and_return_task_execution_directory(output_dir)
         self.refinement_enabled = refinement_enabled
         self.refinement_prompt_path = Path(refinement_prompt_path)
+        self.llm_api = llm_api or LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key)
+        self.subtask_concurrency = max(1, int(subtask_concurrency))
 
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest = SubtaskManifest(self.output_dir)
 
         # Initialize refinement workflow
         self.workflow = RefinementWorkflow(
@@ -90,12 +113,15 @@ class SequentialTaskExecutor:
             api_key=self.api_key,
             model=self.model,
             temperature=self.temperature,
-            max_tokens=self.max_tokens
+            max_tokens=self.max_tokens,
+            llm_api=self.llm_api
         )
 
     def execute_tasks_from_file(self, task_file_path: str) -> Dict[str, object]:
         """
-        Executes all tasks from a JSON file sequentially.
+        Executes all tasks from a JSON file, respecting the `depends_on` order of the subtasks.
+        Subtasks completed by a previous run in the same output directory are skipped.
+        Subtasks whose dependencies failed are skipped as well.
 
         Args:
             task_file_path (str): Path to the JSON file containing tasks
@@ -106,10 +132,12 @@ class SequentialTaskExecutor:
                 - total_tasks: Total number of tasks processed
                 - successful_tasks: Count of successfully completed tasks
                 - failed_tasks: Count of failed tasks
-                - details: List of individual task execution details
+                - details: List of individual task execution details (in task file order),
+                  executed subtasks include their performance `metrics`
+                - metrics: Performance summary of all generations of this run (see GenerationMetrics.summarize)
 
         Raises:
-            ValueError: If task file cannot be loaded or parsed
+            ValueError: If task file cannot be loaded or parsed, or the subtask dependencies are invalid
             Exception: If any task processing fails (caught and counted as failure)
 
         Side Effects:
@@ -125,9 +153,11 @@ class SequentialTaskExecutor:
             raise ValueError(f"Failed to load task file: {e}")
 
         main_task = tasks.get("task", None)
+        subtasks = tasks.get("subtasks", [])
+        dependencies = self._build_dependency_graph(subtasks)
         
         results = {
-            "total_tasks": len(tasks.get("subtasks", [])),
+            "total_tasks": len(subtasks),
             "successful_tasks": 0,
             "failed_tasks": 0,
             "details": [],
@@ -135,40 +165,54 @@ class SequentialTaskExecutor:
             "output_files": []
         }
 
-        for subtask in tasks.get("subtasks", []):
-            task_id = subtask.get("id")
-            task_desc = subtask.get("description")
-
-            if not task_id or not task_desc:
-                results["details"].append({
-                    "task_id": task_id,
+        # details are collected per subtask position, so the summary keeps the order of the task file
+        details = [None] * len(subtasks)
+        for index, subtask in enumerate(subtasks):
+            if index not in dependencies:
+                details[index] = {
+                    "task_id": subtask.get("id"),
                     "status": "skipped",
                     "message": "Missing required fields"
-                })
-                continue
-
-            try:
-                processing_result = self._process_single_task_file(task_desc=task_desc, 
-                    task_id=task_id, main_task=main_task)
-                self.logger.info(f"Processing result: {processing_result}")
-                
-                output_file = processing_result['output_file']
-                
-                results["output_files"].append(output_file)
+                }
+
+        pending = {index: set(depends_on) for index, depends_on in dependencies.items()}
+        running = {}
+        # metrics of all generations of this run, appended by the subtask threads
+        generations = []
+        with ThreadPoolExecutor(max_workers=self.subtask_concurrency, thread_name_prefix="subtask") as pool:
+            while pending or running:
+                for index in sorted(pending):
+                    if len(running) >= self.subtask_concurrency:
+                        break
+                    blocking = [i for i in pending[index] if details[i] is None or details[i]["status"] != "completed"]
+                    failed = [i for i in blocking if details[i] is not None]
+                    if failed:
+                        del pending[index]
+                        details[index] = {
+                            "task_id": subtasks[index]["id"],
+                            "status": "skipped",
+                            "message": f"Dependency {subtasks[failed[0]].get('id')} did not complete"
+                        }
+                    elif not blocking:
+                        del pending[index]
+                        running[pool.submit(self._execute_subtask, subtasks[index], main_task, generations)] = index
+
+                if not running:
+                    # everything left was skipped because of failed dependencies
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    details[running.pop(future)] = future.result()
+
+        for detail in details:
+            if detail["status"] == "completed":
                 results["successful_tasks"] += 1
-                status = "completed"
-                message = "Task executed successfully"
-            except Exception as e:
+                results["output_files"].append(detail["output_file"])
+            elif detail["status"] == "failed":
                 results["failed_tasks"] += 1
-                status = "failed"
-                message = f"Error executing task: {str(e)}"
-
-            results["details"].append({
-                "task_id": task_id,
-                "status": status,
-                "message": message,
-                "output_file": output_file
-            })
+        results["details"] = details
+        results["metrics"] = GenerationMetrics.summarize(generations)
 
         self.logger.info("Task execution summary:")
         self.logger.info(f"- Total tasks: {results['total_tasks']}")
@@ -178,7 +222,131 @@ class SequentialTaskExecutor:
 
         return results
 
-    def _process_single_task_file(self, task_desc: str, task_id: int, main_task: str = "") -> dict:
+    @staticmethod
+    def _build_dependency_graph(subtasks: List[dict]) -> Dict[int, List[int]]:
+        """
+        Resolves the optional `depends_on` ids of the subtasks into subtask positions.
+
+        Args:
+            subtasks (List[dict]): The subtasks of the task file
+
+        Returns:
+            Dict[int, List[int]]: Positions of the dependencies for the position of every executable subtask.
+                Subtasks with missing required fields are not included.
+
+        Raises:
+            ValueError: If a subtask id is used twice, a dependency does not exist or the dependencies contain a cycle
+        """
+        positions = {}
+        for index, subtask in enumerate(subtasks):
+            task_id = subtask.get("id")
+            if not task_id or not subtask.get("description"):
+                continue
+            if task_id in positions:
+                raise ValueError(f"Duplicate subtask id: {task_id}")
+            positions[task_id] = index
+
+        dependencies = {}
+        for task_id, index in positions.items():
+            depends_on = subtasks[index].get("depends_on") or []
+            if not isinstance(depends_on, list):
+                depends_on = [depends_on]
+            unknown = [dependency for dependency in depends_on if dependency not in positions]
+            if unknown:
+                raise ValueError(f"Subtask {task_id} depends on unknown subtasks: {unknown}")
+            dependencies[index] = [positions[dependency] for dependency in depends_on]
+
+        # depth first search for cycles
+        visited, in_progress = set(), set()
+        def visit(index):
+            if index in in_progress:
+                raise ValueError(f"Subtask dependencies contain a cycle at subtask {subtasks[index]['id']}")
+            if index in visited:
+                return
+            in_progress.add(index)
+            for dependency in dependencies[index]:
+                visit(dependency)
+            in_progress.remove(index)
+            visited.add(index)
+        for index in dependencies:
+            visit(index)
+
+        return dependencies
+
+    def _execute_subtask(self, subtask: dict, main_task: str, generations: List[GenerationMetrics] = None) -> dict:
+        """
+        Executes a single subtask or reuses its checkpoint.
+
+        Args:
+            subtask (dict): The subtask with id and description
+            main_task (str): Description of the main task
+            generations (List[GenerationMetrics], optional): Receives the metrics of the generations of the subtask
+
+        Returns:
+            dict: The execution detail with task_id, status, message and output_file.
+                Executed subtasks also have `metrics`: the GenerationMetrics summary and the wall_time in seconds.
+        """
+        task_id = subtask["id"]
+        task_desc = subtask["description"]
+
+        subtask_hash = self._subtask_hash(task_desc=task_desc, main_task=main_task)
+        output_file = self.manifest.get_completed_output(task_id, subtask_hash)
+        if output_file:
+            self.logger.info(f"Subtask {task_id} was already completed, reusing {output_file}")
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "message": "Task result reused from checkpoint",
+                "output_file": output_file
+            }
+
+        metrics = []
+        started = time.perf_counter()
+        try:
+            processing_result = self._process_single_task_file(task_desc=task_desc, 
+                task_id=task_id, main_task=main_task, metrics=metrics)
+            self.logger.info(f"Processing result: {processing_result}")
+            
+            output_file = processing_result['output_file']
+            self.manifest.mark_completed(task_id, subtask_hash, output_file, processing_result['response'])
+            status = "completed"
+            message = "Task executed successfully"
+        except Exception as e:
+            status = "failed"
+            message = f"Error executing task: {str(e)}"
+
+        if generations is not None:
+            generations.extend(metrics)
+        return {
+            "task_id": task_id,
+            "status": status,
+            "message": message,
+            "output_file": output_file,
+            "metrics": {**GenerationMetrics.summarize(metrics), "wall_time": time.perf_counter() - started}
+        }
+
+    def _subtask_hash(self, task_desc: str, main_task: str) -> str:
+        """
+        Returns the checkpoint hash of a subtask, covering everything that influences its result.
+
+        Args:
+            task_desc (str): Task description text
+            main_task (str): Description of the main task
+
+        Returns:
+            str: The subtask hash
+        """
+        return SubtaskManifest.subtask_hash(
+            main_task=main_task,
+            description=task_desc,
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            refinement_enabled=self.refinement_enabled
+        )
+
+    def _process_single_task_file(self, task_desc: str, task_id: int, main_task: str = "",
+                                  metrics: List[GenerationMetrics] = None) -> dict:
         """
         Processes a single task file through the complete workflow:
         1. Generate initial prompt from task description
@@ -189,6 +357,7 @@ class SequentialTaskExecutor:
         Args:
             task_desc (str): Task description text
             task_id (int): Unique identifier for the task
+            metrics (List[GenerationMetrics], optional): Receives the metrics of the LLM calls
 
         Raises:
             Exception: If any step in the processing fails (e.g., file reading,
@@ -233,16 +402,19 @@ Handle the sub-task in the context of the main objective.
                 refinement_model=self.model,
                 execution_model=self.model,
                 refinement_temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                metrics=metrics
             )
         else:
             self.logger.info("Refinement is disabled. Executing the prompt directly ...")
-            llmapi = LLMApi(api_endpoint=self.api_endpoint, 
-                            api_key=self.api_key)
-            execution_result = llmapi.send(task_prompt, 
+            execution_metrics = GenerationMetrics()
+            if metrics is not None:
+                metrics.append(execution_metrics)
+            execution_result = self.llm_api.send(task_prompt, 
                             model = self.model, 
                             max_tokens=self.max_tokens, 
-                            temperature=self.temperature)
+                            temperature=self.temperature,
+                            metrics=execution_metrics)
 
         self.logger.debug(f"Execution result for task {task_id}: {execution_result}")
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Subtask Manifest Module
+
+Main Purpose: Checkpoint completed subtasks of a task file execution, so a retry
+or a restarted daemon resumes at the first incomplete subtask instead of
+regenerating every result.
+
+The manifest is a JSON file in the output directory of the execution. For each
+completed subtask it stores a hash of the subtask input, the output file and a
+hash of the output content. A checkpoint is only reused if the subtask input is
+unchanged and the output file still has the recorded content.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+class SubtaskManifest:
+    """
+    Persists the completion state of subtasks next to their results.
+
+    Attributes:
+        manifest_path (Path): Path of the manifest file
+
+    Methods:
+        subtask_hash(): Hash identifying the input of a subtask
+        get_completed_output(): Output file of a completed subtask, if still valid
+        mark_completed(): Record a completed subtask
+    """
+
+    FILE_NAME = ".sokrates-manifest.json"
+
+    def __init__(self, output_dir: str | Path):
+        """
+        Initializes the SubtaskManifest and loads an existing manifest from the output directory.
+
+        Args:
+            output_dir (str | Path): The output directory of the task execution
+        """
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.manifest_path = Path(output_dir) / self.FILE_NAME
+        self._lock = threading.Lock()
+        self._subtasks = self._load()
+
+    def _load(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("subtasks", {})
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
+
+    def _save(self) -> None:
+        """Writes the manifest atomically, so an interrupted write never corrupts it."""
+        temporary_path = self.manifest_path.with_name(f"{self.manifest_path.name}.tmp")
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump({"subtasks": self._subtasks}, f, indent=2)
+        os.replace(temporary_path, self.manifest_path)
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def subtask_hash(**subtask_input) -> str:
+        """
+        Returns a hash identifying the input of a subtask.
+
+        Args:
+            **subtask_input: All values that influence the subtask result (description, model, ...)
+
+        Returns:
+            str: sha256 hex digest of the input
+        """
+        payload = json.dumps(subtask_input, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_completed_output(self, subtask_id, subtask_hash: str) -> Optional[str]:
+        """
+        Returns the output file of a completed subtask if the checkpoint is still valid.
+
+        Args:
+            subtask_id: The id of the subtask
+            subtask_hash (str): Hash of the current subtask input
+
+        Returns:
+            Optional[str]: The output file, or None if the subtask has to be executed
+        """
+        with self._lock:
+            entry = self._subtasks.get(str(subtask_id))
+        if not entry or entry.get("subtask_hash") != subtask_hash:
+            return None
+
+        output_file = entry.get("output_file")
+        try:
+            with open(output_file, 'r', encoding='utf-8', newline='') as f:
+                content = f.read()
+        except (OSError, TypeError):
+            return None
+        if self._content_hash(content) != entry.get("content_hash"):
+            self.logger.info(f"Output of subtask {subtask_id} was modified, executing it again")
+            return None
+        return output_file
+
+    def mark_completed(self, subtask_id, subtask_hash: str, output_file: str, content: str) -> None:
+        """
+        Records a completed subtask and persists the manifest.
+
+        Args:
+            subtask_id: The id of the subtask
+            subtask_hash (str): Hash of the subtask input
+            output_file (str): Path of the written result file
+            content (str): The written result
+        """
+        with self._lock:
+            self._subtasks[str(subtask_id)] = {
+                "subtask_hash": subtask_hash,
+                "output_file": str(output_file),
+                "content_hash": self._content_hash(content),
+                "completed_at": datetime.now(timezone.utc).isoformat()
+            }
+            self._save()
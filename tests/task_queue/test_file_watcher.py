@@ -3,6 +3,7 @@
 Tests for the file watcher functionality.
 """
 import tempfile
+import threading
 import time
 import os
 from pathlib import Path
@@ -131,13 +132,14 @@ class TestFileWatcherEventHandler:
         # Test with allowed extension
         with patch('pathlib.Path.exists', return_value=True):
             handler.on_created(mock_txt_event)
-            callback.assert_called_with("/path/to/file.txt")
+            assert list(handler.pending) == ["/path/to/file.txt"]
         
         # Test with disallowed extension
-        callback.reset_mock()
+        handler.pending.clear()
         with patch('pathlib.Path.exists', return_value=True):
             handler.on_created(mock_py_event)
-            callback.assert_not_called()
+            assert handler.pending == {}
+        callback.assert_not_called()
     
     def test_event_handler_directory_filtering(self):
         """Test that event handler ignores directory events."""
@@ -153,6 +155,94 @@ class TestFileWatcherEventHandler:
         callback.assert_not_called()
 
 
+class TestFileWatcherDebouncing:
+    """Test cases for the debouncing of detected files."""
+
+    @staticmethod
+    def _event(src_path, dest_path=None):
+        event = Mock()
+        event.is_directory = False
+        event.src_path = str(src_path)
+        event.dest_path = str(dest_path)
+        return event
+
+    def test_repeated_events_are_coalesced(self, tmp_path):
+        callback = Mock()
+        handler = FileWatcherEventHandler(callback=callback, debounce_ms=500, stable_ms=0)
+        test_file = tmp_path / "prompt.txt"
+        test_file.write_text("Part one")
+
+        handler.on_created(self._event(test_file))
+        test_file.write_text("Part one, part two")
+        handler.on_modified(self._event(test_file))
+        last_event = handler.pending[str(test_file)]["last_event"]
+
+        assert handler.process_pending(now=last_event + 0.1) == []
+        assert handler.process_pending(now=last_event + 0.5) == [str(test_file)]
+        assert handler.process_pending(now=last_event + 5) == []
+        callback.assert_called_once_with(str(test_file))
+
+    def test_file_is_processed_once_its_size_is_stable(self, tmp_path):
+        callback = Mock()
+        handler = FileWatcherEventHandler(callback=callback, debounce_ms=0, stable_ms=1000)
+        test_file = tmp_path / "prompt.txt"
+        test_file.write_text("Part one")
+        handler.on_created(self._event(test_file))
+        now = handler.pending[str(test_file)]["last_event"]
+
+        assert handler.process_pending(now=now) == []
+        # still growing without further events, e.g. a slow copy
+        with open(test_file, "a") as f:
+            f.write(", part two")
+        assert handler.process_pending(now=now + 0.9) == []
+        assert handler.process_pending(now=now + 1.5) == []
+        assert handler.process_pending(now=now + 1.9) == [str(test_file)]
+        callback.assert_called_once_with(str(test_file))
+
+    def test_moved_in_file_is_processed(self, tmp_path):
+        callback = Mock()
+        handler = FileWatcherEventHandler(callback=callback, debounce_ms=0, stable_ms=0)
+        test_file = tmp_path / "prompt.md"
+        test_file.write_text("Moved in")
+
+        handler.on_moved(self._event(tmp_path.parent / "outside.md", test_file))
+
+        assert handler.process_pending() == [str(test_file)]
+        callback.assert_called_once_with(str(test_file))
+
+    def test_temporary_file_renamed_into_place_is_processed_once(self, tmp_path):
+        callback = Mock()
+        handler = FileWatcherEventHandler(callback=callback, debounce_ms=0, stable_ms=0)
+        temporary_file = tmp_path / ".prompt.txt.swp"
+        test_file = tmp_path / "prompt.txt"
+        # rsync style: the temporary file has an allowed extension until it is renamed
+        rsync_file = tmp_path / ".prompt.txt.a1b2c3.txt"
+        rsync_file.write_text("Copied")
+
+        handler.on_created(self._event(temporary_file))
+        handler.on_created(self._event(rsync_file))
+        rsync_file.rename(test_file)
+        handler.on_moved(self._event(rsync_file, test_file))
+        handler.on_modified(self._event(test_file))
+
+        assert handler.process_pending() == [str(test_file)]
+        assert handler.pending == {}
+        callback.assert_called_once_with(str(test_file))
+
+    def test_deleted_file_is_not_processed(self, tmp_path):
+        callback = Mock()
+        handler = FileWatcherEventHandler(callback=callback, debounce_ms=0, stable_ms=0)
+        test_file = tmp_path / "prompt.txt"
+        test_file.write_text("Short lived")
+
+        handler.on_created(self._event(test_file))
+        test_file.unlink()
+        handler.on_deleted(self._event(test_file))
+
+        assert handler.process_pending() == []
+        callback.assert_not_called()
+
+
 class TestFileProcessor:
     """Test cases for FileProcessor class."""
     
@@ -247,4 +337,99 @@ class TestFileProcessor:
             
         finally:
             if os.path.exists(temp_file):
-                os.unlink(temp_file)
\ No newline at end of file
+                os.unlink(temp_file)
+
+
+class TestFileProcessorConcurrency:
+    """Test cases for the concurrent processing of files with per-provider request limits."""
+
+    PROVIDERS = [
+        {"name": "local", "api_endpoint": "http://local:1234/v1", "api_key": "key", "default_model": "small",
+         "default_temperature": 0.7, "max_concurrent_requests": 2},
+        {"name": "remote", "api_endpoint": "http://remote:1234/v1", "api_key": "key", "default_model": "large",
+         "default_temperature": 0.7, "max_concurrent_requests": 4},
+    ]
+
+    @staticmethod
+    def _config(tmp_path):
+        providers = {provider["name"]: provider for provider in TestFileProcessorConcurrency.PROVIDERS}
+        config = Mock()
+        config.config = {"providers": TestFileProcessorConcurrency.PROVIDERS}
+        config.get.side_effect = lambda key: {"home_path": tmp_path, "prompts_directory": tmp_path}[key]
+        config.get_default_provider.return_value = providers["local"]
+        config.get_provider.side_effect = lambda name: providers[name]
+        return config
+
+    @staticmethod
+    def _write_files(tmp_path, provider, count):
+        paths = []
+        for i in range(count):
+            path = tmp_path / f"{provider}_{i}.md"
+            path.write_text(f"---\nprovider: {provider}\n---\nPrompt {i}")
+            paths.append(str(path))
+        return paths
+
+    def test_files_are_sent_to_their_provider_within_its_limit(self, tmp_path):
+        lock = threading.Lock()
+        in_flight, max_in_flight, models = {}, {}, {}
+
+        def llm_api(api_endpoint, api_key):
+            def send(prompt, model, **kwargs):
+                with lock:
+                    in_flight[api_endpoint] = in_flight.get(api_endpoint, 0) + 1
+                    max_in_flight[api_endpoint] = max(max_in_flight.get(api_endpoint, 0), in_flight[api_endpoint])
+                    models.setdefault(api_endpoint, set()).add(model)
+                time.sleep(0.05)
+                with lock:
+                    in_flight[api_endpoint] -= 1
+                return "Result"
+            return Mock(send=Mock(side_effect=send))
+
+        with patch("sokrates.task_queue.file_processor.LLMApi", side_effect=llm_api) as llm_api_class:
+            processor = FileProcessor(config=self._config(tmp_path))
+            paths = self._write_files(tmp_path, "local", 6) + self._write_files(tmp_path, "remote", 8)
+
+            results = processor.process_files(paths)
+
+        assert [result["file_path"] for result in results] == paths
+        assert {result["status"] for result in results} == {"completed"}
+        assert max_in_flight == {"http://local:1234/v1": 2, "http://remote:1234/v1": 4}
+        assert models == {"http://local:1234/v1": {"small"}, "http://remote:1234/v1": {"large"}}
+        # one client per provider
+        assert llm_api_class.call_count == 2
+
+    def test_slow_provider_does_not_hold_back_the_other_provider(self, tmp_path):
+        lock = threading.Lock()
+        first_request = {}
+
+        def llm_api(api_endpoint, api_key):
+            def send(prompt, model, **kwargs):
+                with lock:
+                    first_request.setdefault(api_endpoint, time.monotonic())
+                if api_endpoint == "http://local:1234/v1":
+                    time.sleep(0.3)
+                return "Result"
+            return Mock(send=Mock(side_effect=send))
+
+        with patch("sokrates.task_queue.file_processor.LLMApi", side_effect=llm_api):
+            processor = FileProcessor(config=self._config(tmp_path))
+            # the files of the slow provider come first
+            paths = self._write_files(tmp_path, "local", 12) + self._write_files(tmp_path, "remote", 8)
+
+            started = time.monotonic()
+            results = processor.process_files(paths)
+            processor.shutdown()
+
+        assert {result["status"] for result in results} == {"completed"}
+        assert first_request["http://remote:1234/v1"] - started < 0.2
+
+    def test_missing_file_fails_without_stopping_the_batch(self, tmp_path):
+        with patch("sokrates.task_queue.file_processor.LLMApi") as llm_api_class:
+            llm_api_class.return_value.send.return_value = "Result"
+            processor = FileProcessor(config=self._config(tmp_path))
+            paths = [str(tmp_path / "missing.md")] + self._write_files(tmp_path, "local", 1)
+
+            results = processor.process_files(paths)
+
+        assert [result["status"] for result in results] == ["failed", "completed"]
+        assert "does not exist" in results[0]["error"]
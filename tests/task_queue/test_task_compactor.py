@@ -0,0 +1,113 @@
+"""
+Test suite for the TaskCompactor class.
+
+Covers archiving of old finished tasks, trimming of the task history
+and the archive file format.
+"""
+
+import datetime
+import gzip
+import json
+import pytest
+from unittest.mock import patch
+
+from sokrates.task_queue.compactor import TaskCompactor
+from sokrates.task_queue.database import TaskQueueORMDatabase
+from sokrates.task_queue.orm import Task, TaskHistory, utc_now
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = TaskQueueORMDatabase(str(tmp_path / "database.sqlite"))
+    yield database
+    database.close()
+
+
+def _finished_task(database, status, days_ago, history_entries=2):
+    task = database.add_task("Task", "/tmp/task.json")
+    for _ in range(history_entries - 1):
+        database.update_task_status(task.task_id, "in_progress")
+    database.update_task_status(task.task_id, status, result="A long result text")
+    Task.update(updated_at=utc_now() - datetime.timedelta(days=days_ago)).where(Task.task_id == task.task_id).execute()
+    return task.task_id
+
+
+def _read_archive(archive_file):
+    with gzip.open(archive_file, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestTaskCompactor:
+    """Test cases for TaskCompactor.compact."""
+
+    def test_old_finished_tasks_are_archived_and_deleted(self, database, tmp_path):
+        old_completed = _finished_task(database, "completed", days_ago=40)
+        old_failed = _finished_task(database, "failed", days_ago=40)
+        database.add_task_metrics(old_completed, "completed", {"generations": 2, "wall_time": 1.5},
+                                  subtasks=[{"subtask_id": 1, "status": "completed", "wall_time": 1.0}])
+        recent = _finished_task(database, "completed", days_ago=1)
+        pending = database.add_task("Pending", "/tmp/pending.json")
+        Task.update(updated_at=utc_now() - datetime.timedelta(days=40)).where(Task.task_id == pending.task_id).execute()
+
+        result = TaskCompactor(database, tmp_path / "archive").compact(max_age_days=30)
+
+        assert result["archived_tasks"] == 2
+        assert sorted(task.task_id for task in Task.select()) == [recent, pending.task_id]
+        assert not TaskHistory.select().where(TaskHistory.task.in_([old_completed, old_failed])).exists()
+
+        archived = _read_archive(result["archive_file"])
+        assert [line["task_id"] for line in archived] == [old_completed, old_failed]
+        assert archived[0]["task"]["status"] == "completed"
+        assert [entry["status"] for entry in archived[0]["history"]] == ["in_progress", "completed"]
+        assert archived[0]["history"][-1]["result"] == "A long result text"
+        assert [(m["wall_time"], len(m["subtasks"])) for m in archived[0]["metrics"]] == [(1.5, 1)]
+        assert archived[1]["metrics"] == []
+
+    def test_history_is_trimmed_to_newest_entries(self, database, tmp_path):
+        task_id = _finished_task(database, "completed", days_ago=1, history_entries=5)
+
+        result = TaskCompactor(database, tmp_path / "archive").compact(max_history_per_task=2)
+
+        kept = [entry.status for entry in TaskHistory.select().where(TaskHistory.task == task_id).order_by(TaskHistory.history_id)]
+        assert kept == ["in_progress", "completed"]
+        assert result["trimmed_history"] == 3
+        archived = _read_archive(result["archive_file"])
+        assert archived == [{"task_id": task_id, "task": None, "history": archived[0]["history"]}]
+        assert len(archived[0]["history"]) == 3
+
+    def test_dry_run_and_nothing_to_compact_keep_the_database(self, database, tmp_path):
+        _finished_task(database, "completed", days_ago=40)
+        compactor = TaskCompactor(database, tmp_path / "archive")
+
+        assert compactor.compact(max_age_days=30, dry_run=True)["archived_tasks"] == 1
+        assert Task.select().count() == 1
+        assert compactor.compact(max_age_days=60)["archive_file"] is None
+        assert not (tmp_path / "archive").exists()
+
+    def test_failed_delete_keeps_history_and_removes_archive(self, database, tmp_path):
+        old_task = _finished_task(database, "completed", days_ago=40)
+        remaining = _finished_task(database, "completed", days_ago=1, history_entries=5)
+        history_count = TaskHistory.select().count()
+
+        with patch.object(database, "delete_tasks", side_effect=RuntimeError("disk full")):
+            with pytest.raises(RuntimeError):
+                TaskCompactor(database, tmp_path / "archive").compact(max_age_days=30, max_history_per_task=2)
+
+        assert TaskHistory.select().count() == history_count
+        assert sorted(task.task_id for task in Task.select()) == [old_task, remaining]
+        assert list((tmp_path / "archive").iterdir()) == []
+
+    def test_original_is_archived_only_with_its_linked_tasks(self, database, tmp_path):
+        original = _finished_task(database, "completed", days_ago=40)
+        linked = database.add_task("Linked", "/tmp/task.json")
+        Task.update(status="linked", duplicate_of=original).where(Task.task_id == linked.task_id).execute()
+        compactor = TaskCompactor(database, tmp_path / "archive")
+
+        assert compactor.compact(max_age_days=30)["archived_tasks"] == 0
+        Task.update(updated_at=utc_now() - datetime.timedelta(days=40)).where(Task.task_id == linked.task_id).execute()
+        assert compactor.compact(max_age_days=30)["archived_tasks"] == 2
+        assert Task.select().count() == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
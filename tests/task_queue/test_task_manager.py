@@ -0,0 +1,250 @@
+"""
+Test suite for TaskQueueManager.
+
+Covers adding task files in bulk from directories and JSONL manifests,
+the duplicate policies for task files that are already queued, the
+filtered, paginated task listing and the startup scan of watched directories.
+"""
+
+import datetime
+import json
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+from sokrates.task_queue.file_watcher import FileWatcher
+from sokrates.task_queue.manager import TaskQueueManager
+from sokrates.task_queue.orm import Task, ProcessedFile, utc_now
+from sokrates.task_queue.status_tracker import StatusTracker
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config = Mock()
+    config.config = {}
+    config.get.side_effect = lambda key: {'database_path': str(tmp_path / "database.sqlite")}[key]
+    manager = TaskQueueManager(config)
+    yield manager
+    manager.close()
+
+
+def _write_task_file(path, subtasks=None):
+    path.write_text(json.dumps({"task": f"Main task {path.name}", "subtasks": subtasks or [{"id": 1, "description": "Do it"}]}))
+    return path
+
+
+class TestBulkAdd:
+    """Test cases for adding many task files in one transaction."""
+
+    def test_add_tasks_from_directory(self, manager, tmp_path):
+        task_dir = tmp_path / "tasks"
+        task_dir.mkdir()
+        for name in ("b.json", "a.json"):
+            _write_task_file(task_dir / name)
+        (task_dir / "broken.json").write_text("{not json")
+        (task_dir / "notes.txt").write_text("ignored")
+
+        result = manager.add_tasks_from_directory(str(task_dir), priority="high")
+
+        assert [added["source"] for added in result["added"]] == [str(task_dir / "a.json"), str(task_dir / "b.json")]
+        assert [error["source"] for error in result["errors"]] == [str(task_dir / "broken.json")]
+        tasks = manager.get_pending_tasks()
+        assert [task["task_id"] for task in tasks] == [added["task_id"] for added in result["added"]]
+        assert {task["priority"] for task in tasks} == {"high"}
+
+    def test_add_tasks_from_manifest_reports_rejected_lines(self, manager, tmp_path):
+        _write_task_file(tmp_path / "first.json")
+        _write_task_file(tmp_path / "second.json")
+        manifest = tmp_path / "tasks.jsonl"
+        manifest.write_text("\n".join([
+            json.dumps({"task_file": "first.json", "priority": "low", "description": "First"}),
+            "",
+            "not json",
+            json.dumps({"task_file": "missing.json"}),
+            json.dumps({"task_file": "second.json", "priority": "urgent"}),
+            json.dumps({"task_file": str(tmp_path / "second.json")}),
+        ]))
+
+        result = manager.add_tasks_from_manifest(str(manifest))
+
+        assert [added["source"] for added in result["added"]] == [f"{manifest}:1", f"{manifest}:6"]
+        assert [error["source"] for error in result["errors"]] == [f"{manifest}:3", f"{manifest}:4", f"{manifest}:5"]
+        first = manager.get_task(result["added"][0]["task_id"])
+        assert (first.description, first.priority, first.file_path) == ("First", "low", str(tmp_path / "first.json"))
+
+    def test_bulk_add_inserts_in_batches(self, manager, tmp_path):
+        entries = [{"task_file": str(_write_task_file(tmp_path / f"task_{i}.json"))} for i in range(250)]
+
+        result = manager.add_tasks_from_files(entries)
+
+        assert len(result["added"]) == 250
+        assert [added["task_id"] for added in result["added"]] == list(range(1, 251))
+        assert len(manager.get_pending_tasks()) == 250
+
+
+class TestDuplicateTasks:
+    """Test cases for the content hash based duplicate policies."""
+
+    def test_reject_duplicates_of_active_tasks(self, manager, tmp_path):
+        task_file = _write_task_file(tmp_path / "task.json")
+        copy = tmp_path / "copy.json"
+        copy.write_text(task_file.read_text())
+        task_id = manager.add_task_from_file(str(task_file))
+
+        with pytest.raises(ValueError, match=f"duplicate of task {task_id}"):
+            manager.add_task_from_file(str(copy))
+
+        # a finished task file may be queued again
+        manager.update_task_status(task_id, "completed")
+        assert manager.add_task_from_file(str(copy)) != task_id
+
+    def test_coalesce_returns_the_queued_task(self, manager, tmp_path):
+        task_file = str(_write_task_file(tmp_path / "task.json"))
+        task_id = manager.add_task_from_file(task_file)
+
+        assert manager.add_task_from_file(task_file, duplicate_policy="coalesce") == task_id
+        assert Task.select().count() == 1
+
+    def test_link_refers_to_the_existing_result(self, manager, tmp_path):
+        task_file = str(_write_task_file(tmp_path / "task.json"))
+        original = int(manager.add_task_from_file(task_file))
+        manager.update_task_status(original, "completed", result="done")
+
+        linked = manager.get_task(int(manager.add_task_from_file(task_file, duplicate_policy="link")))
+
+        assert (linked.status, linked.duplicate_of_id) == ("linked", original)
+        assert manager.claim_next_task() is None
+
+    def test_duplicates_within_one_bulk_add(self, manager, tmp_path):
+        task_file = _write_task_file(tmp_path / "task.json")
+        other = _write_task_file(tmp_path / "other.json")
+        entries = [{"task_file": str(path)} for path in (task_file, other, task_file)]
+
+        rejected = manager.add_tasks_from_files(entries)
+        first, second = rejected["added"]
+        assert rejected["errors"] == [{"source": str(task_file), "error": f"Duplicate of task {first['task_id']}"}]
+
+        coalesced = manager.add_tasks_from_files(entries, duplicate_policy="coalesce")
+        assert [added["task_id"] for added in coalesced["added"]] == [first["task_id"], second["task_id"], first["task_id"]]
+
+        Task.delete().execute()
+        linked = manager.add_tasks_from_files(entries, duplicate_policy="link")["added"]
+        assert linked[2]["duplicate_of"] == linked[0]["task_id"]
+        assert manager.get_task(linked[2]["task_id"]).status == "linked"
+
+    def test_unique_index_guards_active_tasks(self, manager):
+        manager.db.add_task("Task", "/tmp/task.json", content_hash="abc")
+
+        # a concurrent writer whose duplicate lookup ran before the first insert
+        with patch.object(manager.db, "_find_tasks_by_content_hash", return_value={}):
+            with pytest.raises(ValueError, match="Task already exists"):
+                manager.db.add_task("Task", "/tmp/task.json", content_hash="abc")
+        assert Task.select().count() == 1
+
+
+class TestTaskListing:
+    """Test cases for filtering and paginating tasks in the database."""
+
+    @pytest.fixture
+    def task_ids(self, manager):
+        task_ids = [manager.db.add_task(f"Task {i}", "/tmp/task.json", priority="high" if i % 2 else "normal").task_id
+                    for i in range(7)]
+        for task_id in task_ids[:3]:
+            manager.update_task_status(task_id, "completed")
+        return task_ids
+
+    def test_filters_by_status_and_priority(self, manager, task_ids):
+        assert [task.task_id for task in manager.list_tasks(status="completed")] == task_ids[:3]
+        assert [task.task_id for task in manager.list_tasks(status="pending", priority="high")] == [task_ids[3], task_ids[5]]
+
+    def test_keyset_pagination(self, manager, task_ids):
+        first = manager.list_tasks(limit=3)
+        second = manager.list_tasks(limit=3, after_id=first[-1].task_id)
+        last = manager.list_tasks(limit=3, after_id=second[-1].task_id)
+        assert [task.task_id for task in first + second + last] == task_ids
+
+        newest = manager.list_tasks(limit=4, newest_first=True)
+        older = manager.list_tasks(limit=4, newest_first=True, after_id=newest[-1].task_id)
+        assert [task.task_id for task in newest + older] == task_ids[::-1]
+
+    def test_filters_by_creation_date(self, manager, task_ids):
+        Task.update(created_at=utc_now() - datetime.timedelta(days=3)).where(Task.task_id.in_(task_ids[:2])).execute()
+        yesterday = utc_now() - datetime.timedelta(days=1)
+
+        assert [task.task_id for task in manager.list_tasks(created_before=yesterday)] == task_ids[:2]
+        assert [task.task_id for task in manager.list_tasks(created_after=yesterday)] == task_ids[2:]
+
+    def test_count_tasks_by_status(self, manager, task_ids):
+        assert manager.count_tasks_by_status() == {"completed": 3, "pending": 4}
+
+    def test_status_tracker_returns_the_task_or_none(self, manager, task_ids):
+        tracker = StatusTracker(manager)
+        assert tracker.get_status(task_ids[0]).status == "completed"
+        assert tracker.get_status(9999) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
+
+
+class TestWatchedFileBackfill:
+    """Test cases for queueing files added to watched directories while no daemon was running."""
+
+    @pytest.fixture
+    def watched(self, tmp_path):
+        watched = tmp_path / "watched"
+        (watched / "nested").mkdir(parents=True)
+        (watched / "first.md").write_text("First")
+        (watched / "nested" / "second.txt").write_text("Second")
+        (watched / "ignored.py").write_text("print()")
+        return watched
+
+    def _backfill(self, manager, watched):
+        return manager.backfill_watched_files(FileWatcher.scan_directory(str(watched), ['.txt', '.md']), [str(watched)])
+
+    def test_new_files_are_queued_recursively(self, manager, watched):
+        result = self._backfill(manager, watched)
+
+        assert result == {"scanned": 2, "queued": 2, "unchanged": 0, "removed": 0}
+        tasks = manager.get_pending_tasks()
+        assert sorted(task["file_path"] for task in tasks) == [str(watched / "first.md"), str(watched / "nested" / "second.txt")]
+        assert {task["task_type"] for task in tasks} == {"watched_file"}
+        assert ProcessedFile.select().count() == 2
+
+    def test_unchanged_files_are_neither_read_nor_queued_again(self, manager, watched):
+        self._backfill(manager, watched)
+        Task.update(status="failed").execute()
+
+        with patch.object(TaskQueueManager, "content_hash", side_effect=AssertionError("file was read")):
+            result = self._backfill(manager, watched)
+
+        assert result == {"scanned": 2, "queued": 0, "unchanged": 2, "removed": 0}
+        assert manager.get_pending_tasks() == []
+
+    def test_changed_files_are_queued_again(self, manager, watched):
+        self._backfill(manager, watched)
+        Task.update(status="failed").execute()
+        first, second = watched / "first.md", watched / "nested" / "second.txt"
+        first.write_text("First, edited")
+        # touched without changing the content
+        os.utime(second, ns=(second.stat().st_atime_ns, second.stat().st_mtime_ns + 10**9))
+
+        result = self._backfill(manager, watched)
+
+        assert result["queued"] == 1
+        assert [task["file_path"] for task in manager.get_pending_tasks()] == [str(first)]
+        assert ProcessedFile.get_by_id(str(second)).mtime_ns == second.stat().st_mtime_ns
+        assert self._backfill(manager, watched)["queued"] == 0
+
+    def test_watcher_detections_are_recorded_and_removed_files_are_forgotten(self, manager, watched):
+        added = manager.add_watched_file(str(watched / "first.md"))
+        assert manager.add_watched_file(str(watched / "first.md"))["duplicate_of"] == added["task_id"]
+        (watched / "nested" / "second.txt").unlink()
+
+        result = self._backfill(manager, watched)
+
+        assert result == {"scanned": 1, "queued": 0, "unchanged": 1, "removed": 0}
+        assert len(manager.get_pending_tasks()) == 1
+        (watched / "first.md").unlink()
+        assert self._backfill(manager, watched)["removed"] == 1
+        assert ProcessedFile.select().count() == 0
@@ -0,0 +1,549 @@
+"""
+Test suite for concurrent task processing.
+
+Covers atomic task claiming in TaskQueueORMDatabase, the parallel
+worker pool of TaskProcessor, the scheduling of retries and the
+recovery of tasks with expired leases.
+"""
+
+import datetime
+import sqlite3
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from sokrates.task_queue.database import TaskQueueORMDatabase
+from sokrates.task_queue.orm import Task, TaskHistory, TaskMetric, SubtaskMetric, utc_now
+from sokrates.task_queue.processor import TaskProcessor
+from sokrates.task_queue.wakeup import DaemonWakeup
+
+
+def _mock_config(tmp_path, workers=1):
+    values = {
+        'database_path': str(tmp_path / "database.sqlite"),
+        'daemon.workers': workers,
+        'daemon.lease_seconds': 600,
+        'daemon.priority_aging_seconds': 0,
+        'daemon.subtask_concurrency': 1,
+        'prompts_directory': tmp_path
+    }
+    config = Mock()
+    config.config = {'daemon': {}}
+    config.get.side_effect = lambda key: values[key]
+    return config
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = TaskQueueORMDatabase(str(tmp_path / "database.sqlite"))
+    yield database
+    database.close()
+
+
+class TestTaskClaiming:
+    """Test cases for TaskQueueORMDatabase.claim_next_task."""
+
+    def test_claim_marks_task_in_progress(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+
+        claimed = database.claim_next_task()
+
+        assert claimed['task_id'] == task.task_id
+        assert claimed['status'] == 'in_progress'
+        assert database.get_task(task.task_id).status == 'in_progress'
+        assert [h.status for h in TaskHistory.select().where(TaskHistory.task == task.task_id)] == ['in_progress']
+        assert database.claim_next_task() is None
+
+    def test_claim_records_lease_until_task_is_finished(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+
+        claimed = database.claim_next_task(lease_owner="host:1:worker-0", lease_seconds=60)
+
+        assert claimed['lease_owner'] == "host:1:worker-0"
+        assert claimed['lease_expires_at'] is not None
+        assert [t.task_id for t in database.get_leased_tasks("host:1:")] == [task.task_id]
+        assert database.get_leased_tasks("host:2:") == []
+
+        database.update_task_status(task.task_id, "completed")
+        stored = database.get_task(task.task_id)
+        assert stored.lease_owner is None
+        assert stored.lease_expires_at is None
+
+    def test_missing_columns_are_added_to_existing_database(self, tmp_path):
+        db_path = str(tmp_path / "old.sqlite")
+        connection = sqlite3.connect(db_path)
+        connection.execute("CREATE TABLE task (task_id INTEGER PRIMARY KEY, description TEXT NOT NULL, "
+                           "file_path TEXT NOT NULL, priority VARCHAR(255) NOT NULL, status VARCHAR(255) NOT NULL, "
+                           "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, result TEXT, "
+                           "output_directory TEXT, error_message TEXT)")
+        connection.close()
+
+        database = TaskQueueORMDatabase(db_path)
+        database.add_task("Task", "/tmp/task.json")
+
+        assert database.claim_next_task(lease_owner="owner")['lease_owner'] == "owner"
+        database.close()
+
+    def test_claims_by_priority_then_fifo(self, database):
+        low = database.add_task("Low", "/tmp/low.json", priority="low")
+        first_normal = database.add_task("Normal 1", "/tmp/normal_1.json")
+        high = database.add_task("High", "/tmp/high.json", priority="high")
+        second_normal = database.add_task("Normal 2", "/tmp/normal_2.json")
+
+        expected = [high.task_id, first_normal.task_id, second_normal.task_id, low.task_id]
+        assert [t['task_id'] for t in database.get_pending_tasks()] == expected
+        assert [t['task_id'] for t in database.get_pending_tasks(limit=2)] == expected[:2]
+        assert [database.claim_next_task()['task_id'] for _ in range(4)] == expected
+
+    def test_aging_promotes_waiting_low_priority_tasks(self, database):
+        low = database.add_task("Low", "/tmp/low.json", priority="low")
+        high = database.add_task("High", "/tmp/high.json", priority="high")
+        # the low priority task has been waiting for two aging periods
+        Task.update(created_at=utc_now() - datetime.timedelta(seconds=130)).where(Task.task_id == low.task_id).execute()
+
+        assert database.claim_next_task()['task_id'] == high.task_id
+        database.update_task_status(high.task_id, "pending")
+
+        assert database.claim_next_task(aging_seconds=60)['task_id'] == low.task_id
+
+    def test_invalid_priority_is_rejected(self, database):
+        with pytest.raises(ValueError):
+            database.add_task("Task", "/tmp/task.json", priority="urgent")
+
+    def test_next_task_lookup_uses_index(self, database):
+        plan = database.db.execute_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM task WHERE status = 'pending' AND priority = 'high' "
+            "ORDER BY created_at, task_id LIMIT 1"
+        ).fetchall()
+
+        assert any("USING INDEX" in str(row) for row in plan)
+        assert not any("TEMP B-TREE" in str(row) for row in plan)
+
+    def test_concurrent_claims_never_hand_out_a_task_twice(self, database):
+        for i in range(20):
+            database.add_task(f"Task {i}", f"/tmp/task_{i}.json")
+
+        claimed = []
+        lock = threading.Lock()
+
+        def claim_all():
+            while True:
+                task = database.claim_next_task()
+                if task is None:
+                    break
+                with lock:
+                    claimed.append(task['task_id'])
+            database.close()
+
+        threads = [threading.Thread(target=claim_all) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(claimed) == sorted(set(claimed))
+        assert len(claimed) == 20
+
+
+class TestDatabasePragmas:
+    """Test cases for the sqlite connection profile of the task queue database."""
+
+    def test_tuned_pragmas_are_applied_by_default(self, database):
+        assert database.db.execute_sql("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert database.db.execute_sql("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert database.db.execute_sql("PRAGMA busy_timeout").fetchone()[0] == database.pragmas["busy_timeout"]
+
+    def test_pragmas_are_configurable(self, tmp_path):
+        database = TaskQueueORMDatabase(str(tmp_path / "database.sqlite"),
+                                        pragmas={"journal_mode": "delete", "busy_timeout": 1234})
+
+        assert database.db.execute_sql("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert database.db.execute_sql("PRAGMA busy_timeout").fetchone()[0] == 1234
+        database.close()
+
+
+class TestTaskProcessorWorkers:
+    """Test cases for the parallel worker pool of TaskProcessor."""
+
+    def _run(self, tmp_path, workers, task_count, limit=None):
+        processor = TaskProcessor(config=_mock_config(tmp_path, workers))
+        for i in range(task_count):
+            processor.manager.db.add_task(f"Task {i}", f"/tmp/task_{i}.json")
+
+        state = {"in_flight": 0, "max_in_flight": 0, "processed": []}
+        lock = threading.Lock()
+
+        def process(task):
+            with lock:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            time.sleep(0.05)
+            processor.status_tracker.update_status(task['task_id'], "completed")
+            with lock:
+                state["in_flight"] -= 1
+                state["processed"].append(task['task_id'])
+
+        processor._process_single_task_file = process
+        processor.process_tasks(limit=limit)
+        return processor, state
+
+    def test_workers_process_tasks_in_parallel(self, tmp_path):
+        processor, state = self._run(tmp_path, workers=3, task_count=6)
+
+        assert sorted(state["processed"]) == list(range(1, 7))
+        assert state["max_in_flight"] == 3
+        assert all(task.status == 'completed' for task in processor.manager.get_all_tasks())
+
+    def test_limit_is_respected_across_workers(self, tmp_path):
+        processor, state = self._run(tmp_path, workers=3, task_count=6, limit=4)
+
+        assert len(state["processed"]) == 4
+        assert len(processor.manager.get_pending_tasks()) == 2
+
+    def test_idle_worker_picks_up_task_added_while_another_runs(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path, workers=2))
+        wakeup = DaemonWakeup(tmp_path / "run")
+        long_task = processor.manager.db.add_task("Long", "/tmp/long.json")
+        long_started, release_long, added_done = threading.Event(), threading.Event(), threading.Event()
+
+        def process(task):
+            if task['task_id'] == long_task.task_id:
+                long_started.set()
+                release_long.wait(timeout=5)
+            else:
+                added_done.set()
+            processor.status_tracker.update_status(task['task_id'], "completed")
+
+        processor._process_single_task_file = process
+        processor.start_workers(wakeup, lambda: 0.05)
+        try:
+            assert long_started.wait(timeout=5)
+            added = processor.manager.db.add_task("Added", "/tmp/added.json")
+
+            # polled by the idle worker while the long task is still running
+            assert added_done.wait(timeout=5)
+            assert processor.manager.get_task(long_task.task_id).status == 'in_progress'
+        finally:
+            release_long.set()
+            processor.stop_workers(wakeup, timeout=5)
+
+        assert processor.manager.get_task(added.task_id).status == 'completed'
+        assert processor.manager.get_task(long_task.task_id).status == 'completed'
+
+    def test_notified_task_starts_while_long_task_runs(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path, workers=2))
+        wakeup = DaemonWakeup(tmp_path / "run")
+        assert wakeup.start()
+        long_task = processor.manager.db.add_task("Long", "/tmp/long.json")
+        long_started, release_long, added_started = threading.Event(), threading.Event(), threading.Event()
+
+        def process(task):
+            if task['task_id'] == long_task.task_id:
+                long_started.set()
+                release_long.wait(timeout=5)
+            else:
+                added_started.set()
+            processor.status_tracker.update_status(task['task_id'], "completed")
+
+        processor._process_single_task_file = process
+        # idle workers would only poll after a minute
+        processor.start_workers(wakeup, lambda: 60)
+        try:
+            assert long_started.wait(timeout=5)
+            added = processor.manager.db.add_task("Added", "/tmp/added.json")
+            assert DaemonWakeup.notify(tmp_path / "run") == 1
+
+            assert added_started.wait(timeout=5)
+            assert processor.manager.get_task(long_task.task_id).status == 'in_progress'
+        finally:
+            release_long.set()
+            processor.stop_workers(wakeup, timeout=5)
+            wakeup.stop()
+
+        assert processor.manager.get_task(added.task_id).status == 'completed'
+
+    def test_failing_task_is_marked_failed(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        task = processor.manager.db.add_task("Task", "/tmp/task.json")
+        processor._process_single_task_file = Mock(side_effect=RuntimeError("boom"))
+
+        processor.process_tasks()
+
+        stored = processor.manager.get_task(task.task_id)
+        assert stored.status == 'failed'
+        assert stored.error_message == "boom"
+
+    def test_output_directory_is_kept_for_retries(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        task = processor.manager.db.add_task("Task", "/tmp/task.json")
+        claimed = processor.manager.claim_next_task()
+
+        output_dir = processor._get_output_directory(claimed)
+        processor.status_tracker.update_status(task.task_id, "failed", error="boom")
+
+        stored = processor.manager.get_task(task.task_id)
+        assert stored.output_directory == output_dir
+        assert output_dir.endswith(f"task_{task.task_id}")
+        assert processor._get_output_directory({'task_id': task.task_id, 'output_directory': stored.output_directory}) == output_dir
+
+
+class TestTaskRetries:
+    """Test cases for non-blocking, persisted task retries."""
+
+    def test_retry_is_not_claimed_before_it_is_due(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+        assert database.claim_next_task()['attempts'] == 1
+
+        database.schedule_retry(task.task_id, "boom", delay_seconds=60)
+
+        stored = database.get_task(task.task_id)
+        assert stored.status == 'pending'
+        assert stored.last_error == "boom"
+        assert database.claim_next_task() is None
+        assert database.get_next_attempt_at() is not None
+        assert [h.status for h in TaskHistory.select().where(TaskHistory.task == task.task_id)] == ['in_progress', 'retrying']
+
+        Task.update(next_attempt_at=utc_now() - datetime.timedelta(seconds=1)).where(Task.task_id == task.task_id).execute()
+        claimed = database.claim_next_task()
+        assert claimed['attempts'] == 2
+        assert claimed['next_attempt_at'] is None
+
+    def test_failed_task_is_rescheduled_without_blocking(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        failing = processor.manager.db.add_task("Failing", "/tmp/failing.json")
+        other = processor.manager.db.add_task("Other", "/tmp/other.json")
+        for task in (failing, other):
+            processor.manager.set_task_output_directory(task.task_id, str(tmp_path / f"task_{task.task_id}"))
+
+        def execute(file_path):
+            if file_path == "/tmp/failing.json":
+                raise RuntimeError("GPU gone")
+            return {"successful_tasks": 1, "total_tasks": 1, "failed_tasks": 0}
+
+        with patch("sokrates.task_queue.processor.SequentialTaskExecutor") as executor_class:
+            executor_class.return_value.execute_tasks_from_file.side_effect = execute
+            started = time.monotonic()
+            processor.process_tasks()
+            assert time.monotonic() - started < 1
+
+            stored = processor.manager.get_task(failing.task_id)
+            assert (stored.status, stored.attempts, stored.last_error) == ('pending', 1, "GPU gone")
+            assert processor.manager.get_task(other.task_id).status == 'completed'
+
+            # a restarted daemon picks up the persisted attempt counter once the retry is due
+            for attempt in (2, 3):
+                Task.update(next_attempt_at=utc_now()).where(Task.task_id == failing.task_id).execute()
+                TaskProcessor(config=_mock_config(tmp_path)).process_tasks()
+                assert processor.manager.get_task(failing.task_id).attempts == attempt
+
+        stored = processor.manager.get_task(failing.task_id)
+        assert stored.status == 'failed'
+        assert stored.error_message == "Max retries reached: GPU gone"
+
+
+class TestTaskMetrics:
+    """Test cases for the performance accounting of task attempts."""
+
+    def test_metrics_of_each_attempt_are_recorded(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        task = processor.manager.db.add_task("Task", "/tmp/task.json")
+        processor.manager.set_task_output_directory(task.task_id, str(tmp_path / "task"))
+        subtask_metrics = {"model": "test-model", "provider": "http://gpu-1", "generations": 2,
+                           "prompt_tokens": 100, "completion_tokens": 40, "usage_estimated": False,
+                           "time_to_first_token": 0.5, "generation_time": 3.0, "wall_time": 3.5}
+        results = [
+            {"successful_tasks": 0, "total_tasks": 1, "failed_tasks": 1, "metrics": subtask_metrics,
+             "details": [{"task_id": 1, "status": "failed", "metrics": subtask_metrics}]},
+            {"successful_tasks": 1, "total_tasks": 1, "failed_tasks": 0, "metrics": subtask_metrics,
+             "details": [{"task_id": 1, "status": "completed", "metrics": subtask_metrics}]},
+        ]
+
+        with patch("sokrates.task_queue.processor.SequentialTaskExecutor") as executor_class:
+            executor_class.return_value.execute_tasks_from_file.side_effect = results
+            processor.process_tasks()
+            Task.update(next_attempt_at=utc_now()).where(Task.task_id == task.task_id).execute()
+            TaskProcessor(config=_mock_config(tmp_path)).process_tasks()
+
+        metrics = processor.manager.get_task_metrics(task.task_id)
+        assert [(m['attempt'], m['status']) for m in metrics] == [(1, 'failed'), (2, 'completed')]
+        assert metrics[1]['prompt_tokens'] == 100
+        assert metrics[1]['wall_time'] >= 0
+        assert [(s['subtask_id'], s['status'], s['generation_time']) for s in metrics[1]['subtasks']] == [("1", 'completed', 3.0)]
+
+    def test_metrics_are_deleted_with_their_task(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+        database.add_task_metrics(task.task_id, "completed", {"generations": 1},
+                                  subtasks=[{"subtask_id": 1, "status": "completed"}])
+        file_metric = database.add_task_metrics(None, "completed", {"generations": 2}, source="/tmp/prompt.md")
+
+        database.delete_tasks([task.task_id])
+
+        assert database.get_task_metrics(task.task_id) == []
+        assert [m.metric_id for m in TaskMetric.select()] == [file_metric]
+        assert SubtaskMetric.select().count() == 0
+
+
+class TestWatchedFiles:
+    """Test cases for files queued by the file watcher and executed by the workers."""
+
+    def test_waiting_file_is_queued_once(self, database):
+        first = database.add_watched_file("Watched file", "/tmp/prompt.md")
+        again = database.add_watched_file("Watched file", "/tmp/prompt.md")
+
+        assert first['duplicate_of'] is None
+        assert again == {'task_id': first['task_id'], 'duplicate_of': first['task_id']}
+        assert database.get_task(first['task_id']).task_type == 'watched_file'
+
+        # a file dropped again while its task runs is a new drop
+        database.claim_next_task()
+        assert database.add_watched_file("Watched file", "/tmp/prompt.md")['duplicate_of'] is None
+
+    def test_invalid_task_type_is_rejected(self, database):
+        with pytest.raises(ValueError, match="Invalid task type"):
+            database.add_tasks([{"description": "Task", "file_path": "/tmp/task.json", "task_type": "unknown"}])
+
+    def test_watched_files_are_processed_by_the_workers(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path, workers=2))
+        prompts = [tmp_path / f"prompt_{i}.md" for i in range(4)]
+        for prompt in prompts:
+            prompt.write_text("Prompt")
+            processor.manager.add_watched_file(str(prompt))
+        task_file = processor.manager.db.add_task("Task", "/tmp/task.json")
+
+        def process_file(file_path):
+            return {"status": "completed", "error": None, "output_file": f"{file_path}.result",
+                    "metrics": {"generations": 1, "prompt_tokens": 10}}
+
+        with patch("sokrates.task_queue.processor.FileProcessor") as processor_class, \
+             patch("sokrates.task_queue.processor.SequentialTaskExecutor") as executor_class:
+            processor_class.return_value.output_dir = tmp_path / "results"
+            processor_class.return_value.process_file.side_effect = process_file
+            processor_class.return_value.provider_executor.return_value = ThreadPoolExecutor(max_workers=2)
+            executor_class.return_value.execute_tasks_from_file.return_value = {
+                "successful_tasks": 1, "total_tasks": 1, "failed_tasks": 0}
+            processor.process_tasks()
+
+        assert processor_class.call_count == 1
+        assert sorted(call.args[0] for call in processor_class.return_value.process_file.call_args_list) == \
+            [str(prompt.resolve()) for prompt in prompts]
+        executor_class.return_value.execute_tasks_from_file.assert_called_once_with("/tmp/task.json")
+        for task in processor.manager.get_all_tasks():
+            assert task.status == 'completed'
+            if task.task_id != task_file.task_id:
+                assert task.result == f"Successfully executed: results saved to {task.file_path}.result"
+                assert processor.manager.get_task_metrics(task.task_id)[0]['prompt_tokens'] == 10
+
+    def test_failed_file_is_retried(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        prompt = tmp_path / "prompt.md"
+        prompt.write_text("Prompt")
+        task_id = processor.manager.add_watched_file(str(prompt))['task_id']
+
+        with patch("sokrates.task_queue.processor.FileProcessor") as processor_class:
+            processor_class.return_value.process_file.return_value = {
+                "status": "failed", "error": "Prompt execution failed", "metrics": {"generations": 1}}
+            processor_class.return_value.provider_executor.return_value = ThreadPoolExecutor(max_workers=1)
+            processor.process_tasks()
+
+        stored = processor.manager.get_task(task_id)
+        assert (stored.status, stored.attempts, stored.last_error) == ('pending', 1, "Prompt execution failed")
+        assert [m['status'] for m in processor.manager.get_task_metrics(task_id)] == ['failed']
+
+
+    def test_busy_provider_does_not_block_the_worker(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        paths = []
+        for name in ("slow_0", "slow_1", "fast_0"):
+            prompt = tmp_path / f"{name}.md"
+            prompt.write_text("Prompt")
+            processor.manager.add_watched_file(str(prompt))
+            paths.append(str(prompt.resolve()))
+        executors = {"slow": ThreadPoolExecutor(max_workers=1), "fast": ThreadPoolExecutor(max_workers=1)}
+        fast_done = threading.Event()
+        waited = []
+
+        def process_file(file_path):
+            if "fast" in file_path:
+                fast_done.set()
+            else:
+                # the slow provider only finishes once the fast file got its turn
+                waited.append(fast_done.wait(timeout=5))
+            return {"status": "completed", "error": None, "output_file": f"{file_path}.result", "metrics": {}}
+
+        with patch("sokrates.task_queue.processor.FileProcessor") as processor_class:
+            processor_class.return_value.process_file.side_effect = process_file
+            processor_class.return_value.provider_executor.side_effect = \
+                lambda file_path: executors["fast" if "fast" in file_path else "slow"]
+            processor.process_tasks()
+
+        assert waited == [True, True]
+        assert {task.status for task in processor.manager.get_all_tasks()} == {'completed'}
+
+
+class TestLeaseRecovery:
+    """Test cases for lease renewal and the recovery of tasks of crashed workers."""
+
+    def _expire(self, task_id):
+        Task.update(lease_expires_at=utc_now() - datetime.timedelta(seconds=1)).where(Task.task_id == task_id).execute()
+
+    def test_expired_lease_is_requeued(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+        database.claim_next_task(lease_owner="host:1:worker-0", lease_seconds=60)
+        assert database.requeue_expired_leases() == []
+
+        self._expire(task.task_id)
+
+        assert database.requeue_expired_leases() == [task.task_id]
+        stored = database.get_task(task.task_id)
+        assert (stored.status, stored.lease_owner, stored.attempts) == ('pending', None, 1)
+        assert stored.last_error == "Lease of host:1:worker-0 expired"
+        assert database.claim_next_task()['attempts'] == 2
+
+    def test_expired_lease_fails_after_max_attempts(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+        database.claim_next_task(lease_owner="owner", lease_seconds=60)
+        self._expire(task.task_id)
+
+        database.requeue_expired_leases(max_attempts=1)
+
+        assert database.get_task(task.task_id).status == 'failed'
+
+    def test_expired_lease_lookup_uses_index(self, database):
+        plan = database.db.execute_sql(
+            "EXPLAIN QUERY PLAN SELECT task_id FROM task WHERE status = 'in_progress' AND lease_expires_at < ?",
+            (utc_now(),)
+        ).fetchall()
+
+        assert any("INDEX task_status_lease_expires_at" in str(row) for row in plan)
+
+    def test_heartbeat_renews_leases_of_this_process(self, tmp_path):
+        processor = TaskProcessor(config=_mock_config(tmp_path))
+        own = processor.manager.db.add_task("Own", "/tmp/own.json")
+        other = processor.manager.db.add_task("Other", "/tmp/other.json")
+        processor.manager.claim_next_task(lease_owner=f"{processor.lease_owner_prefix}worker-0", lease_seconds=1)
+        processor.manager.claim_next_task(lease_owner="otherhost:1:worker-0", lease_seconds=1)
+        for task in (own, other):
+            self._expire(task.task_id)
+
+        stopped = Mock()
+        stopped.wait.side_effect = [False, True]
+        processor._renew_leases(stopped)
+
+        assert processor.manager.requeue_expired_leases() == [other.task_id]
+        assert processor.manager.get_task(own.task_id).status == 'in_progress'
+
+    def test_shutdown_releases_tasks_without_counting_the_attempt(self, database):
+        task = database.add_task("Task", "/tmp/task.json")
+        database.claim_next_task(lease_owner="host:1:worker-0", lease_seconds=60)
+
+        assert database.release_leases("host:1:", "Daemon terminated during processing") == [task.task_id]
+
+        stored = database.get_task(task.task_id)
+        assert (stored.status, stored.attempts, stored.lease_owner) == ('pending', 0, None)
+        assert database.claim_next_task()['task_id'] == task.task_id
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
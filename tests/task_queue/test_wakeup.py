@@ -0,0 +1,71 @@
+"""
+Test suite for the DaemonWakeup class.
+
+This module contains unit tests for the Unix socket based wakeup channel
+between task queue clients and running daemons.
+"""
+
+import threading
+import time
+import pytest
+
+from sokrates.task_queue.wakeup import DaemonWakeup
+
+pytestmark = pytest.mark.skipif(not DaemonWakeup.is_supported(), reason="Unix domain sockets are not supported")
+
+
+@pytest.fixture
+def socket_directory(tmp_path_factory):
+    # unix socket paths are limited to ~100 characters, keep them short
+    return tmp_path_factory.mktemp("run")
+
+
+class TestDaemonWakeup:
+    """Test cases for the DaemonWakeup class."""
+
+    def test_notify_wakes_waiting_daemon(self, socket_directory):
+        wakeup = DaemonWakeup(socket_directory)
+        assert wakeup.start()
+        try:
+            threading.Timer(0.05, DaemonWakeup.notify, args=[socket_directory]).start()
+
+            started = time.time()
+            assert wakeup.wait(timeout=5) is True
+            assert time.time() - started < 2
+        finally:
+            wakeup.stop()
+
+        assert not wakeup.socket_path.exists()
+
+    def test_wait_times_out_without_notification(self, socket_directory):
+        wakeup = DaemonWakeup(socket_directory)
+        wakeup.start()
+        try:
+            assert wakeup.wait(timeout=0.05) is False
+        finally:
+            wakeup.stop()
+
+    def test_notify_without_daemon(self, socket_directory, tmp_path):
+        assert DaemonWakeup.notify(tmp_path / "missing") == 0
+        assert DaemonWakeup.notify(socket_directory) == 0
+
+    def test_notify_removes_stale_sockets(self, socket_directory):
+        stale = DaemonWakeup(socket_directory)
+        stale.start()
+        stale_path = stale.socket_path
+        # simulate a crashed daemon: the socket file stays, nobody listens
+        stale._stopped = True
+        stale._socket.close()
+
+        assert DaemonWakeup.notify(socket_directory) == 0
+        assert not stale_path.exists()
+
+    def test_set_wakes_in_process(self, socket_directory):
+        wakeup = DaemonWakeup(socket_directory)
+        wakeup.set()
+        assert wakeup.wait(timeout=0) is True
+        assert wakeup.wait(timeout=0) is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
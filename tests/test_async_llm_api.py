@@ -0,0 +1,199 @@
+"""
+Test suite for the AsyncLLMApi class.
+
+This module contains unit tests for the AsyncLLMApi class which provides
+asynchronous, concurrency-limited access to OpenAI-compatible LLM APIs.
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from sokrates.async_llm_api import AsyncLLMApi
+from sokrates.client_registry import ClientRegistry
+from sokrates.generation_metrics import GenerationMetrics
+
+
+def _mock_chunk(content):
+    chunk = Mock()
+    chunk.choices = [Mock()]
+    chunk.choices[0].delta.content = content
+    return chunk
+
+
+class _MockAsyncStream:
+    """Minimal async iterator yielding the provided chunks."""
+
+    def __init__(self, chunks, delay=0):
+        self.chunks = list(chunks)
+        self.delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.chunks:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        return self.chunks.pop(0)
+
+
+class TestAsyncLLMApi:
+    """Test cases for the AsyncLLMApi class."""
+
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.api_endpoint = pytest.TESTING_ENDPOINT
+        self.api_key = "test_api_key"
+        ClientRegistry.clear()
+
+    def teardown_method(self):
+        ClientRegistry.clear()
+
+    def test_init_rejects_invalid_concurrency(self):
+        """Test that a concurrency limit below 1 is rejected."""
+        with pytest.raises(ValueError):
+            AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, max_concurrent_requests=0)
+
+    @patch('sokrates.client_registry.AsyncOpenAI')
+    def test_get_openai_client(self, mock_async_openai):
+        """Test that the AsyncOpenAI client is shared through the ClientRegistry."""
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, timeout=30)
+        other = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, timeout=30)
+
+        async def get_clients():
+            return api.get_openai_client(), other.get_openai_client()
+
+        client, other_client = asyncio.run(get_clients())
+
+        assert client is other_client is mock_async_openai.return_value
+        mock_async_openai.assert_called_once()
+        call_kwargs = mock_async_openai.call_args.kwargs
+        assert (call_kwargs['base_url'], call_kwargs['api_key'], call_kwargs['timeout']) == (self.api_endpoint, self.api_key, 30)
+        assert call_kwargs['http_client'] is not None
+
+    @patch('sokrates.client_registry.AsyncOpenAI')
+    def test_event_loops_get_their_own_client(self, mock_async_openai):
+        """Test that async connections are not shared across event loops."""
+        mock_async_openai.side_effect = lambda **kwargs: Mock()
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key)
+
+        async def get_client():
+            return api.get_openai_client()
+
+        assert asyncio.run(get_client()) is not asyncio.run(get_client())
+
+    def test_list_models(self):
+        """Test successful model listing."""
+        mock_client = Mock()
+        model_b = Mock()
+        model_b.id = "model-b"
+        model_a = Mock()
+        model_a.id = "model-a"
+        mock_client.models.list = AsyncMock(return_value=Mock(data=[model_b, model_a]))
+
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, client=mock_client)
+
+        assert asyncio.run(api.list_models()) == ["model-a", "model-b"]
+
+    def test_send(self):
+        """Test sending a prompt and joining the streamed chunks."""
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(
+            return_value=_MockAsyncStream([_mock_chunk("Hello"), _mock_chunk(None), _mock_chunk(" World")])
+        )
+
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, client=mock_client)
+        result = asyncio.run(api.send(prompt="Test prompt", model="test-model", system_prompt="system"))
+
+        assert result == "Hello World"
+        call_args = mock_client.chat.completions.create.call_args[1]
+        assert call_args['model'] == "test-model"
+        assert call_args['messages'][0] == {"role": "system", "content": "system"}
+        assert call_args['stream'] is True
+
+    def test_chat_completion_exception_handling(self):
+        """Test chat completion with exception handling."""
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, client=mock_client)
+
+        with pytest.raises(Exception) as exc_info:
+            asyncio.run(api.chat_completion(messages=[{"role": "user", "content": "Hello"}], model="test-model"))
+
+        assert "API Error" in str(exc_info.value)
+
+    def test_stream_yields_chunks(self):
+        """Test that stream() yields the chunks and fills in the metrics."""
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(
+            return_value=_MockAsyncStream([_mock_chunk("Hello"), _mock_chunk(" World")])
+        )
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, client=mock_client)
+
+        metrics = GenerationMetrics()
+
+        async def collect():
+            return [content async for content in api.stream(prompt="Test prompt", model="test-model", metrics=metrics)]
+
+        assert asyncio.run(collect()) == ["Hello", " World"]
+        assert metrics.finished
+        assert metrics.response_characters == len("Hello World")
+        # concurrent generations would overwrite each other
+        assert api.last_metrics is None
+
+    def test_response_cache_is_used_off_the_event_loop(self):
+        """Test that the blocking cache lookups do not run on the event loop thread."""
+        threads = []
+        cache = Mock()
+        cache.get.side_effect = lambda key: threads.append(threading.current_thread()) or None
+        cache.set.side_effect = lambda key, value: threads.append(threading.current_thread())
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(return_value=_MockAsyncStream([_mock_chunk("Hello")]))
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, client=mock_client, cache=cache)
+
+        assert asyncio.run(api.send(prompt="Test prompt", model="test-model")) == "Hello"
+
+        cache.set.assert_called_once()
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
+    def test_send_batch_respects_concurrency_limit(self):
+        """Test that send_batch never exceeds max_concurrent_requests in-flight requests."""
+        state = {"in_flight": 0, "max_in_flight": 0}
+
+        async def create(**kwargs):
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            content = kwargs["messages"][-1]["content"]
+
+            class _Stream(_MockAsyncStream):
+                async def __anext__(inner_self):
+                    try:
+                        return await super().__anext__()
+                    except StopAsyncIteration:
+                        state["in_flight"] -= 1
+                        raise
+
+            return _Stream([_mock_chunk(content.upper())])
+
+        mock_client = Mock()
+        mock_client.chat.completions.create = create
+
+        api = AsyncLLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key,
+                          max_concurrent_requests=3, client=mock_client)
+        prompts = [f"prompt {i}" for i in range(10)]
+        results = asyncio.run(api.send_batch(prompts, model="test-model"))
+
+        assert [content for content, _metrics in results] == [p.upper() for p in prompts]
+        assert state["max_in_flight"] == 3
+        # every result comes with the metrics of its own generation
+        assert [metrics.response_characters for _content, metrics in results] == [len(p) for p in prompts]
+        assert len({id(metrics) for _content, metrics in results}) == len(prompts)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
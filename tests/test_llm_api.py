@@ -6,10 +6,13 @@ with OpenAI-compatible LLM APIs.
 """
 
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
 from sokrates.llm_api import LLMApi
+from sokrates.client_registry import ClientRegistry
 from sokrates.constants import Constants
+from sokrates.response_cache import ResponseCache
+from sokrates.generation_metrics import GenerationMetrics
 
 
 class TestLLMApi:
@@ -19,6 +22,7 @@ class TestLLMApi:
         """Set up test fixtures before each test method."""
         self.api_endpoint = pytest.TESTING_ENDPOINT
         self.api_key = "test_api_key"
+        ClientRegistry.clear()
 
     @patch('sokrates.llm_api.OpenAI')
     def test_init_with_custom_values(self, mock_openai):
@@ -52,10 +56,24 @@ class TestLLMApi:
         # Verify the OpenAI client was created with correct parameters
         mock_openai.assert_called_once_with(
             base_url=self.api_endpoint,
-            api_key=self.api_key
+            api_key=self.api_key,
+            http_client=ANY
         )
         assert result == mock_client_instance
 
+    @patch('sokrates.llm_api.OpenAI')
+    def test_openai_client_is_shared_between_instances(self, mock_openai):
+        """Test that LLMApi instances for the same endpoint share one client and connection pool."""
+        first = LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key)
+        second = LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key)
+
+        assert first.get_openai_client() is second.get_openai_client()
+        mock_openai.assert_called_once()
+
+        stats = ClientRegistry.stats()
+        assert stats["clients"] == [{"api_endpoint": self.api_endpoint, "timeout": None, "lookups": 2}]
+        assert stats["limits"]["max_connections"] == Constants.DEFAULT_HTTP_MAX_CONNECTIONS
+
     @patch('sokrates.llm_api.OpenAI')
     def test_list_models_success(self, mock_openai):
         """Test successful model listing."""
@@ -305,5 +323,162 @@ class TestLLMApi:
         assert call_args['model'] == Constants.DEFAULT_MODEL
         assert result == "Response"
 
+    @patch('sokrates.llm_api.OpenAI')
+    def test_send_uses_response_cache(self, mock_openai, tmp_path):
+        """Test that identical requests are served from the response cache."""
+        mock_client_instance = Mock()
+        mock_openai.return_value = mock_client_instance
+
+        mock_chunk_1 = Mock()
+        mock_chunk_1.choices = [Mock()]
+        mock_chunk_1.choices[0].delta.content = "Cached"
+        mock_client_instance.chat.completions.create.side_effect = lambda **kwargs: [mock_chunk_1]
+
+        cache = ResponseCache(db_path=tmp_path / "responses.sqlite")
+        api = LLMApi(
+            api_endpoint=self.api_endpoint,
+            api_key=self.api_key,
+            cache=cache
+        )
+
+        assert api.send(prompt="Test prompt", model="test-model") == "Cached"
+        assert api.send(prompt="Test prompt", model="test-model") == "Cached"
+        mock_client_instance.chat.completions.create.assert_called_once()
+
+        # a different temperature is a different request
+        api.send(prompt="Test prompt", model="test-model", temperature=0.1)
+        assert mock_client_instance.chat.completions.create.call_count == 2
+
+        # bypassing the cache always calls the endpoint
+        uncached_api = LLMApi(
+            api_endpoint=self.api_endpoint,
+            api_key=self.api_key,
+            cache=cache,
+            use_cache=False
+        )
+        uncached_api.send(prompt="Test prompt", model="test-model")
+        assert mock_client_instance.chat.completions.create.call_count == 3
+        cache.close()
+
+    @patch('sokrates.llm_api.OpenAI')
+    def test_stream_yields_chunks_and_fills_metrics(self, mock_openai):
+        """Test that stream() yields the chunks as they arrive and fills in the metrics."""
+        mock_client_instance = Mock()
+        mock_openai.return_value = mock_client_instance
+
+        chunks = []
+        for content in ["Hello", None, " World"]:
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = content
+            chunks.append(chunk)
+        mock_client_instance.chat.completions.create.return_value = iter(chunks)
+
+        api = LLMApi(
+            api_endpoint=self.api_endpoint,
+            api_key=self.api_key
+        )
+        metrics = GenerationMetrics()
+        stream = api.stream(prompt="Test prompt", model="test-model", metrics=metrics)
+
+        assert next(stream) == "Hello"
+        assert not metrics.finished
+        assert list(stream) == [" World"]
+
+        assert metrics.finished
+        assert metrics.model == "test-model"
+        assert metrics.response_characters == len("Hello World")
+        assert metrics.time_to_first_token is not None
+        assert api.last_metrics is metrics
+
+    @patch('sokrates.llm_api.OpenAI')
+    def test_stream_uses_reported_token_usage(self, mock_openai):
+        """Test that the usage chunk sent with include_usage is used for the token metrics."""
+        mock_client_instance = Mock()
+        mock_openai.return_value = mock_client_instance
+
+        content_chunk = Mock()
+        content_chunk.choices = [Mock()]
+        content_chunk.choices[0].delta.content = "Hello World"
+        content_chunk.usage = None
+        usage_chunk = Mock()
+        usage_chunk.choices = []
+        usage_chunk.usage.prompt_tokens = 12
+        usage_chunk.usage.completion_tokens = 3
+        mock_client_instance.chat.completions.create.return_value = iter([content_chunk, usage_chunk])
+
+        api = LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key)
+        metrics = GenerationMetrics()
+
+        assert api.send(prompt="Test prompt", model="test-model", metrics=metrics) == "Hello World"
+        call_args = mock_client_instance.chat.completions.create.call_args[1]
+        assert call_args['stream_options'] == {"include_usage": True}
+        assert metrics.prompt_tokens == 12
+        assert metrics.completion_tokens == 3
+        assert not metrics.usage_estimated
+
+    @patch('sokrates.llm_api.OpenAI')
+    def test_stream_estimates_token_usage_without_usage_chunk(self, mock_openai):
+        """Test the token estimate for servers that do not report usage."""
+        mock_client_instance = Mock()
+        mock_openai.return_value = mock_client_instance
+
+        chunk = Mock()
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = "12345678"
+        chunk.usage = None
+        mock_client_instance.chat.completions.create.return_value = iter([chunk])
+
+        api = LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, stream_usage=False)
+        metrics = GenerationMetrics()
+        api.send(prompt="Test", model="test-model", metrics=metrics)
+
+        call_args = mock_client_instance.chat.completions.create.call_args[1]
+        assert 'stream_options' not in call_args
+        assert metrics.completion_tokens == 2
+        assert metrics.prompt_tokens == 1
+        assert metrics.usage_estimated
+
+    @patch('sokrates.llm_api.OpenAI')
+    def test_stream_usage_default_is_configurable(self, mock_openai):
+        """Test that `llm.stream_usage` disables usage reporting for instances without an explicit setting."""
+        mock_client_instance = Mock()
+        mock_openai.return_value = mock_client_instance
+        mock_client_instance.chat.completions.create.side_effect = lambda **kwargs: iter([])
+
+        LLMApi.set_default_stream_usage(False)
+        try:
+            LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key).send(prompt="Test", model="test-model")
+            assert 'stream_options' not in mock_client_instance.chat.completions.create.call_args[1]
+
+            LLMApi(api_endpoint=self.api_endpoint, api_key=self.api_key, stream_usage=True).send(prompt="Test", model="test-model")
+            assert mock_client_instance.chat.completions.create.call_args[1]['stream_options'] == {"include_usage": True}
+        finally:
+            LLMApi.set_default_stream_usage(True)
+
+    def test_summarize_generation_metrics(self):
+        """Test the aggregation of several generations, e.g. refinement and execution of a task."""
+        first = GenerationMetrics(model="model-a", api_endpoint="http://a")
+        first.start_time, first.first_token_time, first.end_time = 0.0, 1.0, 3.0
+        first.set_usage(100, 20)
+        second = GenerationMetrics(model="model-b", api_endpoint="http://a")
+        second.start_time, second.first_token_time, second.end_time = 3.0, 6.0, 7.0
+        second.prompt_tokens, second.completion_tokens, second.usage_estimated = 50, 10, True
+        never_sent = GenerationMetrics()
+
+        summary = GenerationMetrics.summarize([first, second, never_sent])
+
+        assert summary == {
+            "model": "model-a, model-b",
+            "provider": "http://a",
+            "generations": 2,
+            "prompt_tokens": 150,
+            "completion_tokens": 30,
+            "usage_estimated": True,
+            "time_to_first_token": 2.0,
+            "generation_time": 7.0
+        }
+        assert GenerationMetrics.summarize([])["generations"] == 0
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
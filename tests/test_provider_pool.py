@@ -0,0 +1,115 @@
+"""
+Test suite for the ProviderPool class.
+
+This module contains unit tests for load balancing and failover across
+multiple LLM providers.
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from sokrates.provider_pool import ProviderPool
+
+
+def _mock_api(endpoint, chunks=None, error=None):
+    api = Mock()
+    api.api_endpoint = endpoint
+    api.last_metrics = None
+    api._build_messages.side_effect = lambda prompt, system_prompt, context: [{"role": "user", "content": prompt}]
+
+    def stream_chat(messages, **kwargs):
+        for chunk in chunks or []:
+            yield chunk
+        if error:
+            raise error
+
+    api.stream_chat.side_effect = stream_chat
+    return api
+
+
+class TestProviderPool:
+    """Test cases for the ProviderPool class."""
+
+    def test_init_validation(self):
+        with pytest.raises(ValueError):
+            ProviderPool([])
+        with pytest.raises(ValueError):
+            ProviderPool([_mock_api("http://a")], strategy="random")
+
+    def test_round_robin(self):
+        apis = [_mock_api("http://a", ["a"]), _mock_api("http://b", ["b"])]
+        pool = ProviderPool(apis)
+
+        assert [pool.send("prompt") for _ in range(4)] == ["a", "b", "a", "b"]
+
+    def test_least_outstanding(self):
+        apis = [_mock_api("http://a", ["a"]), _mock_api("http://b", ["b"])]
+        pool = ProviderPool(apis, strategy=ProviderPool.STRATEGY_LEAST_OUTSTANDING)
+
+        # keep a request open on the first provider
+        open_stream = pool.stream("prompt")
+        assert next(open_stream) == "a"
+
+        assert pool.send("prompt") == "b"
+        assert [s["outstanding"] for s in pool.stats()] == [1, 0]
+
+        open_stream.close()
+        assert [s["outstanding"] for s in pool.stats()] == [0, 0]
+
+    def test_failover_ejects_failing_provider(self):
+        failing = _mock_api("http://a", error=ConnectionError("down"))
+        healthy = _mock_api("http://b", ["b"])
+        pool = ProviderPool([failing, healthy], ejection_seconds=60)
+
+        assert pool.send("prompt") == "b"
+        assert pool.send("prompt") == "b"
+
+        stats = pool.stats()
+        assert stats[0]["ejected"] is True
+        assert stats[0]["failures"] == 1
+        assert failing.stream_chat.call_count == 1
+
+    def test_all_providers_failing_raises_last_error(self):
+        pool = ProviderPool([_mock_api("http://a", error=ConnectionError("a down")),
+                             _mock_api("http://b", error=ConnectionError("b down"))])
+
+        with pytest.raises(ConnectionError):
+            pool.send("prompt")
+
+    def test_no_available_provider_raises_clear_error(self):
+        pool = ProviderPool([_mock_api("http://a", ["a"])])
+        pool._acquire = Mock(return_value=None)
+
+        with pytest.raises(RuntimeError, match="No provider"):
+            pool.send("Hello")
+        with pytest.raises(RuntimeError, match="No provider"):
+            pool.list_models()
+
+    def test_error_after_first_chunk_is_not_retried(self):
+        broken = _mock_api("http://a", ["partial"], error=ConnectionError("reset"))
+        healthy = _mock_api("http://b", ["b"])
+        pool = ProviderPool([broken, healthy])
+
+        with pytest.raises(ConnectionError):
+            pool.send("prompt")
+        healthy.stream_chat.assert_not_called()
+
+    def test_from_config(self):
+        config = Mock()
+        config.get_provider_pool.return_value = {
+            "name": "pool",
+            "providers": ["a", "b"],
+            "strategy": "least_outstanding",
+            "ejection_seconds": 5
+        }
+        config.get_provider.side_effect = lambda name: {"api_endpoint": f"http://{name}:1234/v1", "api_key": "key"}
+
+        pool = ProviderPool.from_config(config, "pool")
+
+        assert [api.api_endpoint for api in pool.apis] == ["http://a:1234/v1", "http://b:1234/v1"]
+        assert pool.strategy == "least_outstanding"
+        assert pool.ejection_seconds == 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+"""
+Test suite for the RefinementCache class.
+
+This module contains unit tests for the cache of refined prompts, covering
+key construction, the separation from the response cache and the cache
+lookups of RefinementWorkflow.
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from sokrates.generation_metrics import GenerationMetrics
+from sokrates.refinement_cache import RefinementCache
+from sokrates.response_cache import ResponseCache
+from sokrates.workflows.refinement_workflow import RefinementWorkflow
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = RefinementCache(db_path=tmp_path / "cache" / "responses.sqlite")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def default_cache(cache):
+    RefinementCache.set_default(cache)
+    yield cache
+    RefinementCache.set_default(None)
+
+
+class TestRefinementCache:
+    """Test cases for the RefinementCache class."""
+
+    def test_build_refinement_key_is_stable_and_input_sensitive(self):
+        key = RefinementCache.build_refinement_key("Prompt", "Refine: {prompt}", "model")
+
+        assert key == RefinementCache.build_refinement_key("Prompt", "Refine: {prompt}", "model")
+        assert key != RefinementCache.build_refinement_key("Other prompt", "Refine: {prompt}", "model")
+        assert key != RefinementCache.build_refinement_key("Prompt", "Improve: {prompt}", "model")
+        assert key != RefinementCache.build_refinement_key("Prompt", "Refine: {prompt}", "other")
+        assert key != RefinementCache.build_refinement_key("Prompt", "Refine: {prompt}", "model", context=["Context"])
+
+    def test_refinements_are_stored_apart_from_responses(self, cache, tmp_path):
+        responses = ResponseCache(db_path=tmp_path / "cache" / "responses.sqlite")
+        try:
+            cache.set_refinement("Prompt", "Refine", "model", "Refined prompt")
+
+            assert cache.get_refinement("Prompt", "Refine", "model") == "Refined prompt"
+            assert cache.get_refinement("Prompt", "Refine", "other") is None
+            assert responses.stats()["entries"] == 0
+        finally:
+            responses.close()
+
+    def test_default_is_separate_from_the_response_cache(self):
+        ResponseCache.set_default(Mock())
+        try:
+            assert RefinementCache.get_default() is None
+        finally:
+            ResponseCache.set_default(None)
+
+    def test_from_config_is_opt_in(self, tmp_path):
+        values = {"cache.refinements": False, "cache_path": tmp_path, "cache.ttl_seconds": 60, "cache.max_size_mb": 1}
+        config = Mock()
+        config.get.side_effect = lambda key: values[key]
+
+        assert RefinementCache.from_config(config) is None
+
+        values["cache.refinements"] = True
+        cache = RefinementCache.from_config(config)
+        assert (cache.db_path, cache.ttl_seconds, cache.max_size_bytes) == (tmp_path / "responses.sqlite", 60, 1024 * 1024)
+        cache.close()
+
+
+class TestRefinementWorkflowCache:
+    """Test cases for the refinement cache lookups of RefinementWorkflow."""
+
+    def test_identical_refinement_is_sent_once(self, default_cache):
+        llm_api = Mock()
+        llm_api.send.return_value = "Refined prompt"
+        workflow = RefinementWorkflow(api_endpoint=None, api_key=None, model="model", llm_api=llm_api)
+
+        first = workflow.refine_prompt("Prompt", "Refine the prompt")
+        metrics = GenerationMetrics()
+        second = workflow.refine_prompt("Prompt", "Refine the prompt", metrics=metrics)
+
+        assert first == second
+        assert llm_api.send.call_count == 1
+        assert metrics.cached
+        workflow.refine_prompt("Prompt", "Refine the prompt differently")
+        assert llm_api.send.call_count == 2
+
+    def test_cache_holds_the_cleaned_response(self, default_cache):
+        llm_api = Mock()
+        llm_api.send.return_value = "Refined prompt"
+        workflow = RefinementWorkflow(api_endpoint=None, api_key=None, model="model", llm_api=llm_api)
+
+        output = workflow.refine_prompt("Prompt", "Refine the prompt")
+
+        assert default_cache.get_refinement("Prompt", "Refine the prompt", "model") == workflow.refiner.clean_response("Refined prompt")
+        default_cache.set_refinement("Other prompt", "Refine the prompt", "model", "Refined prompt")
+        assert workflow.refine_prompt("Other prompt", "Refine the prompt") == output
+        assert llm_api.send.call_count == 1
+
+    def test_without_default_cache_every_refinement_is_sent(self):
+        llm_api = Mock()
+        llm_api.send.return_value = "Refined prompt"
+        workflow = RefinementWorkflow(api_endpoint=None, api_key=None, model="model", llm_api=llm_api)
+
+        workflow.refine_prompt("Prompt", "Refine the prompt")
+        workflow.refine_prompt("Prompt", "Refine the prompt")
+
+        assert llm_api.send.call_count == 2
@@ -0,0 +1,89 @@
+"""
+Test suite for the ResponseCache class.
+
+This module contains unit tests for the SQLite backed response cache,
+covering key construction, TTL expiry and LRU size eviction.
+"""
+
+import time
+import pytest
+
+from sokrates.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(db_path=tmp_path / "cache" / "responses.sqlite")
+    yield cache
+    cache.close()
+
+
+class TestResponseCache:
+    """Test cases for the ResponseCache class."""
+
+    def test_build_key_is_stable_and_parameter_sensitive(self):
+        messages = [{"role": "user", "content": "Hello"}]
+        key = ResponseCache.build_key("http://localhost:1234/v1", "model", messages, 0.7, 100)
+
+        assert key == ResponseCache.build_key("http://localhost:1234/v1", "model", messages, 0.7, 100)
+        assert key != ResponseCache.build_key("http://localhost:1234/v1", "model", messages, 0.2, 100)
+        assert key != ResponseCache.build_key("http://localhost:1234/v1", "other", messages, 0.7, 100)
+        assert key != ResponseCache.build_key("http://remote:1234/v1", "model", messages, 0.7, 100)
+
+    def test_get_and_set(self, cache):
+        assert cache.get("missing") is None
+
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        db_path = tmp_path / "responses.sqlite"
+        first = ResponseCache(db_path=db_path)
+        first.set("key", "value")
+        first.close()
+
+        second = ResponseCache(db_path=db_path)
+        assert second.get("key") == "value"
+        second.close()
+
+    def test_expired_entries_are_not_returned(self, tmp_path):
+        cache = ResponseCache(db_path=tmp_path / "responses.sqlite", ttl_seconds=0)
+        cache.set("key", "value")
+        time.sleep(0.01)
+
+        assert cache.get("key") is None
+        assert cache.stats()["entries"] == 0
+        cache.close()
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        cache = ResponseCache(db_path=tmp_path / "responses.sqlite", max_size_bytes=10)
+        cache.set("a", "aaaa")
+        time.sleep(0.01)
+        cache.set("b", "bbbb")
+        time.sleep(0.01)
+        # touch "a" so "b" becomes the least recently used entry
+        assert cache.get("a") == "aaaa"
+        time.sleep(0.01)
+        cache.set("c", "cccc")
+
+        assert cache.get("a") == "aaaa"
+        assert cache.get("b") is None
+        assert cache.get("c") == "cccc"
+        cache.close()
+
+    def test_default_cache_registration(self, cache):
+        ResponseCache.set_default(cache)
+        try:
+            assert ResponseCache.get_default() is cache
+        finally:
+            ResponseCache.set_default(None)
+        assert ResponseCache.get_default() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,194 @@
+"""
+Test suite for the SequentialTaskExecutor class.
+
+This module contains unit tests for subtask checkpointing: re-running a
+task file in the same output directory resumes at the first incomplete subtask,
+and for the dependency-aware parallel execution of subtasks.
+"""
+
+import json
+import threading
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+
+from sokrates.workflows.sequential_task_executor import SequentialTaskExecutor
+from sokrates.workflows.subtask_manifest import SubtaskManifest
+
+REFINEMENT_PROMPT_PATH = (Path(__file__).parent.parent / "src" / "sokrates" / "prompts" / "refine-prompt.md").resolve()
+
+
+@pytest.fixture
+def task_file(tmp_path):
+    task_file = tmp_path / "tasks.json"
+    task_file.write_text(json.dumps({
+        "task": "Main task",
+        "subtasks": [
+            {"id": 1, "description": "First subtask"},
+            {"id": 2, "description": "Second subtask"},
+            {"id": 3, "description": "Third subtask"}
+        ]
+    }))
+    return task_file
+
+
+def _write_task_file(tmp_path, subtasks):
+    task_file = tmp_path / "dag.json"
+    task_file.write_text(json.dumps({"task": "Main task", "subtasks": subtasks}))
+    return task_file
+
+
+def _executor(output_dir, llm_api, subtask_concurrency=1):
+    return SequentialTaskExecutor(
+        api_endpoint=pytest.TESTING_ENDPOINT,
+        api_key="notrequired",
+        model="test-model",
+        refinement_prompt_path=REFINEMENT_PROMPT_PATH,
+        temperature=0.7,
+        output_dir=str(output_dir),
+        refinement_enabled=False,
+        llm_api=llm_api,
+        subtask_concurrency=subtask_concurrency
+    )
+
+
+class TestSequentialTaskExecutorCheckpoints:
+    """Test cases for subtask checkpoint and resume."""
+
+    def test_resumes_at_first_incomplete_subtask(self, tmp_path, task_file):
+        output_dir = tmp_path / "results"
+        llm_api = Mock()
+        llm_api.send.side_effect = ["result 1", RuntimeError("GPU gone"), "result 3"]
+
+        first_run = _executor(output_dir, llm_api).execute_tasks_from_file(task_file)
+        assert first_run["successful_tasks"] == 2
+        assert first_run["failed_tasks"] == 1
+
+        # a new executor (e.g. after a daemon restart) only executes the failed subtask
+        llm_api.send.side_effect = ["result 2"]
+        second_run = _executor(output_dir, llm_api).execute_tasks_from_file(task_file)
+
+        assert second_run["successful_tasks"] == 3
+        assert second_run["failed_tasks"] == 0
+        assert llm_api.send.call_count == 4
+        assert Path(output_dir / "task_2_result.md").read_text() == "result 2"
+        assert [detail["message"] for detail in second_run["details"]][0] == "Task result reused from checkpoint"
+
+    def test_modified_output_is_regenerated(self, tmp_path, task_file):
+        output_dir = tmp_path / "results"
+        llm_api = Mock()
+        llm_api.send.return_value = "result"
+        _executor(output_dir, llm_api).execute_tasks_from_file(task_file)
+
+        (output_dir / "task_1_result.md").write_text("edited by hand")
+        _executor(output_dir, llm_api).execute_tasks_from_file(task_file)
+
+        assert llm_api.send.call_count == 4
+
+    def test_changed_subtask_input_invalidates_checkpoint(self, tmp_path):
+        manifest = SubtaskManifest(tmp_path)
+        output_file = tmp_path / "out.md"
+        output_file.write_text("content")
+        subtask_hash = SubtaskManifest.subtask_hash(description="a", model="m")
+        manifest.mark_completed(1, subtask_hash, str(output_file), "content")
+
+        reloaded = SubtaskManifest(tmp_path)
+        assert reloaded.get_completed_output(1, subtask_hash) == str(output_file)
+        assert reloaded.get_completed_output(1, SubtaskManifest.subtask_hash(description="b", model="m")) is None
+
+
+class TestSequentialTaskExecutorDependencies:
+    """Test cases for depends_on ordering and parallel subtask execution."""
+
+    def test_independent_subtasks_run_in_parallel(self, tmp_path):
+        task_file = _write_task_file(tmp_path, [
+            {"id": 1, "description": "Independent A"},
+            {"id": 2, "description": "Independent B"},
+            {"id": 3, "description": "Combine", "depends_on": [1, 2]}
+        ])
+        state = {"in_flight": 0, "max_in_flight": 0, "order": []}
+        lock = threading.Lock()
+
+        def send(prompt, **kwargs):
+            with lock:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+                state["order"].append(prompt.split("Sub-Task ")[1][0])
+            return "result"
+
+        llm_api = Mock()
+        llm_api.send.side_effect = send
+        result = _executor(tmp_path / "results", llm_api, subtask_concurrency=4).execute_tasks_from_file(task_file)
+
+        assert result["successful_tasks"] == 3
+        assert state["max_in_flight"] == 2
+        assert state["order"][-1] == "3"
+        assert [detail["task_id"] for detail in result["details"]] == [1, 2, 3]
+
+    def test_dependents_of_failed_subtask_are_skipped(self, tmp_path):
+        task_file = _write_task_file(tmp_path, [
+            {"id": 1, "description": "Fails"},
+            {"id": 2, "description": "Needs 1", "depends_on": [1]},
+            {"id": 3, "description": "Needs 2", "depends_on": 2},
+            {"id": 4, "description": "Independent"}
+        ])
+        llm_api = Mock()
+        llm_api.send.side_effect = [RuntimeError("boom"), "result 4"]
+
+        result = _executor(tmp_path / "results", llm_api).execute_tasks_from_file(task_file)
+
+        assert [detail["status"] for detail in result["details"]] == ["failed", "skipped", "skipped", "completed"]
+        assert result["successful_tasks"] == 1
+        assert result["failed_tasks"] == 1
+        assert llm_api.send.call_count == 2
+
+    @pytest.mark.parametrize("subtasks", [
+        [{"id": 1, "description": "A", "depends_on": [2]}, {"id": 2, "description": "B", "depends_on": [1]}],
+        [{"id": 1, "description": "A", "depends_on": [5]}],
+        [{"id": 1, "description": "A"}, {"id": 1, "description": "B"}]
+    ])
+    def test_invalid_dependencies_are_rejected(self, tmp_path, subtasks):
+        llm_api = Mock()
+
+        with pytest.raises(ValueError):
+            _executor(tmp_path / "results", llm_api).execute_tasks_from_file(_write_task_file(tmp_path, subtasks))
+        llm_api.send.assert_not_called()
+
+
+class TestSequentialTaskExecutorMetrics:
+    """Test cases for the performance metrics of the executed subtasks."""
+
+    def test_subtask_and_run_metrics(self, tmp_path, task_file):
+        def send(prompt, metrics=None, **kwargs):
+            metrics.model, metrics.api_endpoint = kwargs["model"], "http://gpu-1"
+            metrics.start_time, metrics.first_token_time, metrics.end_time = 10.0, 10.5, 12.0
+            metrics.set_usage(100, 40)
+            if "Second subtask" in prompt:
+                raise RuntimeError("GPU gone")
+            return "result"
+        llm_api = Mock()
+        llm_api.send.side_effect = send
+
+        result = _executor(tmp_path / "results", llm_api).execute_tasks_from_file(task_file)
+
+        first, second, _ = result["details"]
+        assert (first["metrics"]["generations"], first["metrics"]["completion_tokens"]) == (1, 40)
+        assert first["metrics"]["time_to_first_token"] == 0.5
+        assert first["metrics"]["wall_time"] >= 0
+        assert (second["status"], second["metrics"]["provider"]) == ("failed", "http://gpu-1")
+        assert result["metrics"]["generations"] == 3
+        assert result["metrics"]["prompt_tokens"] == 300
+        assert result["metrics"]["model"] == "test-model"
+
+        # subtasks reused from their checkpoint are not executed and have no metrics
+        rerun = _executor(tmp_path / "results", llm_api).execute_tasks_from_file(task_file)
+        assert "metrics" not in rerun["details"][0]
+        assert rerun["metrics"]["generations"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])